@@ -0,0 +1,48 @@
+'''
+### 백테스트 엔진 벤치마크
+합성 유니버스로 날짜별 재료 계산(프로세스 풀)과 시뮬레이션 시간을 잼
+
+    $ python -m benchmarks.bench_backtest --symbols 500 --days 750 --step 1 [--no-rolling]
+'''
+import argparse
+import time
+
+from owlman.backtest import Backtester
+from owlman.price_panel import PricePanel
+from benchmarks.synthetic import synthetic_history
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--days', type=int, default=750)
+    parser.add_argument('--step', type=int, default=1)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--no-rolling', action='store_true',
+                        help='날짜마다 상관계수 새로 계산')
+    args = parser.parse_args()
+
+    panel = PricePanel.from_history(
+        synthetic_history(args.symbols, args.days))
+    bt = Backtester(panel, processes=args.processes,
+                    rolling=not args.no_rolling)
+    dates = bt.get_dates(step=args.step)
+
+    start = time.perf_counter()
+    features = bt.get_features(dates, n_clusters=[10])
+    feature_time = time.perf_counter() - start
+    start = time.perf_counter()
+    result = bt.simulate(features)
+    simulate_time = time.perf_counter() - start
+
+    print(f'universe : {args.symbols} symbols x {args.days} days, '
+          f'{len(dates)} rebalances, {bt.processes} processes, '
+          f'rolling={bt.rolling}')
+    print(f'features : {feature_time:.2f} s')
+    print(f'simulate : {simulate_time:.2f} s')
+    for k, v in result.summary().items():
+        print(f'{k} : {v:.4f}')
+
+
+if __name__ == '__main__':
+    main()
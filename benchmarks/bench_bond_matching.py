@@ -0,0 +1,151 @@
+'''
+### 채권 매수/매도 매칭 벤치마크
+매수 한 건마다 `query`와 매매 기록 계산을 반복하던 기존 매칭과
+선입선출 정렬 병합(`BondHelper.get_merged_result`)을 합성 주문으로 비교함.
+기존 방식은 느려서 일부 주문으로만 재고 전체 규모로 환산함
+
+    $ python -m benchmarks.bench_bond_matching --orders 50000 --bonds 500
+'''
+import argparse
+import os
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from owlman.bond_engine import as_datetime
+from benchmarks.kis_stub import KISStubServer
+
+
+def synthetic_orders(n_orders, n_bonds, seed=0) -> tuple:
+    '''
+    #### 합성 채권 주문 `(매수, 매도)`
+    종목마다 매수와 (일부 또는 전부를 나눠 파는) 매도가 번갈아 나옴
+    '''
+    rng = np.random.default_rng(seed)
+    codes = np.array([f'KR{i:010d}' for i in range(n_bonds)])
+    code = codes[rng.integers(0, n_bonds, n_orders)]
+    start = np.datetime64(f'{pd.Timestamp.today().year - 3}-01-01')
+    dates = start + rng.integers(0, 900, n_orders).astype('timedelta64[D]')
+    side = np.where(rng.random(n_orders) < 0.5, '02', '01')
+    qty = rng.integers(1, 100, n_orders)
+    price = np.round(rng.uniform(960, 1010, n_orders), 2)
+    df = pd.DataFrame(dict(
+        주문일자=pd.to_datetime(dates), 매도매수구분코드=side,
+        상품유형코드='302', 상품번호=code, 상품명=code,
+        총체결수량=qty, 총체결금액=qty * price, 평균단가=price),
+        index=pd.Index([f'{i:08d}' for i in range(n_orders)],
+                       name='유일주문코드')).sort_values('주문일자')
+    return df.loc[df.매도매수구분코드 == '02'], df.loc[df.매도매수구분코드 == '01']
+
+
+def legacy_trade_record(cls, buy, sell, tax=False):
+    '''#### 기존 매수 한 건의 매매 기록 (수익률이 가장 높은 매도 한 건과 짝지음)'''
+    detail = cls(buy.iloc[0].상품번호)
+    engine = cls.get_engine([detail])
+    today = datetime.now().date()
+    sell = sell.reset_index()
+    m = pd.merge(buy, sell, on='상품번호')\
+        if len(sell) else pd.merge(buy, sell, on='상품번호', how='outer')
+    codes = m.상품번호.to_numpy()
+    m['매수수수료'] = engine.fees(
+        codes, as_datetime(m.주문일자_x), m.평균단가_x.to_numpy(float))
+    if len(sell):
+        m['매도수수료'] = engine.fees(
+            codes, as_datetime(m.주문일자_y), m.평균단가_y.to_numpy(float))
+        m['예상이표수익'] = engine.interest_between(
+            codes, as_datetime(m.주문일자_x),
+            as_datetime(m.주문일자_y), tax) / 10
+        m['예상매매수익'] = m.평균단가_y + m.예상이표수익 - m.평균단가_x\
+            - m.매수수수료 - m.매도수수료
+        m['예상매매수익률'] = m.예상매매수익 / m.평균단가_x * 365\
+            / (m.주문일자_y - m.주문일자_x).dt.days * 100
+    else:
+        m['매도수수료'] = 0
+        m['예상이표수익'] = engine.interest_between(
+            codes, as_datetime(m.주문일자_x), as_datetime(today), tax) / 10
+        if detail.expire_date < today: # 만기상환 시
+            m.평균단가_y = 1000
+            m.주문일자_y = detail.expire_date
+            m['예상매매수익'] = m.평균단가_y + m.예상이표수익\
+                - m.평균단가_x - m.매수수수료
+            m['예상매매수익률'] = m.예상매매수익 / m.평균단가_x * 365\
+                / (pd.Timestamp(detail.expire_date)
+                   - m.주문일자_x.dt.normalize()).dt.days * 100
+        else:
+            m['예상매매수익'] = 0
+            m['예상매매수익률'] = 0
+    m['만기일'] = detail.expire_date
+    result = m.sort_values('예상매매수익률', ascending=False).iloc[[0]]\
+        .loc[:, ['상품번호', '상품명_x', '만기일', '총체결수량_x',
+                 '주문일자_x', '평균단가_x', '유일주문코드', '주문일자_y',
+                 '평균단가_y', '예상이표수익', '예상매매수익', '예상매매수익률']]
+    result.columns = ['상품번호', '상품명', '만기일', '보유수량',
+                      '매수일자', '매수단가', '매도주문코드', '매도일자',
+                      '매도단가', '이표수익', '매매수익', '매매수익률']
+    return result
+
+
+def legacy_merged_result(cls, buy_bond, sell_bond, tax=False):
+    records = []
+    for i in range(len(buy_bond)):
+        b = buy_bond.iloc[[i]]
+        s = sell_bond.query(
+            f'상품번호 == "{b.iloc[0].상품번호}" &'\
+            f'주문일자 > "{b.iloc[0].주문일자.date()}" &'\
+            f'총체결수량 > 0')
+        r = legacy_trade_record(cls, b, s, tax)
+        if len(s) > 0:
+            sell_bond.loc[r.iloc[0].매도주문코드, '총체결수량'] -= r.iloc[0].보유수량
+        records.append(r)
+    return pd.concat(records)\
+            .reset_index(drop=True)\
+            .drop(columns=['매도주문코드'])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=50000)
+    parser.add_argument('--bonds', type=int, default=500)
+    parser.add_argument('--legacy-orders', type=int, default=1000)
+    args = parser.parse_args()
+    os.environ.setdefault('OWLMAN_HOME', tempfile.mkdtemp())
+    warnings.simplefilter('ignore')
+    from owlman.bond_helper import BondHelper
+
+    buy, sell = synthetic_orders(args.orders, args.bonds)
+    with KISStubServer() as server:
+        BondHelper.PATH = server.domain
+        BondHelper.prefetch(buy.상품번호.unique(), price=False)
+
+        start = time.perf_counter()
+        result = BondHelper.get_merged_result(buy, sell)
+        new = time.perf_counter() - start
+
+        small_buy, small_sell = synthetic_orders(
+            args.legacy_orders, args.bonds)
+        start = time.perf_counter()
+        legacy_merged_result(BondHelper, small_buy, small_sell.copy())
+        old = time.perf_counter() - start
+
+    # 기존 방식은 매수 건수에 비례하는 고정 비용 + 매도 건수에 비례하는 query 비용,
+    # 환산은 매수 건수 비례로만 해서 실제보다 작게 잡음
+    scale = len(buy) / max(len(small_buy), 1)
+    print(f'orders : {args.orders} ({len(buy)} buys, {len(sell)} sells, '
+          f'{args.bonds} bonds)')
+    print(f'legacy per-buy query   : {old:8.2f} s for {args.legacy_orders} '
+          f'orders (>= ~{old * scale:,.0f} s at full size)')
+    print(f'FIFO sort-merge        : {new:8.2f} s for {args.orders} orders '
+          f'({len(result)} lots)')
+    matched = result.loc[result.매도단가.notnull()
+                         & (result.매도일자 != result.만기일), '보유수량'].sum()
+    print('buy quantity conserved :',
+          result.보유수량.sum() == buy.총체결수량.sum(),
+          f'(sold {matched} of {sell.총체결수량.sum()})')
+
+
+if __name__ == '__main__':
+    main()
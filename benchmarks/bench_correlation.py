@@ -0,0 +1,83 @@
+'''
+### 상관계수/군집 엔진 벤치마크
+기존 방식(float64 `DataFrame.corr()` + 상관계수 행을 특성으로 한
+`AgglomerativeClustering`)과 `owlman.correlation`의 float32 엔진을
+종목 수별로 비교함 (시간, tracemalloc 최대 메모리)
+
+    $ python -m benchmarks.bench_correlation --sizes 500 2000 5000
+
+`--baseline-max`보다 큰 유니버스는 기존 군집을 건너뜀
+(상관계수 행 특성에 대한 ward는 O(n³)이라 5,000종목에서 수 분 걸림)
+'''
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from owlman.correlation import correlation, ClusterTree, RollingCorrelation
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[500, 2000, 5000])
+    parser.add_argument('--window', type=int, default=21)
+    parser.add_argument('--baseline-max', type=int, default=2000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    print(f'{"n":>6} {"step":<28} {"time (s)":>10} {"peak (MiB)":>11}')
+    for n in args.sizes:
+        factors = rng.normal(size=(args.window + 1, 20))
+        loadings = rng.normal(size=(20, n))
+        tr = np.abs(factors @ loadings + rng.normal(size=(args.window + 1, n)))\
+            * 100
+        tr[rng.random(tr.shape) < 0.01] = np.nan
+        window, new_row = tr[:-1], tr[-1]
+        rows = []
+
+        frame = pd.DataFrame(window)
+        old_corr, t, m = measure(frame.corr)
+        rows.append(('pandas corr (float64)', t, m))
+        if n <= args.baseline_max:
+            from sklearn.cluster import AgglomerativeClustering
+            _, t, m = measure(lambda: AgglomerativeClustering(10)
+                              .fit_predict(old_corr.fillna(0).values))
+            rows.append(('sklearn ward, n_clusters=10', t, m))
+            _, t, m = measure(lambda: AgglomerativeClustering(12)
+                              .fit_predict(old_corr.fillna(0).values))
+            rows.append(('sklearn ward, n_clusters=12', t, m))
+
+        corr, t, m = measure(lambda: correlation(window))
+        rows.append(('engine corr (float32)', t, m))
+        rolling, t, m = measure(
+            lambda: RollingCorrelation.from_values(window))
+        rows.append(('rolling init', t, m))
+        _, t, m = measure(lambda: rolling.append(new_row))
+        rows.append(('rolling append 1 bar', t, m))
+        corr = np.nan_to_num(corr)
+        tree, t, m = measure(lambda: ClusterTree(corr))
+        rows.append(('cached ward tree', t, m))
+        _, t, m = measure(lambda: tree.cut(10))
+        rows.append(('cut n_clusters=10', t, m))
+        _, t, m = measure(lambda: tree.cut(12))
+        rows.append(('cut n_clusters=12', t, m))
+        for name, t, m in rows:
+            print(f'{n:>6} {name:<28} {t:>10.3f} {m:>11.1f}')
+        err = np.nanmax(np.abs(old_corr.values - correlation(window)))
+        print(f'{n:>6} max |corr diff| vs pandas : {err:.2e}')
+
+
+if __name__ == '__main__':
+    main()
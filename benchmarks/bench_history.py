@@ -0,0 +1,86 @@
+'''
+### 장기 일봉 조회 벤치마크
+최근 30개 봉 조회(`get_daily_price`, 비동기 동시 조회)와
+1년 기간별시세를 구간으로 나눈 조회(`get_daily_history_many`)를 비교함.
+1년치를 저장소에 받아 둔 뒤의 매일 갱신(`HistoryStore.get_since`부터, 종목당 한 구간)도 잼
+
+    $ python -m benchmarks.bench_history --symbols 200 --latency 0.05
+
+스텁 서버는 시세 조회마다 latency초 늦게 응답함 (실제 API 왕복 시간 흉내)
+'''
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+
+from owlman.kis_trading import KISTrading
+from owlman.async_kis_trading import AsyncKISTrading, run_sync
+from owlman.history_store import HistoryStore
+from owlman.throttle import Throttle
+from benchmarks.kis_stub import KISStubServer, KISStubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=24)
+    parser.add_argument('--rate', type=float, default=1e6)
+    args = parser.parse_args()
+    symbols = [f'{i:06d}' for i in range(args.symbols)]
+    end = date.today()
+    start = end - timedelta(days=args.days)
+    start, end = start.strftime('%Y%m%d'), end.strftime('%Y%m%d')
+    KISStubHandler.latency = args.latency
+
+    with KISStubServer() as server:
+        client = KISTrading('appkey', 'appsecret', '00000000', '01',
+                            access_token='stub-token',
+                            pool_size=args.workers,
+                            throttle=Throttle(rate=args.rate))
+        client.domain = server.domain
+
+        t = time.perf_counter()
+        recent = run_sync(AsyncKISTrading(client, args.workers)
+                          .get_daily_price_dict(symbols))
+        t_recent = time.perf_counter() - t
+        requests = client.throttle.stats['requests']
+
+        t = time.perf_counter()
+        for symbol in symbols[:10]:
+            for chunk in client.get_chart_chunks(start, end):
+                client.get_daily_chart(symbol, *chunk)
+        t_serial = (time.perf_counter() - t) / 10 * len(symbols)
+
+        t = time.perf_counter()
+        history = client.get_daily_history_many(symbols, start, end)
+        t_history = time.perf_counter() - t
+        chunks = len(client.get_chart_chunks(start, end))
+
+        with tempfile.TemporaryDirectory() as root:
+            store = HistoryStore(root)
+            store.update(history)
+            requests = client.throttle.stats['requests']
+            t = time.perf_counter()
+            since = store.get_since(symbols, start)
+            client.get_daily_history_many(
+                list(since), min(since.values()).strftime('%Y%m%d'), end)
+            t_refresh = time.perf_counter() - t
+            requests = client.throttle.stats['requests'] - requests
+
+    bars = sum(len(df) for df in history.values())
+    print(f'universe : {args.symbols} symbols, latency {args.latency}s, '
+          f'{args.workers} workers')
+    print(f'recent 30 bars (async)          : {t_recent:7.2f} s '
+          f'({requests} requests, '
+          f'{sum(len(df) for df in recent.values())} bars)')
+    print(f'{args.days} days, serial chunks (est.) : {t_serial:7.2f} s')
+    print(f'{args.days} days, concurrent chunks     : {t_history:7.2f} s '
+          f'({chunks * args.symbols} requests, {bars} bars)')
+    print(f'{args.days} days, refresh from store    : {t_refresh:7.2f} s '
+          f'({requests} requests)')
+
+
+if __name__ == '__main__':
+    main()
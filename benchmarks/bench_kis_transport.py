@@ -0,0 +1,75 @@
+'''
+### KISTrading 전송 계층 벤치마크
+요청마다 새 커넥션을 여는 `requests.get` 방식과
+커넥션 풀 세션(`KISTrading.request`)의 요청당 지연 시간을 비교함
+
+    $ python -m benchmarks.bench_kis_transport -n 500
+
+로컬 스텁은 평문 HTTP라 TCP 핸드셰이크 비용만 포함됨.
+실제 API(9443, TLS)에서는 핸드셰이크 비용이 훨씬 커서 차이가 더 벌어짐.
+'''
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from owlman.kis_trading import KISTrading
+from owlman.throttle import Throttle
+from benchmarks.kis_stub import KISStubServer
+
+
+def per_request_ms(fn, symbols, threads):
+    start = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(threads) as ex:
+            list(ex.map(fn, symbols))
+    else:
+        for s in symbols:
+            fn(s)
+    return (time.perf_counter() - start) / len(symbols) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args()
+    symbols = [f'{i:06d}' for i in range(args.n)]
+
+    with KISStubServer() as server:
+        client = KISTrading('appkey', 'appsecret', '00000000', '01',
+                            access_token='stub-token',
+                            pool_size=max(args.threads, 1),
+                            throttle=Throttle(rate=1e6))
+        client.domain = server.domain
+        URL = f'{server.domain}/uapi/domestic-stock/v1/quotations/inquire-daily-price'
+        headers = client.get_headers('FHKST01010400')
+
+        def before(symbol):
+            # 기존 방식 : 모듈 수준 requests.get (매 요청 새 커넥션)
+            params = dict(FID_COND_MRKT_DIV_CODE='J', FID_INPUT_ISCD=symbol,
+                          FID_PERIOD_DIV_CODE='D', FID_ORG_ADJ_PRC=0)
+            return requests.get(URL, params=params, headers=headers).json()
+
+        def after(symbol):
+            return client.get_daily_price(symbol)
+
+        def after_raw(symbol):
+            params = dict(FID_COND_MRKT_DIV_CODE='J', FID_INPUT_ISCD=symbol,
+                          FID_PERIOD_DIV_CODE='D', FID_ORG_ADJ_PRC=0)
+            return client.request('GET', URL, params=params,
+                                  headers=headers).json()
+
+        before(symbols[0]), after(symbols[0])  # warm-up
+        b = per_request_ms(before, symbols, args.threads)
+        a = per_request_ms(after_raw, symbols, args.threads)
+        p = per_request_ms(after, symbols, args.threads)
+    print(f'requests.get (new connection) : {b:.3f} ms/request')
+    print(f'pooled session (transport)    : {a:.3f} ms/request')
+    print(f'pooled session (+ parsing)    : {p:.3f} ms/request')
+    print(f'transport speed-up            : {b / a:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+'''
+### compact 모드 메모리 비교
+합성 유니버스(ETF 목록, 종목별 일봉, 수년치 주문체결, 잔고)를 일반/compact 모드로
+파싱해서 보관하는 DataFrame/패널 메모리(`memory_usage(deep=True)`)를 비교함.
+종목별 일봉(history)은 패널을 만든 뒤 버리므로 파싱 중 최대치로만 보고 합계에서 뺌
+
+    $ python -m benchmarks.bench_memory --symbols 500 --days 750 --years 3
+'''
+import argparse
+import gc
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from owlman import schema
+from owlman.naver_finance import NaverFinance
+from owlman.price_panel import PricePanel
+from owlman.trading_helper import TradingHelper
+from benchmarks.kis_stub import daily_price_rows, order_rows
+
+
+def universe_rows(symbols) -> list:
+    '''### 네이버 ETF 목록 응답 모양'''
+    rng = np.random.default_rng(0)
+    return [dict(itemcode=s, etfTabCode=int(rng.integers(1, 8)),
+                 itemname=f'ETF {s}', nowVal=int(rng.integers(5000, 50000)),
+                 risefall=str(rng.choice([2, 3, 5])), changeVal=10,
+                 changeRate=round(rng.normal(), 2),
+                 nav=int(rng.integers(5000, 50000)),
+                 threeMonthEarnRate=round(rng.normal(0, 5), 2),
+                 quant=int(rng.integers(1e3, 1e7)),
+                 amonut=int(rng.integers(1, 1e5)),
+                 marketSum=int(rng.integers(50, 1e5)))
+            for s in symbols]
+
+
+def account_rows(symbols) -> list:
+    '''### 주식잔고 응답 모양'''
+    keys = [key for key, _, _ in schema.registry['TTTC8434R'].fields]
+    rows = []
+    for i, s in enumerate(symbols):
+        row = {k: str(i % 97) for k in keys}
+        row.update(pdno=s, prdt_name=f'ETF {s}', trad_dvsn_name='현금',
+                   pchs_avg_pric=f'{10000 + i}.1234', evlu_pfls_rt='1.23',
+                   evlu_erng_rt='1.23', fltt_rt='0.45', loan_dt='',
+                   expd_dt='', item_mgna_rt_name='20%',
+                   grta_rt_name='20%', stck_loan_unpr='0.00')
+        rows.append(row)
+    return rows
+
+
+def build(data, compact) -> dict:
+    '''### 응답 → 보관하는 프레임들 (history는 패널을 만들 때까지만 들고 있음)'''
+    daily, orders, account, etfs = data
+    history = {}
+    for symbol, rows in daily.items():
+        df = schema.decode('FHKST01010400', rows, compact=compact)\
+            .set_index('영업일자').sort_index()
+        history[symbol] = TradingHelper.compact_history(df) if compact else df
+    panel = PricePanel.from_history(
+        history, np.float32 if compact else np.float64)
+    universe = NaverFinance.parse_etf_item_list(etfs)
+    return dict(
+        universe=NaverFinance.to_compact(universe) if compact else universe,
+        history=history, panel=panel,
+        orders=schema.decode('TTTC8001R', orders, compact=compact),
+        account=schema.decode('TTTC8434R', account, compact=compact))
+
+
+def nbytes(value) -> int:
+    if isinstance(value, dict):
+        return sum(nbytes(v) for v in value.values())
+    if isinstance(value, PricePanel):
+        return value.nbytes
+    return int(value.memory_usage(deep=True).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--days', type=int, default=750)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--orders-per-day', type=int, default=20)
+    args = parser.parse_args()
+    symbols = [f'{i:06d}' for i in range(args.symbols)]
+    end = date(2026, 10, 16)
+    start = end - timedelta(days=365 * args.years)
+    data = ({s: daily_price_rows(s, args.days, end) for s in symbols},
+            order_rows(start.strftime('%Y%m%d'), end.strftime('%Y%m%d'),
+                       args.orders_per_day),
+            account_rows(symbols[:50]),
+            universe_rows(symbols))
+
+    results = {}
+    for compact in (False, True):
+        gc.collect()
+        t = time.perf_counter()
+        frames = build(data, compact)
+        seconds = time.perf_counter() - t
+        results[compact] = ({k: nbytes(v) for k, v in frames.items()},
+                            seconds)
+        del frames
+
+    print(f'universe : {args.symbols} ETFs x {args.days} days, '
+          f'{len(data[1])} orders, {len(data[2])} holdings')
+    print(f'{"":10s} {"normal":>10s} {"compact":>10s}')
+    (normal, n_sec), (compact, c_sec) = results.values()
+    mb = lambda n: f'{n / 2 ** 20:8.2f}MB'
+    for k in normal:
+        name = f'{k}*' if k == 'history' else k
+        print(f'{name:10s} {mb(normal[k])} {mb(compact[k])} '
+              f'({normal[k] / compact[k]:.1f}x)')
+    kept = lambda sizes: sum(v for k, v in sizes.items() if k != 'history')
+    print(f'{"total":10s} {mb(kept(normal))} {mb(kept(compact))} '
+          f'({kept(normal) / kept(compact):.1f}x)')
+    print(f'{"parse":10s} {n_sec:9.2f}s {c_sec:9.2f}s')
+    print('* 패널을 만든 뒤 버림 (합계 제외)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+'''
+### 여러 계좌 일괄 조회 벤치마크
+계좌마다 클라이언트를 따로 만들어 잔고/자산/주문체결과 보유 종목 시세를
+차례로 조회하는 것과 `MultiAccount`로 동시에 조회하는 것을 비교함
+
+    $ python -m benchmarks.bench_multi_account --accounts 6 --appkeys 2 --latency 0.05
+
+스텁 서버는 계좌/시세 조회마다 latency초 늦게 응답하고,
+계좌마다 10종목 중 5종목을 겹치게 보유함
+'''
+import argparse
+import time
+
+from owlman.kis_trading import KISTrading
+from owlman.multi_account import MultiAccount
+from owlman.throttle import Throttle
+from benchmarks.kis_stub import KISStubServer, KISStubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--accounts', type=int, default=6)
+    parser.add_argument('--appkeys', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--rate', type=float, default=15)
+    args = parser.parse_args()
+    accounts = {f'계좌{i}': (f'appkey{i % args.appkeys}', 'appsecret',
+                             f'{10000000 + i * 7919:08d}', '01')
+                for i in range(args.accounts)}
+    start, end = '20260901', '20261016'
+    KISStubHandler.latency = args.latency
+
+    with KISStubServer() as server:
+        KISTrading.domain = server.domain
+
+        t = time.perf_counter()
+        for appkey, appsecret, CANO, ACNT_PRDT_CD in accounts.values():
+            client = KISTrading(appkey, appsecret, CANO, ACNT_PRDT_CD,
+                                token_store=False,
+                                throttle=Throttle(rate=args.rate))
+            client.get_account_balance()
+            stock = client.get_stock_account()
+            client.get_daily_all_orders(start, end)
+            for symbol in stock.index:
+                client.get_daily_price(symbol)
+        serial = time.perf_counter() - t
+        serial_hits = sum(server.hits.values())
+        serial_tokens = server.hits['tokenP']
+        server.hits.clear()
+
+        t = time.perf_counter()
+        multi = MultiAccount(accounts, throttle=Throttle(rate=args.rate),
+                             token_store=False)
+        multi.get_account_balance()
+        multi.get_daily_all_orders(start, end)
+        prices = multi.get_holding_prices()
+        concurrent = time.perf_counter() - t
+        multi_hits = sum(server.hits.values())
+        multi_tokens = server.hits['tokenP']
+
+    print(f'{args.accounts} accounts, {args.appkeys} appkeys, '
+          f'latency {args.latency}s, rate {args.rate}/s (global)')
+    print(f'client per account, serial : {serial:6.2f} s '
+          f'({serial_hits} requests, {serial_tokens} tokens)')
+    print(f'MultiAccount, concurrent   : {concurrent:6.2f} s '
+          f'({multi_hits} requests, {multi_tokens} tokens, '
+          f'{len(prices)} unique symbols)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+'''
+### 리밸런싱 주문 벤치마크
+종목마다 하나씩 주문하는 것과 `Rebalancer`로 매도 → 매수를 동시에 주문하고
+체결을 일괄 조회하는 것을 비교함
+
+    $ python -m benchmarks.bench_rebalance --symbols 40 --latency 0.05
+
+스텁 서버는 주문마다 latency초 늦게 응답하고 바로 전량 체결함
+'''
+import argparse
+import time
+
+import pandas as pd
+
+from owlman.kis_trading import KISTrading
+from owlman.throttle import Throttle
+from owlman.rebalancer import Rebalancer
+from benchmarks.kis_stub import KISStubServer, KISStubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=10)
+    parser.add_argument('--rate', type=float, default=20)
+    args = parser.parse_args()
+    symbols = [f'{i:06d}' for i in range(args.symbols)]
+    half = args.symbols // 2
+    # 앞 절반은 전량 매도, 뒤 절반은 신규 매수
+    holdings = pd.DataFrame(
+        {'상품명': symbols[:half], '보유수량': 10, '현재가': 10000},
+        index=pd.Index(symbols[:half], name='상품번호'))
+    targets = pd.Series(100000, index=symbols[half:])
+    prices = pd.Series(10000, index=symbols)
+    KISStubHandler.latency = args.latency
+
+    with KISStubServer() as server:
+        client = KISTrading('appkey', 'appsecret', '00000000', '01',
+                            access_token='stub-token',
+                            pool_size=args.workers,
+                            throttle=Throttle(rate=args.rate))
+        client.domain = server.domain
+        rebalancer = Rebalancer(client, dry_run=False, workers=args.workers,
+                                poll_interval=0.1)
+        plan = rebalancer.get_plan(targets, holdings, prices)
+
+        start = time.perf_counter()
+        for symbol, row in plan.iterrows():
+            client.order_cash(symbol, row.주문수량,
+                              'sell' if row.구분 == '매도' else 'buy')
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = rebalancer.run(targets, holdings, prices)
+        concurrent = time.perf_counter() - start
+
+    print(f'orders : {len(plan)} ({half} sells, {len(plan) - half} buys), '
+          f'latency {args.latency}s, rate {args.rate}/s, '
+          f'{args.workers} workers')
+    print(f'one by one (no fill check)      : {serial:6.2f} s')
+    print(f'rebalancer (sells → buys, fills) : {concurrent:6.2f} s '
+          f'({(result.상태 == "체결").sum()} filled)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+'''
+### KIS 응답 디코딩 벤치마크
+딕셔너리 목록으로 DataFrame을 만든 뒤 컬럼명을 덮어쓰고 `astype`/`apply`로
+변환하던 방식과 스키마 디코더(`owlman.schema`)를 주문체결 응답으로 비교함
+
+    $ python -m benchmarks.bench_schema --rows 100000
+'''
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from owlman import schema
+from benchmarks.kis_stub import order_rows
+
+
+def legacy_decode(rows) -> pd.DataFrame:
+    df = pd.DataFrame(rows)
+    df.columns = schema.registry['TTTC8001R'].columns
+    df['유일주문코드'] = df.apply(
+        lambda x: "-".join([x.주문일자, x.주문번호]), axis=1)
+    df = df.astype({
+        '총체결수량': int, '총체결금액': int, '주문수량': int, '주문단가': int,
+        '취소확인수량': int, '잔여수량': int, '거부수량': int, '평균가': int})
+    return df
+
+
+def schema_decode(rows) -> pd.DataFrame:
+    df = schema.decode('TTTC8001R', rows)
+    df['유일주문코드'] = df.주문일자 + '-' + df.주문번호
+    return df
+
+
+def measure(func, rows) -> tuple:
+    '''#### 결과, 소요 시간, 최대 추가 메모리 (메모리는 따로 한 번 더 실행해서 측정)'''
+    start = time.perf_counter()
+    df = func(rows)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(rows)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return df, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+    per_day = 100
+    end = pd.Timestamp('20200101') + pd.Timedelta(
+        days=args.rows // per_day * 7 // 5 + 7)
+    rows = order_rows('20200101', end.strftime('%Y%m%d'), per_day)
+    rows = rows[:args.rows]
+
+    old, old_time, old_peak = measure(legacy_decode, rows)
+    new, new_time, new_peak = measure(schema_decode, rows)
+    print(f'rows : {len(rows)}')
+    print(f'legacy (columns + astype + apply) : {old_time * 1000:8.1f} ms, '
+          f'peak {old_peak / 2**20:6.1f} MiB')
+    print(f'schema decoder                    : {new_time * 1000:8.1f} ms, '
+          f'peak {new_peak / 2**20:6.1f} MiB '
+          f'({old_time / new_time:.1f}x)')
+    print('identical :', old[new.columns].equals(new))
+
+
+if __name__ == '__main__':
+    main()
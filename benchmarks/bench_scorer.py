@@ -0,0 +1,57 @@
+'''
+### 모멘텀 점수/위험 계산 벤치마크
+종목별 `rolling.apply` (`TradingHelper.get_score`, `get_risk`)와
+패널 일괄 계산(`PricePanel.momentum_score`, `PricePanel.risk`)을 비교함
+
+    $ python -m benchmarks.bench_scorer --symbols 1000 --days 250
+'''
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from owlman.trading_helper import TradingHelper
+from owlman.price_panel import PricePanel
+from benchmarks.synthetic import synthetic_history
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=250)
+    args = parser.parse_args()
+    history = synthetic_history(args.symbols, args.days)
+    periods = TradingHelper.periods
+    window = max(periods)
+
+    warnings.simplefilter('ignore', FutureWarning)
+    start = time.perf_counter()
+    tr = pd.concat({k: TradingHelper.get_tr(v, '종가', '고가', '저가')
+                    for k, v in history.items()}, axis=1).tail(window)
+    old_score = pd.Series({k: TradingHelper.get_score(v.종가)
+                           for k, v in history.items()})
+    old_risk = pd.Series({k: TradingHelper.get_risk(tr[k], v.종가)
+                          for k, v in history.items()})
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    panel = PricePanel.from_history(history)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    score = panel.momentum_score(periods)
+    risk = panel.risk(window, window)
+    new = time.perf_counter() - start
+
+    print(f'universe : {args.symbols} symbols x {args.days} days')
+    print(f'per-symbol rolling.apply : {old * 1000:9.1f} ms')
+    print(f'panel build              : {build * 1000:9.1f} ms')
+    print(f'panel batch scorer       : {new * 1000:9.1f} ms '
+          f'({old / new:.0f}x, {old / (build + new):.0f}x incl. build)')
+    print('identical score :', np.allclose(old_score.values, score))
+    print('identical risk  :', np.allclose(old_risk.values, risk))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+'''
+### 실시간 체결 틱 반영 벤치마크
+틱마다 전 종목 패널로 점수/위험을 다시 계산하는 것과
+`OnlineScorer.update`로 해당 종목만 갱신하는 것을 비교함
+
+    $ python -m benchmarks.bench_stream --symbols 500 --days 250 --ticks 20000
+'''
+import argparse
+import time
+
+import numpy as np
+
+from owlman.trading_helper import TradingHelper
+from owlman.price_panel import PricePanel
+from owlman.online_scorer import OnlineScorer
+from benchmarks.synthetic import synthetic_history
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--days', type=int, default=250)
+    parser.add_argument('--ticks', type=int, default=20000)
+    parser.add_argument('--groups', type=int, default=10)
+    args = parser.parse_args()
+    history = synthetic_history(args.symbols, args.days)
+    periods = TradingHelper.periods
+    window = max(periods)
+    panel = PricePanel.from_history(history)
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, args.groups, args.symbols)
+    symbols = list(history)
+    picks = rng.integers(0, args.symbols, args.ticks)
+    prices = 10000 + rng.integers(-500, 500, args.ticks)
+
+    n = min(args.ticks, 50)
+    start = time.perf_counter()
+    for _ in range(n):
+        panel.momentum_score(periods)
+        panel.risk(window, window)
+    batch = (time.perf_counter() - start) / n
+
+    scorer = OnlineScorer.from_panel(panel, periods, labels)
+    start = time.perf_counter()
+    for j, price in zip(picks.tolist(), prices.tolist()):
+        scorer.update(symbols[j], '20261019', price, price + 30, price - 30)
+    online = (time.perf_counter() - start) / args.ticks
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        scorer.ranking()
+    ranking = (time.perf_counter() - start) / 1000
+
+    print(f'universe : {args.symbols} symbols x {args.days} days, '
+          f'{args.ticks} ticks')
+    print(f'panel recompute per tick : {batch * 1e6:10.1f} us')
+    print(f'online update per tick   : {online * 1e6:10.1f} us '
+          f'({batch / online:.0f}x)')
+    print(f'group ranking            : {ranking * 1e6:10.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+'''
+### 파라미터 탐색 벤치마크
+
+    $ python -m benchmarks.bench_sweep --symbols 500 --days 750
+'''
+import argparse
+import time
+
+import pandas as pd
+
+from owlman.backtest import Backtester
+from owlman.sweep import ParameterSweep
+from owlman.price_panel import PricePanel
+from benchmarks.synthetic import synthetic_history
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--days', type=int, default=750)
+    parser.add_argument('--step', type=int, default=5)
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+
+    panel = PricePanel.from_history(
+        synthetic_history(args.symbols, args.days))
+    sweep = ParameterSweep(Backtester(panel, processes=args.processes))
+    grid = dict(n_clusters=[6, 8, 10, 12, 15], screen=[3, 4, 5],
+                limit=[0.01, 0.015, 0.02], buffer=[0, 1, 2],
+                periods=[(2, 3, 5, 8, 13, 21), (3, 8, 21), (5, 10, 20)])
+    start = time.perf_counter()
+    table = sweep.run(grid, step=args.step)
+    elapsed = time.perf_counter() - start
+    print(f'{len(table)} combinations : {elapsed:.1f} s '
+          f'({elapsed / len(table) * 1000:.0f} ms/combination)')
+    with pd.option_context('display.width', 200):
+        print(table.sort_values('연환산수익률', ascending=False).head(10))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,457 @@
+'''
+로컬 KIS API 스텁 서버
+벤치마크 및 모의 테스트용으로 실제 API와 같은 형태의 JSON을 응답함
+'''
+import json
+import collections
+import zlib
+import time
+import random
+import asyncio
+import threading
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+KST = timezone(timedelta(hours=9))
+
+
+def daily_price_rows(symbol, n=30, end=None):
+    '''### 일자별 시세 더미 데이터'''
+    end = end or date.today()
+    base = 10000 + int(symbol[-3:]) if symbol[-3:].isdigit() else 10000
+    rows = []
+    for i in range(n):
+        d = end - timedelta(days=i)
+        c = base + (d.toordinal() * 37) % 500 # 기간별시세와 같은 날은 같은 가격
+        rows.append(dict(
+            stck_bsop_date=d.strftime('%Y%m%d'),
+            stck_oprc=str(c - 20), stck_hgpr=str(c + 50),
+            stck_lwpr=str(c - 60), stck_clpr=str(c),
+            acml_vol=str(1000 + i), prdy_vrss_vol_rate='1.5',
+            prdy_vrss='10', prdy_vrss_sign='2', prdy_ctrt='0.10',
+            hts_frgn_ehrt='0.00', frgn_ntby_qty='0',
+            flng_cls_code='00', acml_prtt_rate='1.00'))
+    return rows
+
+
+ORDER_FIELDS = [
+    'ord_dt', 'ord_gno_brno', 'odno', 'orgn_odno', 'ord_dvsn_name',
+    'sll_buy_dvsn_cd', 'sll_buy_dvsn_cd_name', 'pdno', 'prdt_name',
+    'ord_qty', 'ord_unpr', 'ord_tmd', 'tot_ccld_qty', 'avg_prvs',
+    'cncl_yn', 'tot_ccld_amt', 'loan_dt', 'ordr_empno', 'ord_dvsn_cd',
+    'cncl_cfrm_qty', 'rmn_qty', 'rjct_qty', 'ccld_cndt_name',
+    'inqr_ip_addr', 'cpbc_ordp_ord_rcit_dvsn_cd',
+    'cpbc_ordp_infm_mthd_dvsn_cd', 'infm_tmd', 'ctac_tlno', 'prdt_type_cd',
+    'excg_dvsn_cd', 'cpbc_ordp_mtrl_dvsn_cd', 'ord_orgno', 'rsvn_ord_end_dt']
+
+
+def order_rows(start, end, per_day=3):
+    '''### 주식일별주문체결 더미 데이터 (평일마다 per_day건, 날짜 정순)'''
+    rows = []
+    day = date(int(start[:4]), int(start[4:6]), int(start[6:]))
+    stop = date(int(end[:4]), int(end[4:6]), int(end[6:]))
+    while day <= stop:
+        for i in range(per_day if day.weekday() < 5 else 0):
+            qty, price = 10 + i, 10000 + day.toordinal() % 1000
+            values = dict(
+                ord_dt=day.strftime('%Y%m%d'), odno=f'{i + 1:010d}',
+                sll_buy_dvsn_cd='02' if i % 2 else '01',
+                sll_buy_dvsn_cd_name='매수' if i % 2 else '매도',
+                pdno=f'{i:06d}', prdt_name=f'종목{i}',
+                ord_qty=str(qty), ord_unpr=str(price),
+                ord_tmd=f'09{i:02d}00', tot_ccld_qty=str(qty),
+                avg_prvs=str(price), tot_ccld_amt=str(qty * price),
+                cncl_cfrm_qty='0', rmn_qty='0', rjct_qty='0',
+                prdt_type_cd='300')
+            rows.append({k: values.get(k, '') for k in ORDER_FIELDS})
+        day += timedelta(days=1)
+    return rows
+
+
+def stock_rows(CANO, n=5):
+    '''### 주식잔고 더미 데이터 (계좌번호마다 다른 n종목, 계좌끼리 일부 겹침)'''
+    from owlman import schema
+    keys = [key for key, _, _ in schema.registry['TTTC8434R'].fields]
+    start = zlib.crc32(CANO.encode()) % 10
+    rows = []
+    for i in range(n):
+        symbol = f'{(start + i) % 10:06d}'
+        price = int(daily_price_rows(symbol, 1)[0]['stck_clpr'])
+        qty = 10 * (i + 1)
+        values = {k: '0' for k in keys}
+        values.update(
+            pdno=symbol, prdt_name=f'종목{symbol}', trad_dvsn_name='현금',
+            hldg_qty=str(qty), ord_psbl_qty=str(qty),
+            pchs_avg_pric=f'{price - 100}.0000', pchs_amt=str(qty * (price - 100)),
+            prpr=str(price), evlu_amt=str(qty * price),
+            evlu_pfls_amt=str(qty * 100), evlu_pfls_rt='1.00',
+            evlu_erng_rt='1.00', fltt_rt='0.10', loan_dt='', expd_dt='',
+            item_mgna_rt_name='', grta_rt_name='')
+        rows.append(values)
+    return rows
+
+
+def balance_rows(CANO):
+    '''### 투자계좌 자산현황 더미 데이터 (19개 자산 구분, 마지막이 합계)'''
+    stock = sum(int(r['evlu_amt']) for r in stock_rows(CANO))
+    cash = 1000000
+    amounts = [stock] + [0] * 15 + [cash, 0]
+    total = sum(amounts)
+    return [dict(pchs_amt=str(a), evlu_amt=str(a), evlu_pfls_amt='0',
+                 crdt_lnd_amt='0', real_nass_amt=str(a),
+                 whol_weit_rt=f'{a / total * 100:.2f}')
+            for a in amounts + [total]]
+
+
+def bond_schedule(code, today=None):
+    '''### 채권 이표 일정 더미 데이터 `(지급일자 목록, 지급이율, 만기일자)`'''
+    today = today or date.today()
+    h = zlib.crc32(code.encode())
+    start = date(today.year - 3, 1, 1) + timedelta(days=h % 300)
+    dates = [date(start.year + (start.month - 1 + 3 * i) // 12,
+                  (start.month - 1 + 3 * i) % 12 + 1, 1)
+             for i in range(4 * (1 + h % 5))]
+    return dates, 2 + (h % 50) / 10, dates[-1]
+
+
+HOLIDAYS = {'0101', '0301', '0505', '0606', '0815', '1003', '1009', '1225'}
+
+
+def holiday_rows(base, n=23):
+    '''### 국내휴장일 더미 데이터 (주말과 고정 공휴일 휴장, 기준일부터 n일)'''
+    day = date(int(base[:4]), int(base[4:6]), int(base[6:]))
+    rows = []
+    for i in range(n):
+        d = day + timedelta(days=i)
+        yn = 'N' if d.weekday() >= 5 or d.strftime('%m%d') in HOLIDAYS\
+            else 'Y'
+        rows.append(dict(
+            bass_dt=d.strftime('%Y%m%d'),
+            wday_dvsn_cd=f'{(d.weekday() + 1) % 7 + 1:02d}',
+            bzdy_yn=yn, tr_day_yn=yn, opnd_yn=yn, sttl_day_yn=yn))
+    return rows
+
+
+def chart_rows(symbol, start, end, limit=100):
+    '''### 기간별시세 더미 데이터 (평일 중 고정 공휴일 제외, 최근 limit개, 최신순)'''
+    first = date(int(start[:4]), int(start[4:6]), int(start[6:]))
+    last = date(int(end[:4]), int(end[4:6]), int(end[6:]))
+    base = 10000 + int(symbol[-3:]) if symbol[-3:].isdigit() else 10000
+    rows = []
+    day = last
+    while day >= first and len(rows) < limit:
+        if day.weekday() < 5 and day.strftime('%m%d') not in HOLIDAYS:
+            n = day.toordinal()
+            c = base + (n * 37) % 500
+            rows.append(dict(
+                stck_bsop_date=day.strftime('%Y%m%d'),
+                stck_clpr=str(c), stck_oprc=str(c - 20),
+                stck_hgpr=str(c + 50), stck_lwpr=str(c - 60),
+                acml_vol=str(1000 + n % 97), acml_tr_pbmn=str(c * 1000),
+                flng_cls_code='00', prtt_rate='0.00', mod_yn='N',
+                prdy_vrss_sign='2', prdy_vrss='10', revl_issu_reas=''))
+        day -= timedelta(days=1)
+    return rows
+
+
+class KISStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    latency = 0 # 시세/계좌 조회, 주문 응답 지연 (초)
+    fill_delay = 0 # 주문 후 전량 체결까지 걸리는 시간 (초, 그 전에는 절반만 체결)
+    reject = set() # 주문을 거부할 종목
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def count(self, path):
+        '''#### 경로(마지막 부분)별 요청 수 `server.hits`'''
+        with self.server.lock:
+            self.server.hits[path.rsplit('/', 1)[-1]] += 1
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.count(url.path)
+        if self.latency and ('/quotations/' in url.path
+                             or '/trading/' in url.path):
+            time.sleep(self.latency)
+        if url.path.endswith('/quotations/inquire-daily-itemchartprice'):
+            symbol = query.get('FID_INPUT_ISCD', '000000')
+            rows = chart_rows(symbol, query['FID_INPUT_DATE_1'],
+                              query['FID_INPUT_DATE_2'])
+            return self.send_json(dict(
+                rt_cd='0', msg_cd='MCA00000',
+                output1=dict(stck_shrn_iscd=symbol),
+                output2=rows or [{}]))
+        if url.path.endswith('/quotations/inquire-daily-price'):
+            symbol = query.get('FID_INPUT_ISCD', '000000')
+            return self.send_json(dict(
+                rt_cd='0', msg_cd='MCA00000',
+                output=daily_price_rows(symbol)))
+        if url.path.endswith('/quotations/chk-holiday'):
+            return self.send_json(dict(
+                rt_cd='0', msg_cd='MCA00000',
+                output=holiday_rows(query['BASS_DT'])))
+        if url.path.endswith('/trading/inquire-daily-ccld'):
+            return self.send_orders(query)
+        if url.path.endswith('/trading/inquire-balance'):
+            return self.send_json(dict(
+                rt_cd='0', msg_cd='MCA00000',
+                output1=stock_rows(query['CANO']), output2=[{}]))
+        if url.path.endswith('/trading/inquire-account-balance'):
+            return self.send_json(dict(
+                rt_cd='0', msg_cd='MCA00000',
+                output1=balance_rows(query['CANO']), output2={}))
+        self.send_json(dict(rt_cd='1', msg1='not found'), 404)
+
+    def send_orders(self, query, page_size=100):
+        '''
+        #### 주문체결 조회, page_size건씩 연속조회키로 나눠서 응답
+        스텁에 넣은 주문 중 조회 기간의 주문은 더미 데이터 뒤에 붙음
+        '''
+        rows = order_rows(query['INQR_STRT_DT'], query['INQR_END_DT'])
+        rows += [row for row in self.live_order_rows() if
+                 query['INQR_STRT_DT'] <= row['ord_dt'] <= query['INQR_END_DT']]
+        if query.get('INQR_DVSN') == '00':
+            rows.reverse()
+        offset = int(query.get('CTX_AREA_NK100') or 0)
+        page = rows[offset:offset + page_size]
+        more = offset + page_size < len(rows)
+        body = json.dumps(dict(
+            rt_cd='0', msg_cd='MCA00000', output1=page,
+            ctx_area_fk100='stub' if more else '',
+            ctx_area_nk100=str(offset + page_size) if more else '')).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('tr_cont', 'M' if more else 'D')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def live_order_rows(self) -> list:
+        '''#### 스텁에 넣은 주문의 현재 체결 상태 (fill_delay 전에는 절반만 체결)'''
+        now = time.time()
+        with self.server.lock:
+            orders = list(self.server.orders)
+        rows = []
+        for order in orders:
+            qty, price = order['qty'], order['price']
+            filled = qty if now - order['time'] >= self.fill_delay else qty // 2
+            values = dict(
+                ord_dt=order['date'], odno=order['odno'],
+                sll_buy_dvsn_cd=order['side'],
+                sll_buy_dvsn_cd_name='매수' if order['side'] == '02' else '매도',
+                pdno=order['symbol'], prdt_name=f'종목{order["symbol"]}',
+                ord_qty=str(qty), ord_unpr='0', ord_tmd=order['tmd'],
+                tot_ccld_qty=str(filled), avg_prvs=str(price),
+                tot_ccld_amt=str(filled * price), cncl_cfrm_qty='0',
+                rmn_qty=str(qty - filled), rjct_qty='0', prdt_type_cd='300')
+            rows.append({k: values.get(k, '') for k in ORDER_FIELDS})
+        return rows
+
+    def send_order(self, request):
+        '''#### 주식주문(현금), 접수한 주문은 `server.orders`에 남음'''
+        if self.latency:
+            time.sleep(self.latency)
+        tr_id = self.headers.get('tr_id')
+        symbol, qty = request.get('PDNO', ''), int(request.get('ORD_QTY') or 0)
+        if tr_id not in ('TTTC0801U', 'TTTC0802U'):
+            return self.send_json(dict(rt_cd='1', msg1='invalid tr_id'), 500)
+        if qty <= 0 or symbol in self.reject:
+            return self.send_json(dict(
+                rt_cd='1', msg_cd='APBK0918', msg1='주문이 거부되었습니다'))
+        now = datetime.now(KST)
+        with self.server.lock:
+            odno = f'{9000000001 + len(self.server.orders):010d}'
+            self.server.orders.append(dict(
+                odno=odno, symbol=symbol, qty=qty, time=time.time(),
+                side='01' if tr_id == 'TTTC0801U' else '02',
+                price=int(daily_price_rows(symbol, 1)[0]['stck_clpr']),
+                date=now.strftime('%Y%m%d'), tmd=now.strftime('%H%M%S')))
+        self.send_json(dict(
+            rt_cd='0', msg_cd='APBK0013', msg1='주문 전송 완료 되었습니다.',
+            output=dict(KRX_FWDG_ORD_ORGNO='06010', ODNO=odno,
+                        ORD_TMD=now.strftime('%H%M%S'))))
+
+    def send_bond(self, request):
+        '''#### 채권 발행정보/시세 (`BondHelper.PATH`를 스텁 주소로 바꿔서 사용)'''
+        code = request.get('bondCode', '')
+        dates, rate, expire = bond_schedule(code)
+        if '590401P02' in self.path:
+            body = dict(
+                bondProfitInfo={'반복데이타0': [
+                    dict(date=d.strftime('%Y%m%d'), rate=str(rate),
+                         amount=str(rate * 25)) for d in dates]},
+                bondMaster={'만기일자': expire.strftime('%Y%m%d')})
+        else:
+            body = None if expire < date.today() else dict(
+                tr1={'현재가': str(9800 + zlib.crc32(code.encode()) % 300)})
+        self.send_json(dict(body=body))
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = self.rfile.read(length)
+        self.count(self.path)
+        if self.path.endswith('/data.do'):
+            return self.send_bond(json.loads(payload or b'{}'))
+        if self.path.endswith('/trading/order-cash'):
+            return self.send_order(json.loads(payload or b'{}'))
+        if self.path.endswith('/oauth2/Approval'):
+            return self.send_json(dict(approval_key='stub-approval-key'))
+        if self.path.endswith('/oauth2/tokenP'):
+            return self.send_json(dict(
+                access_token='stub-token', token_type='Bearer',
+                expires_in=86400))
+        self.send_json(dict(rt_cd='1', msg1='not found'), 404)
+
+
+class KISStubServer:
+    '''
+    ### 백그라운드 스레드에서 도는 스텁 서버
+    `with KISStubServer() as server: client.domain = server.domain`
+    접수한 주문은 `server.orders`, 경로별 요청 수는 `server.hits`에 남음
+    '''
+    def __init__(self, handler=KISStubHandler, port=0):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.orders = []
+        self.httpd.lock = threading.Lock()
+        self.httpd.hits = collections.Counter()
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def domain(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def orders(self) -> list:
+        return self.httpd.orders
+
+    @property
+    def hits(self) -> collections.Counter:
+        return self.httpd.hits
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def tick_message(ticks, tr_id='H0STCNT0'):
+    '''### 실시간 체결가 메시지 `0|TR ID|건수|필드^...` (ticks : 46개 필드 dict 목록)'''
+    from owlman.quote_stream import FIELDS
+    payload = '^'.join(tick.get(k, '0') for tick in ticks for k in FIELDS)
+    return f'0|{tr_id}|{len(ticks):03d}|{payload}'
+
+
+class KISStubStream:
+    '''
+    ### 실시간 체결가 웹소켓 스텁 서버 (websockets 필요)
+    구독한 종목마다 임의 보행 체결가를 interval초마다 최대 batch건씩 묶어 보내고,
+    가끔 PINGPONG을 보냄. 보낸 틱은 `sent`에 `(종목, 날짜, 가격, 고가, 저가)`로 남음
+
+        with KISStubStream() as stream:
+            QuoteStream(client, codes, on_tick, ws_domain=stream.domain)
+    '''
+    def __init__(self, day=None, interval=0.001, batch=4, seed=0):
+        self.day = day or date.today().strftime('%Y%m%d')
+        self.interval = interval
+        self.batch = batch
+        self.random = random.Random(seed)
+        self.sent = []
+        self.pongs = 0
+        self.bars = {} # 종목 -> [시가, 고가, 저가, 현재가, 누적거래량]
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever,
+                                       daemon=True)
+
+    @property
+    def domain(self):
+        return f'ws://127.0.0.1:{self.port}'
+
+    def next_tick(self, symbol) -> dict:
+        base = 10000 + int(symbol[-3:]) if symbol[-3:].isdigit() else 10000
+        bar = self.bars.setdefault(symbol, [base, base, base, base, 0])
+        price = max(bar[3] + self.random.randint(-3, 3) * 5, 5)
+        volume = self.random.randint(1, 100)
+        bar[1], bar[2], bar[3] = max(bar[1], price), min(bar[2], price), price
+        bar[4] += volume
+        self.sent.append((symbol, self.day, price, bar[1], bar[2]))
+        return dict(MKSC_SHRN_ISCD=symbol, BSOP_DATE=self.day,
+                    STCK_CNTG_HOUR='093000', STCK_PRPR=str(price),
+                    STCK_OPRC=str(bar[0]), STCK_HGPR=str(bar[1]),
+                    STCK_LWPR=str(bar[2]), CNTG_VOL=str(volume),
+                    ACML_VOL=str(bar[4]))
+
+    async def handler(self, ws):
+        symbols = []
+        async def produce():
+            n = 0
+            while True:
+                await asyncio.sleep(self.interval)
+                if not symbols:
+                    continue
+                n += 1
+                if n % 100 == 0:
+                    await ws.send(json.dumps(dict(header=dict(
+                        tr_id='PINGPONG', datetime='20260101093000'))))
+                picks = [self.random.choice(symbols) for _ in
+                         range(self.random.randint(1, self.batch))]
+                await ws.send(tick_message(
+                    [self.next_tick(s) for s in picks]))
+        task = asyncio.ensure_future(produce())
+        try:
+            async for message in ws:
+                data = json.loads(message)
+                if data['header'].get('tr_id') == 'PINGPONG':
+                    self.pongs += 1
+                    continue
+                code = data['body']['input']['tr_key']
+                if data['header']['tr_type'] == '1':
+                    symbols.append(code)
+                elif code in symbols:
+                    symbols.remove(code)
+                await ws.send(json.dumps(dict(
+                    header=dict(tr_id=data['body']['input']['tr_id'],
+                                tr_key=code, encrypt='N'),
+                    body=dict(rt_cd='0', msg_cd='OPSP0000',
+                              msg1='SUBSCRIBE SUCCESS'))))
+        except Exception:
+            pass
+        finally:
+            task.cancel()
+
+    def __enter__(self):
+        import websockets
+        self.thread.start()
+        self.server = asyncio.run_coroutine_threadsafe(
+            self.start(websockets), self.loop).result()
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def start(self, websockets):
+        return await websockets.serve(self.handler, '127.0.0.1', 0)
+
+    def __exit__(self, *exc):
+        async def close():
+            self.server.close()
+            await self.server.wait_closed()
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
@@ -0,0 +1,52 @@
+'''
+합성 유니버스 데이터
+벤치마크용으로 `get_daily_price`와 같은 컬럼/dtype의 시세 dict를 만듦
+'''
+import numpy as np
+import pandas as pd
+
+
+def synthetic_history(n_symbols=1000, n_days=250, missing=0.02, seed=0,
+                      end='2026-10-16') -> dict:
+    '''### `{symbol: DataFrame}` (일부 종목은 날짜 결측 포함)'''
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=end, periods=n_days, name='영업일자')
+    history = {}
+    for i in range(n_symbols):
+        d = dates[rng.random(n_days) > missing] if i % 5 == 0 else dates
+        n = len(d)
+        drift = rng.normal(0.0003, 0.0005)
+        close = (10000 * np.exp(np.cumsum(
+            rng.normal(drift, 0.012, n)))).astype(int)
+        spread = rng.integers(0, 150, (2, n))
+        history[f'{i:06d}'] = pd.DataFrame({
+            '시가': close + rng.integers(-50, 50, n),
+            '고가': close + spread[0],
+            '저가': close - spread[1],
+            '종가': close,
+            '거래량': rng.integers(100, 100000, n).astype(str).astype(object),
+            '전일대비거래량비율': rng.random(n) * 100,
+            '전일대비': np.diff(close, prepend=close[0]),
+            '전일대비부호': np.full(n, '2', dtype=object),
+            '전일대비율': rng.normal(0, 1, n).round(2),
+            '외국인소진율': np.zeros(n),
+            '외국인순매수': np.zeros(n, dtype=int),
+            '락구분코드': np.full(n, '00', dtype=object),
+            '누적분할비율': np.ones(n),
+        }, index=d)
+    return history
+
+
+def synthetic_universe(symbols, seed=0) -> pd.DataFrame:
+    '''### `NaverFinance.get_etf_item_list` 모양의 유니버스'''
+    rng = np.random.default_rng(seed)
+    categories = ['국내 시장지수', '국내 업종/테마', '국내 파생',
+                  '해외 주식', '원자재', '채권', '기타']
+    n = len(symbols)
+    code = rng.integers(1, 8, n)
+    return pd.DataFrame({
+        '카테고리코드': code,
+        '종목명': [f'ETF {s}' for s in symbols],
+        '시가총액': rng.integers(100, 100000, n),
+        '카테고리': [categories[c - 1] for c in code],
+    }, index=pd.Index(symbols, name='종목코드'))
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from owlman.kis_trading import KISTrading
+from owlman.throttle import TokenBucket
+
+class AsyncKISTrading:
+    '''
+    ### KISTrading 비동기 클라이언트
+    * concurrency : 동시에 진행할 최대 요청 수
+    * rps : 이 클라이언트만의 초당 요청 수 예산 (공용 한도 위에 추가로 적용)
+
+    요청 자체는 KISTrading의 커넥션 풀 세션을 스레드에서 실행하므로
+    토큰, 헤더, 파싱 로직과 유량 제어(`Throttle`)는 동기 클라이언트와 공유함.
+    rps는 별도 버킷이라 `kis_client.throttle`을 같이 쓰는 다른 클라이언트의
+    한도는 바뀌지 않음
+    '''
+    def __init__(self, kis_client: KISTrading, concurrency=8, rps=None):
+        self.kis_client = kis_client
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rps) if rps else None
+        self.loop = None
+
+    def prepare(self):
+        '''#### 현재 이벤트 루프용 세마포어, 스레드 풀 준비'''
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            if self.loop is not None:
+                self.executor.shutdown(wait=False)
+            self.loop = loop
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+            self.executor = ThreadPoolExecutor(self.concurrency)
+
+    def call(self, func, *args):
+        '''#### 자체 예산 토큰을 받은 뒤 실행 (공용 한도는 `kis_client`에서 적용)'''
+        if self.bucket is not None:
+            self.bucket.acquire()
+        return func(*args)
+
+    async def run(self, func, *args):
+        self.prepare()
+        async with self.semaphore:
+            return await self.loop.run_in_executor(
+                self.executor, self.call, func, *args)
+
+    async def get_daily_price(self, symbol, period='D'):
+        '''#### 주식현재가 일자별 (비동기)'''
+        return await self.run(
+            self.kis_client.get_daily_price, symbol, period)
+
+    async def get_daily_price_many(self, symbols, period='D'):
+        '''
+        #### 여러 종목 일자별 시세를 동시 조회
+        완료되는 순서대로 `(symbol, df)`를 내보냄
+
+            async for symbol, df in client.get_daily_price_many(codes):
+                ...
+        '''
+        async def fetch(symbol):
+            return symbol, await self.get_daily_price(symbol, period)
+        tasks = [asyncio.ensure_future(fetch(s)) for s in symbols]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def get_daily_price_dict(self, symbols, period='D') -> dict:
+        '''#### 여러 종목 일자별 시세를 dict로 수집'''
+        return {s: df async for s, df
+                in self.get_daily_price_many(symbols, period)}
+
+def run_sync(coro):
+    '''
+    ### 코루틴을 동기적으로 실행
+    주피터처럼 이미 이벤트 루프가 도는 환경에서는 별도 스레드에서 실행함
+    '''
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    result = {}
+    def target():
+        try:
+            result['value'] = asyncio.run(coro)
+        except BaseException as ex:
+            result['error'] = ex
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
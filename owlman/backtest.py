@@ -0,0 +1,313 @@
+import time
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+import pandas as pd
+
+from owlman.price_panel import PricePanel, ewm_last
+from owlman.correlation import correlation, ward_linkage, cut_linkage,\
+    RollingCorrelation
+from owlman.shared_panel import SharedPanel, worker_arrays
+
+def get_date_tree(t, window, n_clusters=(), corr=None) -> dict:
+    '''
+    ### 특정 날짜(t)의 대상 종목과 연결 트리
+    t 이하 데이터만 사용하며, 최근 window일 True Range가 모두 있는 종목만 대상
+    * corr : 같은 창의 전 종목 상관계수 행렬 (`RollingCorrelation.corr()`),
+      없으면 대상 종목으로 새로 계산
+    * idx : 대상 종목 위치
+    * linkage : 상관계수 행렬에 대한 ward 연결 (AgglomerativeClustering과 같은 트리)
+    * labels : n_clusters별로 미리 자른 그룹 `{n_clusters: labels}`
+    '''
+    tr = worker_arrays['tr'][t - window + 1:t + 1]
+    close = worker_arrays['close']
+    valid = ~np.isnan(tr).any(axis=0)\
+        & ~np.isnan(close[t - window + 1:t + 1]).any(axis=0)
+    valid[valid] = tr[:, valid].std(axis=0) > 0
+    idx = np.flatnonzero(valid)
+    corr = correlation(tr[:, idx]) if corr is None else corr[np.ix_(idx, idx)]
+    Z = ward_linkage(corr) if len(idx) > 1 else None
+    tree = dict(t=t, window=window, idx=idx, linkage=Z)
+    tree['labels'] = {k: cut_groups(tree, k) for k in n_clusters}
+    return tree
+
+def get_date_trees(dates, window, n_clusters=()) -> list:
+    '''
+    ### 연속된 날짜들의 `get_date_tree`를 이동 상관계수로 이어서 계산
+    첫 날짜만 창 전체로 상관계수를 만들고 이후는 지난 날짜 이후 행만 추가함
+    (간격이 창 길이 이상이면 새로 만듦)
+    '''
+    tr = worker_arrays['tr']
+    rolling, last, trees = None, None, []
+    for t in dates:
+        if rolling is None or t - last >= window:
+            rolling = RollingCorrelation.from_values(
+                tr[t - window + 1:t + 1], window)
+        else:
+            for row in tr[last + 1:t + 1]:
+                rolling.append(row)
+        last = t
+        trees.append(get_date_tree(t, window, n_clusters, rolling.corr()))
+    return trees
+
+def add_scores(tree, periods, tr, close) -> dict:
+    '''
+    ### 연결 트리에 점수/위험을 붙인 날짜별 재료 (트리와 그룹은 공유)
+    * score, risk : `TradingHelper.get_score`, `get_risk`와 같은 정의
+      (위험의 ATR 기간은 트리의 창 길이)
+    '''
+    t, idx, window = tree['t'], tree['idx'], tree['window']
+    last = close[t, idx]
+    score = np.mean([last / close[t - p + 1, idx] for p in periods], axis=0)
+    risk = ewm_last(tr[t - window + 1:t + 1, idx], window) / last
+    return dict(tree, score=score, risk=risk)
+
+def get_date_features(t, periods, n_clusters=()) -> dict:
+    '''### 특정 날짜(t)의 그룹화/점수 재료 (창 길이는 max(periods))'''
+    tree = get_date_tree(t, max(periods), n_clusters)
+    return add_scores(tree, periods, worker_arrays['tr'],
+                      worker_arrays['close'])
+
+def cut_groups(features, n_clusters) -> np.ndarray:
+    '''### 캐시된 연결 트리를 n_clusters개 그룹으로 자르기'''
+    if n_clusters in features.get('labels', {}):
+        return features['labels'][n_clusters]
+    n = len(features['idx'])
+    if features['linkage'] is None:
+        return np.zeros(n, dtype=int)
+    return cut_linkage(features['linkage'], n_clusters)
+
+def select_entries(labels, score, risk, held, budget,
+                   screen, limit=0.015, buffer=1) -> tuple:
+    '''
+    ### 진입 종목과 금액 (`TradingHelper.get_screen_table`의 배열 버전)
+    * labels, score, risk, held : 대상 종목별 그룹, 점수, 위험, 보유 여부
+    * return : `(대상 종목 내 위치, 진입 금액)`
+    '''
+    if not len(score):
+        return np.array([], dtype=int), np.array([])
+    # 그룹별 최고 점수 종목 (동점이면 앞 종목)
+    order = np.lexsort((np.arange(len(score)), -score, labels))
+    first = np.r_[True, labels[order][1:] != labels[order][:-1]]
+    best = order[first]
+    group_held = np.bincount(labels, weights=held.astype(float),
+                             minlength=labels.max() + 1)[labels[best]] > 0
+    rank = np.argsort(-score[best], kind='stable')
+    best, group_held = best[rank], group_held[rank]
+    s = score[best]
+    threshold = lambda i: s[i] if i < len(s) else -np.inf
+    keep = (s > 1) & (s >= threshold(screen - 1 + buffer))
+    entry = np.floor(np.minimum(limit / risk[best], 1)
+                     * budget / screen / 100000) * 100000
+    new_candidate = screen - np.sum(keep & group_held)
+    own = np.sum(group_held)
+    enter = (keep & group_held)\
+        | (bool(new_candidate) & (s > threshold(own + new_candidate)))
+    return best[enter], entry[enter]
+
+class BacktestResult:
+    '''
+    ### 백테스트 결과
+    * equity : 일별 평가금액
+    * turnover : 리밸런싱일별 회전율 (매매금액 / 평가금액)
+    * holdings : 리밸런싱일별 종목 보유 금액
+    * exposure : 일별 투자 비중 (보유 금액 / 평가금액)
+    '''
+    def __init__(self, equity: pd.Series, turnover: pd.Series,
+                 holdings: pd.DataFrame, exposure: pd.Series=None):
+        self.equity = equity
+        self.turnover = turnover
+        self.holdings = holdings
+        self.exposure = exposure if exposure is not None\
+            else pd.Series(np.nan, index=equity.index, name='투자비중')
+
+    @property
+    def returns(self) -> pd.Series:
+        return self.equity.pct_change().fillna(0)
+
+    @property
+    def drawdown(self) -> pd.Series:
+        return self.equity / self.equity.cummax() - 1
+
+    def summary(self) -> dict:
+        years = max(len(self.equity) / 252, 1 / 252)
+        total = self.equity.iloc[-1] / self.equity.iloc[0]
+        return dict(
+            총수익률=total - 1,
+            연환산수익률=total ** (1 / years) - 1,
+            연환산변동성=self.returns.std() * np.sqrt(252),
+            최대낙폭=self.drawdown.min(),
+            평균회전율=self.turnover.mean(),
+            평균투자비중=self.exposure.mean(),
+            최대투자비중=self.exposure.max(),
+            리밸런싱=len(self.turnover),
+        )
+
+def simulate(features, close, dates, symbols,
+             n_clusters=10, screen=4, limit=0.015, buffer=1,
+             capital=1e8, keep_holdings=True) -> BacktestResult:
+    '''
+    ### 날짜별 재료로 보유 상태를 이어가며 매매 시뮬레이션
+    리밸런싱일 종가로 매매하고 다음 날부터 종가 수익률을 반영함.
+    진입 금액 합이 평가금액을 넘으면 비율대로 줄여서 현금이 음수가 되지 않게 함
+    * keep_holdings : 리밸런싱일별 보유 금액 기록 여부
+    '''
+    with np.errstate(invalid='ignore', divide='ignore'):
+        growth = np.nan_to_num(close[1:] / close[:-1], nan=1.0)
+    start, end = features[0]['t'], features[-1]['t']
+    by_date = {f['t']: f for f in features}
+    amounts = np.zeros(len(symbols))
+    cash = capital
+    equity, exposure, turnover, holdings = [], [], {}, {}
+    for t in range(start, len(dates)):
+        if t > start:
+            amounts *= growth[t - 1]
+        total = cash + amounts.sum()
+        f = by_date.get(t)
+        if f is not None and t <= end:
+            labels = cut_groups(f, n_clusters)
+            held = amounts[f['idx']] > 0
+            pick, entry = select_entries(
+                labels, f['score'], f['risk'], held, total,
+                screen, limit, buffer)
+            target = np.zeros_like(amounts)
+            invested = entry.sum()
+            if invested > total: # 레버리지 없이 평가금액 안에서만 진입
+                entry = entry * (total / invested)
+            target[f['idx'][pick]] = entry
+            turnover[dates[t]] = \
+                np.abs(target - amounts).sum() / total if total else 0
+            cash, amounts = total - target.sum(), target
+            if keep_holdings:
+                holdings[dates[t]] = pd.Series(
+                    entry, index=symbols[f['idx'][pick]])
+        equity.append(total)
+        exposure.append(amounts.sum() / total if total else 0)
+    return BacktestResult(
+        pd.Series(equity, index=dates[start:], name='평가금액'),
+        pd.Series(turnover, name='회전율'),
+        pd.DataFrame(holdings).T.fillna(0),
+        pd.Series(exposure, index=dates[start:], name='투자비중'))
+
+class Backtester:
+    '''
+    ### 클러스터 모멘텀 전략 백테스트
+    `TradingHelper`의 그룹화(`get_data_group`)와 진입 테이블(`get_screen_table`)을
+    과거 날짜마다 재현함. 날짜별 상관계수/연결 트리 계산은 공유 메모리의
+    가격 배열을 쓰는 프로세스 풀에서, 점수/위험과 보유 상태에 따라 달라지는
+    진입 판단은 순서대로 처리함
+    * rolling : 리밸런싱 간격이 창 길이의 1/4보다 짧으면 연속된 날짜 묶음마다
+      `RollingCorrelation`으로 상관계수를 이어서 갱신 (False면 날짜마다 새로 계산)
+
+        bt = Backtester.from_store(HistoryStore(), universe.index)
+        result = bt.run(n_clusters=10, screen=4, step=5)
+        result.summary()
+    '''
+    def __init__(self, panel: PricePanel, periods=(2, 3, 5, 8, 13, 21),
+                 processes=None, rolling=True):
+        self.panel = panel
+        self.periods = tuple(periods)
+        self.processes = processes or cpu_count()
+        self.rolling = rolling
+        self.tr = panel.true_range()
+
+    @classmethod
+    def from_store(cls, history_store, symbols, **kwargs):
+        '''#### 로컬 시세 저장소에서 패널을 만들어 생성'''
+        history = {k: v for k, v in history_store.load_many(symbols).items()
+                   if v is not None and len(v)}
+        return cls(PricePanel.from_history(history), **kwargs)
+
+    def get_dates(self, start=None, end=None, step=1,
+                  window=None) -> np.ndarray:
+        '''
+        #### 리밸런싱 날짜 위치 (첫 날짜는 변동성 창이 채워진 뒤)
+        * window : 변동성 창 길이 (기본 `max(self.periods)`)
+        '''
+        dates = self.panel.dates
+        first = max((window or max(self.periods)) - 1,
+                    dates.searchsorted(pd.Timestamp(start)) if start else 0)
+        last = dates.searchsorted(pd.Timestamp(end), 'right')\
+            if end else len(dates)
+        return np.arange(first, last, step)
+
+    def share(self) -> SharedPanel:
+        '''#### True Range와 종가를 공유 메모리에 올림 (`with`로 사용)'''
+        return SharedPanel(dict(tr=self.tr, close=self.panel.close))
+
+    def map(self, func, args: list, spec: dict=None) -> list:
+        '''
+        #### `func(*arg)`들을 공유 메모리 패널을 연결한 프로세스 풀에서 실행
+        * spec : 이미 올린 `share()`의 spec (없으면 이번만 올렸다가 내림)
+        '''
+        if spec is None:
+            with self.share() as shared:
+                return self.map(func, args, shared.spec)
+        if self.processes > 1 and len(args) > 1:
+            with Pool(self.processes, initializer=SharedPanel.attach,
+                      initargs=(spec,)) as p:
+                return p.starmap(
+                    func, args,
+                    chunksize=max(1, len(args) // (self.processes * 4)))
+        SharedPanel.attach(spec)
+        try:
+            return [func(*arg) for arg in args]
+        finally:
+            worker_arrays.clear()
+
+    def get_trees(self, dates, window, n_clusters=(), spec=None) -> list:
+        '''
+        #### 날짜별 대상 종목과 연결 트리를 프로세스 풀에서 계산
+        창 길이(window)가 같으면 periods가 달라도 그대로 재사용할 수 있음
+        '''
+        start_time = time.time()
+        n_clusters = tuple(n_clusters)
+        # 간격만큼 행을 추가하는 비용이 창 전체 재계산보다 충분히 작을 때만 이어서 갱신
+        # (묶음 안에서는 순서대로, 묶음끼리는 프로세스 풀에서 동시에)
+        if self.rolling and len(dates) > 1\
+                and np.diff(dates).max() * 4 < window:
+            chunks = np.array_split(dates, min(
+                len(dates), self.processes * 4 if self.processes > 1 else 1))
+            trees = sum(self.map(get_date_trees,
+                                 [(c, window, n_clusters) for c in chunks],
+                                 spec), [])
+        else:
+            trees = self.map(get_date_tree,
+                             [(t, window, n_clusters) for t in dates], spec)
+        print(f'Trees({len(dates)}) : {time.time() - start_time : .2f} seconds')
+        return trees
+
+    def get_features(self, dates, periods=None, n_clusters=(), spec=None,
+                     trees=None) -> list:
+        '''
+        #### 날짜별 재료 계산
+        * periods : 기본은 `self.periods`
+        * n_clusters : 미리 잘라둘 그룹 수 목록
+        * spec : 이미 올린 `share()`의 spec
+        * trees : 같은 날짜, 창 길이 `max(periods)`의 `get_trees` 결과
+          (주면 점수/위험만 계산)
+        '''
+        periods = tuple(periods or self.periods)
+        if trees is None:
+            trees = self.get_trees(dates, max(periods), n_clusters, spec)
+        return [add_scores(tree, periods, self.tr, self.panel.close)
+                for tree in trees]
+
+    def simulate(self, features, n_clusters=10, screen=4, limit=0.015,
+                 buffer=1, capital=1e8) -> BacktestResult:
+        '''#### 날짜별 재료로 매매 시뮬레이션 (`simulate` 참고)'''
+        return simulate(features, self.panel.close, self.panel.dates,
+                        self.panel.symbols, n_clusters, screen, limit,
+                        buffer, capital)
+
+    def run(self, n_clusters=10, screen=4, limit=0.015, buffer=1,
+            capital=1e8, start=None, end=None, step=5) -> BacktestResult:
+        '''
+        #### 백테스트 실행
+        * start, end : 리밸런싱 기간
+        * step : 리밸런싱 간격 (거래일)
+        '''
+        features = self.get_features(
+            self.get_dates(start, end, step), n_clusters=[n_clusters])
+        return self.simulate(features, n_clusters, screen, limit,
+                             buffer, capital)
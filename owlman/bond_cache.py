@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from owlman.storage import (owlman_home, FileLock, atomic_write,
+                            read_frame, write_frame, frame_path)
+
+class TTLCache:
+    '''
+    ### 만료 시간이 있는 LRU 캐시
+    * maxsize : 최대 항목 수 (넘으면 가장 오래 안 쓴 항목부터 제거)
+    * ttl : 항목 유효 시간 (초, None이면 만료 없음)
+    '''
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.items = OrderedDict() # key -> (저장 시각, 값)
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return default
+            if self.ttl is not None and time.time() - item[0] > self.ttl:
+                del self.items[key]
+                return default
+            self.items.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value):
+        with self.lock:
+            self.items[key] = (time.time(), value)
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def __len__(self):
+        return len(self.items)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+class BondCache:
+    '''
+    ### 채권 발행정보/시세 캐시
+    * root : 발행정보 저장 디렉터리 (기본 `~/.owlman/bonds`, False면 저장 안 함)
+    * maxsize : 메모리에 둘 종목 수
+    * price_ttl : 시세 유효 시간 (초)
+
+    이표 일정과 만기일은 바뀌지 않아서 디스크에 계속 보관하고,
+    시세는 메모리에만 짧게 보관함
+    '''
+    def __init__(self, root=None, maxsize=256, price_ttl=60):
+        self.root = root
+        self.issues = TTLCache(maxsize)
+        self.prices = TTLCache(maxsize, price_ttl)
+
+    @property
+    def directory(self) -> str:
+        '''#### 발행정보 저장 디렉터리 (처음 사용할 때 만듦)'''
+        if self.root is False:
+            return None
+        directory = self.root or owlman_home('bonds')
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.directory, 'meta.json')
+
+    def read_meta(self) -> dict:
+        if not self.directory or not os.path.exists(self.meta_path):
+            return {}
+        with open(self.meta_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_issue(self, code) -> tuple:
+        '''#### 디스크에 저장된 발행정보 `(이표 일정, 만기일)` (없으면 None)'''
+        expire_date = self.read_meta().get(code)
+        profit = read_frame(frame_path(self.directory, code))\
+            if expire_date else None
+        if profit is None:
+            return None
+        return profit, datetime.strptime(expire_date, '%Y%m%d').date()
+
+    def save_issue(self, code, issue):
+        profit, expire_date = issue
+        if not self.directory:
+            return
+        with FileLock(os.path.join(self.directory, '.lock')):
+            write_frame(frame_path(self.directory, code), profit)
+            meta = self.read_meta()
+            meta[code] = expire_date.strftime('%Y%m%d')
+            atomic_write(self.meta_path,
+                         json.dumps(meta, ensure_ascii=False).encode())
+
+    def get_issue(self, code, fetch) -> tuple:
+        '''
+        #### 발행정보 조회 (메모리 → 디스크 → `fetch()` 순)
+        * fetch : `(이표 일정, 만기일)`을 반환하는 조회 함수
+        '''
+        issue = self.issues.get(code)
+        if issue is None:
+            issue = self.load_issue(code)
+            if issue is None:
+                issue = fetch()
+                self.save_issue(code, issue)
+            self.issues.set(code, issue)
+        return issue
+
+    def get_price(self, code, fetch) -> float:
+        '''#### 현재가 조회 (유효 시간이 지났으면 `fetch()`로 다시 조회)'''
+        price = self.prices.get(code)
+        if price is None:
+            price = fetch()
+            self.prices.set(code, price)
+        return price
+
+    def clear(self):
+        '''#### 메모리 캐시 비우기 (디스크 발행정보는 유지)'''
+        self.issues.clear()
+        self.prices.clear()
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+FEE_DAYS = np.array([90, 365, 730])
+FEE_RATES = np.array([0.000052, 0.000152, 0.000252, 0.000352])
+TAX_RATE = 0.154
+DAY = np.timedelta64(1, 'D')
+
+def fee_rate(days) -> np.ndarray:
+    '''
+    ### 잔존일수별 채권수수료율
+    90일 미만 0.0052%, 365일 미만 0.0152%, 730일 미만 0.0252%, 이상 0.0352%
+    '''
+    return FEE_RATES[np.searchsorted(FEE_DAYS, days, 'right')]
+
+def as_datetime(values) -> np.ndarray:
+    '''### 날짜 값/배열을 datetime64[ns] 배열로'''
+    if isinstance(values, pd.Series):
+        values = values.to_numpy()
+    return np.asarray(pd.to_datetime(values), dtype='datetime64[ns]')
+
+def days_between(start, end) -> np.ndarray:
+    '''### `(end - start).days` (일 단위 내림)'''
+    return (end - start) // DAY
+
+def match_fifo(buy_codes, buy_dates, buy_qty,
+               sell_codes, sell_dates, sell_qty) -> tuple:
+    '''
+    ### 종목별 선입선출(FIFO) 매수/매도 매칭
+    종목, 날짜 순으로 정렬한 뒤 한 번 훑으면서 매도 수량을 매도일 전날까지의
+    가장 오래된 매수 잔량부터 배분함 (부분 체결은 여러 행으로 나뉨).
+    매수 잔량이 없는 매도 수량(조회 기간 이전 매수분)은 버림
+    * return : `(매수 위치, 매도 위치, 수량)` 배열, 매도되지 않은 잔량은 매도 위치 -1
+    '''
+    buy_codes, sell_codes = np.asarray(buy_codes), np.asarray(sell_codes)
+    buy_dates, sell_dates = as_datetime(buy_dates), as_datetime(sell_dates)
+    buy_qty, sell_qty = np.asarray(buy_qty), np.asarray(sell_qty)
+    codes, inverse = np.unique(np.r_[buy_codes, sell_codes],
+                               return_inverse=True)
+    bc, sc = inverse[:len(buy_codes)], inverse[len(buy_codes):]
+    b_order = np.lexsort((np.arange(len(bc)), buy_dates, bc))
+    s_order = np.lexsort((np.arange(len(sc)), sell_dates, sc))
+    b_bounds = np.searchsorted(bc[b_order], np.arange(len(codes) + 1))
+    s_bounds = np.searchsorted(sc[s_order], np.arange(len(codes) + 1))
+    buy_days = buy_dates.astype('datetime64[D]').astype(np.int64).tolist()
+    sell_days = sell_dates.astype('datetime64[D]').astype(np.int64).tolist()
+    sell_left = sell_qty.tolist()
+    lots_b, lots_s, lots_q = [], [], []
+    for k in range(len(codes)):
+        buys = b_order[b_bounds[k]:b_bounds[k + 1]].tolist()
+        left = buy_qty[buys].tolist()
+        head = opened = 0 # 가장 오래된 잔량 있는 매수, 매칭 대상에 들어온 매수 수
+        for j in s_order[s_bounds[k]:s_bounds[k + 1]].tolist():
+            while opened < len(buys)\
+                    and buy_days[buys[opened]] < sell_days[j]:
+                opened += 1
+            qty = sell_left[j]
+            while qty > 0 and head < opened:
+                take = min(qty, left[head])
+                if take > 0:
+                    lots_b.append(buys[head])
+                    lots_s.append(j)
+                    lots_q.append(take)
+                    left[head] -= take
+                    qty -= take
+                if left[head] <= 0:
+                    head += 1
+        for i, q in zip(buys, left):
+            if q > 0:
+                lots_b.append(i)
+                lots_s.append(-1)
+                lots_q.append(q)
+    lots_b, lots_s = np.array(lots_b, dtype=int), np.array(lots_s, dtype=int)
+    lots_q = np.array(lots_q, dtype=buy_qty.dtype)
+    order = np.lexsort((np.where(lots_s < 0, np.iinfo(int).max, lots_s), lots_b))
+    return lots_b[order], lots_s[order], lots_q[order]
+
+class BondEngine:
+    '''
+    ### 채권 매매 손익 배열 계산
+    * issues : `{상품번호: (이표 일정, 만기일)}` (`BondHelper.profit`, `expire_date`)
+
+    전 종목 이표 일정을 (종목, 지급일자) 순서의 정수 키 배열과 누적 지급액으로
+    만들어 두고, 기간 이자는 키 배열에서 `searchsorted` 두 번으로 구함
+    '''
+    SHIFT = 34 # 키 = 종목 위치 << SHIFT | epoch 초
+
+    def __init__(self, issues: dict):
+        self.codes = pd.Index(list(issues))
+        profits = [issues[code][0] for code in self.codes]
+        self.expire = as_datetime(
+            [issues[code][1] for code in self.codes]).reshape(-1)
+        bond = np.repeat(np.arange(len(profits)),
+                         [len(p) for p in profits])
+        dates = np.concatenate(
+            [as_datetime(p.index).reshape(-1) for p in profits]
+            + [np.array([], 'datetime64[ns]')])
+        amounts = np.concatenate(
+            [p.세전지급금액.to_numpy(float) for p in profits] + [[]])
+        keys = self.get_keys(bond, dates)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.cum = np.r_[0, np.cumsum(amounts[order])]
+
+    @classmethod
+    def get_keys(cls, bond, dates) -> np.ndarray:
+        seconds = dates.astype('datetime64[s]').astype(np.int64)
+        return (np.asarray(bond, dtype=np.int64) << cls.SHIFT)\
+            | np.clip(seconds, 0, (1 << cls.SHIFT) - 1)
+
+    def locate(self, codes) -> np.ndarray:
+        '''#### 상품번호 → 종목 위치'''
+        idx = self.codes.get_indexer(np.asarray(codes).reshape(-1))
+        if (idx < 0).any():
+            raise KeyError(f'이표 일정 없음 : '
+                           f'{list(np.asarray(codes).reshape(-1)[idx < 0])}')
+        return idx.reshape(np.shape(codes))
+
+    def expire_of(self, codes) -> np.ndarray:
+        '''#### 종목별 만기일 (datetime64)'''
+        return self.expire[self.locate(codes)]
+
+    def interest_between(self, codes, start, end, tax=False) -> np.ndarray:
+        '''
+        #### 기간 이자 (start < 지급일자 <= end 인 세전지급금액 합)
+        인자는 서로 브로드캐스트됨
+        '''
+        idx = self.locate(codes)
+        lo = np.searchsorted(self.keys, self.get_keys(idx, start), 'right')
+        hi = np.searchsorted(self.keys, self.get_keys(idx, end), 'right')
+        interest = np.where(hi > lo, self.cum[hi] - self.cum[lo], 0)
+        return interest * ((1 - TAX_RATE) if tax else 1)
+
+    def fees(self, codes, dates, prices) -> np.ndarray:
+        '''#### 매매 수수료 (단가 × 잔존일수별 수수료율)'''
+        expire = self.expire_of(codes)
+        days = days_between(dates.astype('datetime64[D]'), expire)
+        return prices * fee_rate(days)
+
+    def returns(self, codes, buy_dates, buy_prices,
+                sell_dates, sell_prices, tax=False) -> dict:
+        '''
+        #### 매수/매도 조건별 예상 손익 (`BondHelper.cal_earn_predict`와 같은 정의)
+        만기일 이후 매도(만기상환)는 매도수수료가 없음. 인자는 서로 브로드캐스트됨
+        * return : `{매수수수료, 매도수수료, 이표수익, 매매수익, 매매수익률}` 배열
+        '''
+        codes = np.asarray(codes)
+        buy_dates, sell_dates = as_datetime(buy_dates), as_datetime(sell_dates)
+        buy_prices = np.asarray(buy_prices, dtype=float)
+        sell_prices = np.asarray(sell_prices, dtype=float)
+        buy_fee = self.fees(codes, buy_dates, buy_prices)
+        sell_fee = np.where(self.expire_of(codes) <= sell_dates, 0,
+                            self.fees(codes, sell_dates, sell_prices))
+        coupon = self.interest_between(
+            codes, buy_dates, sell_dates, tax) / 10
+        profit = sell_prices + coupon - buy_prices - buy_fee - sell_fee
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = profit / buy_prices * 365\
+                / days_between(buy_dates, sell_dates) * 100
+        return dict(매수수수료=buy_fee, 매도수수료=sell_fee, 이표수익=coupon,
+                    매매수익=profit, 매매수익률=rate)
+
+    def surface(self, data: pd.DataFrame, dates, prices,
+                tax=False) -> pd.DataFrame:
+        '''
+        #### 매도일자 × 매도가격별 예상 수익률 표
+        * data : 보유 내역 (상품번호, 매수일자, 매수단가, 보유수량)
+        * dates : 가상 매도일자 목록
+        * prices : 가상 매도가격 목록 (시세 단위, 매도단가는 1/10)
+
+        종목이 여럿이면 매수금액(매수단가 × 보유수량) 가중 평균 수익률
+        '''
+        dates = as_datetime(dates).reshape(-1)
+        prices = np.asarray(prices, dtype=float).reshape(-1)
+        r = self.returns(
+            data.상품번호.to_numpy()[:, None, None],
+            as_datetime(data.매수일자).reshape(-1)[:, None, None],
+            data.매수단가.to_numpy(float)[:, None, None],
+            dates[None, :, None], prices[None, None, :] / 10, tax)
+        weights = (data.매수단가 * data.보유수량).to_numpy(float)
+        rate = np.tensordot(weights / weights.sum(), r['매매수익률'], axes=1)
+        return pd.DataFrame(rate, index=pd.DatetimeIndex(dates, name='매도일자'),
+                            columns=pd.Index(prices, name='매도가격'))
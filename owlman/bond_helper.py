@@ -1,36 +1,72 @@
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+import numpy as np
 import pandas as pd
 
 from owlman.kis_trading import KISTrading
+from owlman.bond_cache import BondCache
+from owlman.bond_engine import BondEngine, as_datetime, match_fifo
 
 class BondHelper:
     PATH='https://www.shinhansec.com/siw/wealth-management/bond-rp'
     발행정보='590401P02'
     상세시세='590401P03V02'
-    cache = {}
+    cache = BondCache()
+    session : requests.Session = None
+    timeout = (3.05, 10)
 
     def __init__(self, pd_no):
-        if pd_no not in self.cache:
-            # print(f'NEW : {pd_no}')
-            self.pd_no = pd_no
-            self.pd_no_json = dict(
-                bondCode=self.pd_no, cls=self.pd_no)
-            self.get_issue_info() # 발행정보
-            self.get_price_info() # 시세정보
-            self.cache[pd_no]\
-                = (self.profit, self.expire_date, self.current_price)
-        else:
-            profit, expire_date, current_price = self.cache.get(pd_no)
-            self.profit = profit
-            self.expire_date = expire_date
-            self.current_price = current_price
+        '''
+        발행정보(이표 일정, 만기일)는 `cache`의 메모리/디스크에서,
+        현재가는 조회 시점에 `cache.prices` 유효 시간 내 값을 사용함
+        '''
+        self.pd_no = pd_no
+        self.pd_no_json = dict(
+            bondCode=self.pd_no, cls=self.pd_no)
+        self.profit, self.expire_date = self.cache.get_issue(
+            pd_no, self.get_issue_info) # 발행정보
+
+    @property
+    def current_price(self) -> float:
+        '''#### 현재가 (시세정보, 유효 시간이 지나면 다시 조회)'''
+        return self.cache.get_price(self.pd_no, self.get_price_info)
+
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        '''#### 종목 간 공유하는 Keep-Alive 커넥션 풀 세션'''
+        if cls.session is None:
+            cls.session = KISTrading.create_session()
+        return cls.session
+
+    @classmethod
+    def prefetch(cls, codes, workers=8, price=True) -> list:
+        '''
+        ### 여러 종목의 발행정보/시세를 동시에 조회해서 캐시에 채움
+        * workers : 동시 요청 수
+        * price : 시세까지 조회할지 여부
+        '''
+        def fetch(code):
+            bond = cls(code)
+            if price:
+                bond.current_price
+            return bond
+        codes = list(dict.fromkeys(codes))
+        cls.get_session()
+        with ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(fetch, codes))
+
+    @classmethod
+    def get_engine(cls, bonds) -> BondEngine:
+        '''### 종목들의 이표 일정/만기일로 손익 계산 엔진 생성'''
+        return BondEngine({b.pd_no: (b.profit, b.expire_date) for b in bonds})
 
     def get_issue_info(self):
         '''### 발행정보'''
         URL = f'{self.PATH}/{self.발행정보}/data.do'
-        response = requests.post(URL, json=self.pd_no_json)
+        response = self.get_session().post(
+            URL, json=self.pd_no_json, timeout=self.timeout)
         data = response.json()
         body = data.get('body')
         # print(body)
@@ -44,85 +80,18 @@ class BondHelper:
         bondMaster = body.get('bondMaster')
         self.expire_date = datetime.strptime(
             bondMaster.get('만기일자'), '%Y%m%d').date()
+        return self.profit, self.expire_date
     
     def get_price_info(self):
         '''### 시세정보'''
         URL = f'{self.PATH}/{self.상세시세}/data.do'
-        response = requests.post(URL, json=self.pd_no_json)
+        response = self.get_session().post(
+            URL, json=self.pd_no_json, timeout=self.timeout)
         data = response.json()
         body = data.get('body')
         # 만기 시 시세정보 대응
-        self.current_price = float(
-            body.get('tr1').get('현재가')) if body else 1000
-
-    @classmethod
-    def cal_fee(cls, timedelta):
-        '''### 채권수수료'''
-        left_days = timedelta.days
-        if left_days < 90: return 0.000052  # 90일 미만 : 0.0052%
-        if left_days < 365: return 0.000152 # 90일 이상 ~ 365일 미만 : 0.0152%
-        if left_days < 730: return 0.000252 # 365일 이상 ~ 730일 미만 : 0.0252%
-        return 0.000352                     # 730일 이상 : 0.0352%
+        return float(body.get('tr1').get('현재가')) if body else 1000
 
-    def get_interest_between(self, start_dt, end_dt, tax=False):
-        '''### 기간 이자 계산'''
-        return self.profit.query(
-            f'"{start_dt}" < index <= "{end_dt}"')\
-            .세전지급금액.sum() * ((1 - 0.154) if tax else 1)
-
-    @classmethod
-    def get_trade_record(cls, buy, sell, tax=False):
-        '''매매 기록 조회'''
-        detail = cls(buy.iloc[0].상품번호)
-        today = datetime.now().date()
-        sell.reset_index(inplace=True)
-        m = pd.merge(buy, sell, on='상품번호')\
-            if len(sell) else pd.merge(buy, sell, on='상품번호', how='outer')
-        m['매수수수료'] = m.평균단가_x * m.주문일자_x.apply(
-            lambda x: cls.cal_fee((detail.expire_date - x.date())))
-        if len(sell):
-            m['매도수수료'] = m.평균단가_y * m.주문일자_y.apply(
-                lambda x: cls.cal_fee((detail.expire_date - x.date())))
-            m['예상이표수익'] = m.apply(
-              lambda x: detail.get_interest_between(
-                x.주문일자_x, x.주문일자_y, tax) / 10, axis=1)
-            m['예상매매수익'] = m.평균단가_y + m.예상이표수익 - m.평균단가_x - m.매수수수료 - m.매도수수료
-            m['예상매매수익률'] = m.예상매매수익 / m.평균단가_x * 365\
-                / (m.주문일자_y - m.주문일자_x).apply(lambda x: x.days) * 100
-        else:
-            m['매도수수료'] = 0
-            m['예상이표수익'] = m.apply(
-              lambda x: detail.get_interest_between(
-                x.주문일자_x, today, tax) / 10, axis=1)
-            if detail.expire_date < today: # 만기상환 시
-                m.평균단가_y = 1000
-                m.주문일자_y = detail.expire_date
-                m['예상매매수익'] = m.평균단가_y + m.예상이표수익 - m.평균단가_x - m.매수수수료
-                m['예상매매수익률'] = m.apply(
-                    lambda x: x.예상매매수익 / x.평균단가_x *365\
-                    / (x.주문일자_y - x.주문일자_x.date()).days * 100, axis=1)
-            else:
-                m['예상매매수익'] = 0
-                m['예상매매수익률'] = 0
-        m['만기일'] = detail.expire_date
-
-        # print(m.keys())
-        result = m.sort_values('예상매매수익률', ascending=False).copy()\
-                .iloc[[0]]\
-                .loc[:, ['상품번호', '상품명_x', '만기일', '총체결수량_x',
-                            '주문일자_x', '평균단가_x',
-                            '유일주문코드', '주문일자_y', '평균단가_y',
-                            '예상이표수익', '예상매매수익', '예상매매수익률',]]
-        result.columns = ['상품번호', '상품명', '만기일', '보유수량',
-                            '매수일자', '매수단가',
-                            '매도주문코드', '매도일자', '매도단가',
-                            '이표수익', '매매수익', '매매수익률',]
-        try:
-            result['매도일자'] = result['매도일자'].apply(lambda x: x.date())
-        except:
-            pass
-        return result
-    
     @classmethod
     def get_bond_trading_result(cls,
                                 kis_client: KISTrading,
@@ -136,21 +105,53 @@ class BondHelper:
     
     @classmethod
     def get_merged_result(cls, buy_bond, sell_bond, tax=False):
-        '''매수와 매도 기록 짝짓기'''
-        records = []
-        for i in range(len(buy_bond)):
-            b = buy_bond.iloc[[i]]
-            s = sell_bond.query(
-                f'상품번호 == "{b.iloc[0].상품번호}" &'\
-                f'주문일자 > "{b.iloc[0].주문일자.date()}" &'\
-                f'총체결수량 > 0')
-            r = cls.get_trade_record(b, s, tax)
-            if len(s) > 0:
-                sell_bond.loc[r.iloc[0].매도주문코드, '총체결수량'] -= r.iloc[0].보유수량
-            records.append(r)
-        return pd.concat(records)\
-                .reset_index(drop=True)\
-                .drop(columns=['매도주문코드'])
+        '''
+        매수와 매도 기록 짝짓기
+        종목별로 매도 수량을 가장 오래된 매수부터 선입선출로 배분하고
+        (부분 매도는 매수 한 건이 여러 행으로 나뉨), 남은 수량은 보유 중이거나
+        만기일이 지났으면 만기일에 1000원으로 상환된 것으로 계산함
+        '''
+        today = datetime.now().date()
+        buy_idx, sell_idx, qty = match_fifo(
+            buy_bond.상품번호, buy_bond.주문일자, buy_bond.총체결수량,
+            sell_bond.상품번호, sell_bond.주문일자, sell_bond.총체결수량)
+        buys = buy_bond.iloc[buy_idx]
+        codes = buys.상품번호.to_numpy()
+        engine = cls.get_engine(cls.prefetch(np.unique(codes), price=False))
+        expire = engine.expire_of(codes)
+        buy_dates = as_datetime(buys.주문일자)
+        buy_prices = buys.평균단가.to_numpy(float)
+        sold = sell_idx >= 0
+        redeemed = ~sold & (expire < as_datetime(today))
+        closed = sold | redeemed
+        sells = sell_bond.iloc[np.where(sold, sell_idx, 0)] if len(sell_bond)\
+            else None
+        sell_dates = np.where(sold, as_datetime(sells.주문일자), expire)\
+            if sells is not None else expire
+        sell_prices = np.where(sold, sells.평균단가.to_numpy(float), 1000)\
+            if sells is not None else np.full(len(codes), 1000.)
+        buy_fee = engine.fees(codes, buy_dates, buy_prices)
+        sell_fee = np.where(sold, engine.fees(codes, sell_dates, sell_prices), 0)
+        coupon = engine.interest_between(
+            codes, buy_dates,
+            np.where(sold, sell_dates, as_datetime(today)), tax) / 10
+        profit = sell_prices + coupon - buy_prices - buy_fee - sell_fee
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = profit / buy_prices * 365\
+                / ((sell_dates - buy_dates) // np.timedelta64(1, 'D')) * 100
+        return pd.DataFrame({
+            '상품번호': codes,
+            '상품명': buys.상품명.to_numpy(),
+            '만기일': pd.DatetimeIndex(expire).date,
+            '보유수량': qty,
+            '매수일자': buys.주문일자.to_numpy(),
+            '매수단가': buy_prices,
+            '매도일자': np.where(closed, pd.DatetimeIndex(sell_dates).date, pd.NaT),
+            '매도단가': np.where(closed, sell_prices, np.nan),
+            '이표수익': coupon,
+            '매매수익': np.where(closed, profit, 0),
+            '매매수익률': np.where(closed, rate, 0),
+        })
 
     @classmethod
     def cal_earn_predict(cls,
@@ -168,34 +169,38 @@ class BondHelper:
         df = data.copy()
         if name:
             df = df.loc[df.상품명 == name].copy()
+        bonds = cls.prefetch(df.상품번호, price=not (hold or price))
+        engine = cls.get_engine(bonds)
         if hold: # 만기 보유 시
-            df['매도일자'] = df.상품번호.apply(
-                lambda x: datetime.fromordinal(
-                    cls(x).expire_date.toordinal()))
+            df['매도일자'] = engine.expire_of(df.상품번호.to_numpy())
             df['매도단가'] = 1000
         else:
             if sell_date: # 만기 보유 테스트를 위한 일자 지정
                 df['매도일자'] = datetime.strptime(sell_date, '%Y%m%d')     
             else:
                 df['매도일자'] = datetime.now()
-            df['매도단가'] = df.상품번호.apply(
-                lambda x: price or cls(x).current_price).div(10)
-        df['매수수수료'] = df.apply(
-            lambda x: x.매수단가 * cls.cal_fee(
-                cls(x.상품번호).expire_date - x.매수일자.date()),
-            axis=1)
-        df['매도수수료'] = df.apply(
-            lambda x: 0 if pd.Timestamp(x.만기일) <= pd.Timestamp(x.매도일자)\
-                else x.매도단가 * cls.cal_fee(
-                cls(x.상품번호).expire_date - x.매도일자.date()),
-            axis=1)
-        df['이표수익'] = df.apply(
-              lambda x: cls(x.상품번호).get_interest_between(
-                x.매수일자, x.매도일자, tax) / 10, axis=1)
-        df['매매수익'] = df.매도단가 + df.이표수익 - df.매수단가 - df.매수수수료 - df.매도수수료
-        df['매매수익률'] = df.매매수익 / df.매수단가 * 365\
-            / (df.매도일자 - df.매수일자).apply(lambda x: x.days) * 100
-        df['매도일자'] = df['매도일자'].apply(lambda x: x.date()) 
-        df.drop(columns=['매수수수료', '매도수수료'], inplace=True)
+            current_price = {b.pd_no: price or b.current_price for b in bonds}
+            df['매도단가'] = df.상품번호.map(current_price).div(10)
+        r = engine.returns(df.상품번호.to_numpy(), df.매수일자, df.매수단가,
+                           df.매도일자, df.매도단가, tax)
+        df['이표수익'] = r['이표수익']
+        df['매매수익'] = r['매매수익']
+        df['매매수익률'] = r['매매수익률']
+        df['매도일자'] = df['매도일자'].dt.date
         result = df.sort_values('매매수익률', ascending=False).set_index('상품번호')
-        return result.query(f'매매수익률 > {screen}')
\ No newline at end of file
+        return result.query(f'매매수익률 > {screen}')
+
+    @classmethod
+    def get_return_surface(cls,
+                           data: pd.DataFrame,
+                           sell_dates,
+                           prices,
+                           tax = False) -> pd.DataFrame:
+        '''
+        ### 매도일자 × 매도가격별 예상 수익률 표
+        * data : 보유 내역 (`cal_earn_predict`의 data와 같은 형식)
+        * sell_dates : 가상 매도일자 목록 (예: `pd.date_range('20240601', '20241231')`)
+        * prices : 가상 매도가격 목록 (시세 단위)
+        '''
+        engine = cls.get_engine(cls.prefetch(data.상품번호, price=False))
+        return engine.surface(data, sell_dates, prices, tax)
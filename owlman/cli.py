@@ -0,0 +1,139 @@
+'''
+### owlman 서비스 CLI
+상주 서비스(`owlman.service`)를 띄우거나, 떠 있는 서비스에 조회만 함.
+조회 명령은 표준 라이브러리만 불러오므로 pandas 등을 import하지 않음
+
+    $ python -m owlman.cli serve --socket /tmp/owlman.sock --market-cap 500
+    $ python -m owlman.cli screen --socket /tmp/owlman.sock -p screen=5
+    $ python -m owlman.cli groups --port 8765
+
+serve 명령의 계좌 정보는 환경변수 `KIS_APPKEY`, `KIS_APPSECRET`,
+`KIS_CANO`, `KIS_ACNT_PRDT_CD`에서 읽음
+'''
+import os
+import sys
+import json
+import socket
+import argparse
+import unicodedata
+from http.client import HTTPConnection
+from urllib.parse import urlencode
+
+COMMANDS = {
+    'screen': '/screen_table',
+    'groups': '/data_group_table',
+    'bond': '/bond',
+    'predict': '/bond/predict',
+    'status': '/status',
+    'refresh': '/refresh',
+}
+
+class UnixHTTPConnection(HTTPConnection):
+    '''### Unix 소켓 HTTP 연결'''
+    def __init__(self, path, timeout=30):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+def request(path, params=None, method='GET', host='127.0.0.1', port=8765,
+            socket_path=None, timeout=30) -> dict:
+    '''### 서비스에 요청하고 JSON 응답 반환 (오류 응답은 예외)'''
+    conn = UnixHTTPConnection(socket_path, timeout) if socket_path\
+        else HTTPConnection(host, port, timeout=timeout)
+    try:
+        url = f'{path}?{urlencode(params)}' if params else path
+        conn.request(method, url)
+        res = conn.getresponse()
+        data = json.loads(res.read())
+    finally:
+        conn.close()
+    if res.status != 200:
+        raise Exception(f'({res.status}) {data.get("error")}')
+    return data
+
+def width(text) -> int:
+    '''### 터미널 표시 폭 (한글 등 전각 문자는 2칸)'''
+    return sum(2 if unicodedata.east_asian_width(c) in 'WF' else 1
+               for c in text)
+
+def format_table(data: dict) -> str:
+    '''### `orient='split'` JSON을 텍스트 표로'''
+    cell = lambda v: '' if v is None else\
+        f'{v:,}' if isinstance(v, int) and not isinstance(v, bool) else\
+        f'{v:,.3f}'.rstrip('0').rstrip('.') if isinstance(v, float) else\
+        str(v)[:10] if isinstance(v, str) and 'T00:00:00' in v else str(v)
+    rows = [[''] + [str(c) for c in data['columns']]]
+    rows += [[cell(i)] + [cell(v) for v in row]
+             for i, row in zip(data['index'], data['data'])]
+    widths = [max(width(r[k]) for r in rows) for k in range(len(rows[0]))]
+    pad = lambda text, n: ' ' * (n - width(text)) + text
+    return '\n'.join('  '.join(pad(text, n) for text, n in zip(row, widths))
+                     for row in rows)
+
+def serve(args):
+    '''### 서비스 실행 (여기서만 pandas, KISTrading 등을 불러옴)'''
+    from owlman.kis_trading import KISTrading
+    from owlman.order_store import OrderStore
+    from owlman.service import OwlmanService
+    kis_client = KISTrading(
+        os.environ['KIS_APPKEY'], os.environ['KIS_APPSECRET'],
+        os.environ['KIS_CANO'], os.environ.get('KIS_ACNT_PRDT_CD', '01'),
+        order_store=OrderStore(), compact=args.compact)
+    service = OwlmanService(
+        kis_client,
+        universe_options=dict(market_cap=args.market_cap,
+                              exclude_category=args.exclude_category,
+                              exclude_kwds=args.exclude_kwds,
+                              compact=args.compact),
+        helper_options=dict(n_clusters=args.n_clusters, screen=args.screen,
+                            limit=args.limit, buffer=args.buffer,
+                            history_days=args.history_days,
+                            compact=args.compact),
+        interval=args.interval, bond_days=args.bond_days)
+    service.start()
+    service.serve(args.host, args.port, args.socket)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='owlman')
+    parser.add_argument('command', choices=['serve', *COMMANDS])
+    parser.add_argument('--socket', help='Unix 소켓 경로 (없으면 TCP)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('-p', '--param', action='append', default=[],
+                        help='조회 파라미터 key=value (예: screen=5)')
+    parser.add_argument('--json', action='store_true', help='JSON 그대로 출력')
+    group = parser.add_argument_group('serve')
+    group.add_argument('--interval', type=float, default=600)
+    group.add_argument('--market-cap', type=int, default=0)
+    group.add_argument('--exclude-category', type=int, nargs='*', default=[])
+    group.add_argument('--exclude-kwds', nargs='*', default=[])
+    group.add_argument('--n-clusters', type=int, default=10)
+    group.add_argument('--screen', type=int, default=4)
+    group.add_argument('--limit', type=float, default=0.015)
+    group.add_argument('--buffer', type=int, default=1)
+    group.add_argument('--history-days', type=int)
+    group.add_argument('--bond-days', type=int)
+    group.add_argument('--compact', action='store_true',
+                       help='작은 dtype으로 응답/시세 보관 (메모리 절약)')
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        return serve(args)
+    params = dict(p.split('=', 1) for p in args.param)
+    try:
+        data = request(COMMANDS[args.command], params,
+                       'POST' if args.command == 'refresh' else 'GET',
+                       args.host, args.port, args.socket)
+    except Exception as ex:
+        print(ex, file=sys.stderr)
+        return 1
+    if args.json or 'columns' not in data:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+    else:
+        print(format_table(data))
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import numpy as np
+from scipy.cluster.hierarchy import linkage
+from scipy.linalg.blas import get_blas_funcs
+from scipy.spatial.distance import squareform
+
+def column_center(values, valid) -> np.ndarray:
+    '''### 열별 유효값 평균 (유효값이 없으면 0)'''
+    count = valid.sum(axis=0)
+    total = np.where(valid, values, 0).sum(axis=0)
+    return np.where(count > 0, total / np.maximum(count, 1), 0)
+
+def correlation(values: np.ndarray, dtype=np.float32, block=512) -> np.ndarray:
+    '''
+    ### 열 간 상관계수 행렬 (결측은 쌍별 제외, `DataFrame.corr()`와 같은 정의)
+    결측 마스크와 값에 대한 행렬곱으로 계산하며, 열 평균을 빼서 float32에서도
+    자릿수 손실을 줄이고 block개 행씩 나눠 계산해서 임시 메모리를 O(block·n)로 제한함
+    '''
+    values = np.asarray(values, dtype=dtype)
+    mask = ~np.isnan(values)
+    x = np.where(mask, values - column_center(values, mask), 0).astype(dtype)
+    xx = x * x
+    m = mask.astype(dtype)
+    corr = np.empty((values.shape[1], values.shape[1]), dtype)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for a in range(0, values.shape[1], block):
+            xa, ma = x[:, a:a + block], m[:, a:a + block]
+            n = ma.T @ m
+            si = xa.T @ m   # j가 있는 행에서 i의 합
+            sj = ma.T @ x   # i가 있는 행에서 j의 합
+            cov = xa.T @ x - si * sj / n
+            var = (xa * xa).T @ m - si * si / n
+            var *= ma.T @ xx - sj * sj / n
+            corr[a:a + block] = cov / np.sqrt(var)
+    corr[~np.isfinite(corr)] = np.nan
+    np.clip(corr, -1, 1, out=corr)
+    return corr
+
+def cut_linkage(Z: np.ndarray, n_clusters) -> np.ndarray:
+    '''
+    ### 연결 트리를 n_clusters개 그룹으로 자르기
+    처음 (n - n_clusters)번의 병합만 적용한 결과로 `cut_tree`와 같은 분할,
+    라벨은 종목 순서대로 처음 나온 그룹부터 0, 1, 2...
+    '''
+    n = len(Z) + 1
+    root = np.arange(2 * n - 1)
+    merges = Z[:max(n - n_clusters, 0), :2].astype(int)
+    for i in range(len(merges) - 1, -1, -1): # 위쪽 병합부터 내려가며 뿌리 전파
+        root[merges[i]] = root[n + i]
+    _, first, labels = np.unique(root[:n], return_index=True,
+                                 return_inverse=True)
+    order = np.argsort(np.argsort(first))
+    return order[labels]
+
+def ward_linkage(corr: np.ndarray) -> np.ndarray:
+    '''
+    ### 상관계수 행렬의 각 행을 특성으로 한 ward 연결
+    `AgglomerativeClustering(n_clusters).fit_predict(corr)`와 같은 트리를
+    행 간 유클리드 거리 행렬(행렬곱 한 번)에서 바로 만듦
+    '''
+    corr = np.asarray(corr, dtype=np.float32)
+    norms = (corr * corr).sum(axis=1)
+    d2 = norms[:, None] + norms[None, :] - 2 * (corr @ corr.T)
+    np.maximum(d2, 0, out=d2)
+    np.fill_diagonal(d2, 0)
+    np.sqrt(d2, out=d2)
+    condensed = squareform(d2, checks=False)
+    del d2
+    return linkage(condensed, 'ward')
+
+class ClusterTree:
+    '''
+    ### 캐시된 계층 군집 트리
+    연결은 한 번만 계산하고 그룹 수(n_clusters)별 자르기 결과도 캐시함
+    '''
+    def __init__(self, corr):
+        self.linkage = ward_linkage(corr) if len(corr) > 1 else None
+        self.size = len(corr)
+        self.cuts = {}
+
+    def cut(self, n_clusters) -> np.ndarray:
+        '''#### n_clusters개 그룹 라벨'''
+        if n_clusters not in self.cuts:
+            if self.linkage is None:
+                labels = np.zeros(self.size, dtype=int)
+            else:
+                labels = cut_linkage(self.linkage, n_clusters)
+            self.cuts[n_clusters] = labels
+        return self.cuts[n_clusters]
+
+class RollingCorrelation:
+    '''
+    ### 새 날짜가 추가될 때마다 갱신되는 이동 상관계수
+    * window : 창 길이 (날짜 수)
+    * n : 종목 수
+
+    창 안의 합/제곱합/곱의 합만 유지해서 날짜 하나 추가에 O(n²)으로 갱신함
+    (전체 재계산은 O(window·n²)). 창 안에 결측이 있는 종목의 상관계수는 NaN.
+    float32 누적 오차는 window번 갱신마다 창 데이터로 다시 계산해서 없앰
+    '''
+    def __init__(self, window, n, dtype=np.float32):
+        self.window = window
+        self.dtype = dtype
+        self.buffer = np.full((window, n), np.nan, dtype)
+        self.pos = 0 # 다음에 덮어쓸(가장 오래된) 행
+        self.recompute()
+
+    @classmethod
+    def from_values(cls, values, window=None, dtype=np.float32):
+        '''#### (날짜 × 종목) 배열의 마지막 window개 날짜로 생성'''
+        values = np.asarray(values, dtype=dtype)
+        window = window or len(values)
+        rolling = cls(window, values.shape[1], dtype)
+        rolling.buffer[window - min(window, len(values)):]\
+            = values[-window:]
+        rolling.recompute()
+        return rolling
+
+    def recompute(self):
+        '''#### 창 데이터로 누적값 다시 계산'''
+        valid = ~np.isnan(self.buffer)
+        self.center = column_center(self.buffer, valid).astype(self.dtype)
+        x = np.where(valid, self.buffer - self.center, 0).astype(self.dtype)
+        self.sx = x.sum(axis=0)
+        self.sxy = x.T @ x
+        self.missing = (~valid).sum(axis=0)
+        self.updates = 0
+
+    def shifted(self, row) -> tuple:
+        valid = ~np.isnan(row)
+        return np.where(valid, row - self.center, 0).astype(self.dtype), valid
+
+    def append(self, row):
+        '''#### 날짜 하나(종목별 값) 추가, 가장 오래된 날짜는 창에서 빠짐'''
+        row = np.asarray(row, dtype=self.dtype)
+        pos = self.pos
+        old, old_valid = self.shifted(self.buffer[pos])
+        new, new_valid = self.shifted(row)
+        self.sx += new - old
+        # 대칭 행렬이라 전치(F-order) 뷰에 rank-1 갱신을 제자리로 적용 (n×n 임시 배열 없음)
+        ger = get_blas_funcs('ger', (self.sxy,))
+        ger(1, new, new, a=self.sxy.T, overwrite_a=True)
+        ger(-1, old, old, a=self.sxy.T, overwrite_a=True)
+        self.missing += (~new_valid).astype(int) - (~old_valid).astype(int)
+        self.buffer[pos] = row
+        self.pos = (pos + 1) % self.window
+        self.updates += 1
+        if self.updates >= self.window:
+            self.recompute()
+
+    @property
+    def values(self) -> np.ndarray:
+        '''#### 창 데이터 (오래된 날짜부터)'''
+        return np.roll(self.buffer, -self.pos, axis=0)
+
+    def corr(self) -> np.ndarray:
+        '''#### 현재 창의 상관계수 행렬 (float32)'''
+        n = self.window
+        cov = self.sxy - np.outer(self.sx, self.sx) / n
+        var = np.diag(cov).copy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.sqrt(np.outer(var, var))
+        bad = (self.missing > 0) | (var <= 0)
+        corr[bad, :] = np.nan
+        corr[:, bad] = np.nan
+        np.clip(corr, -1, 1, out=corr)
+        return corr.astype(self.dtype, copy=False)
@@ -0,0 +1,178 @@
+import os
+import json
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from owlman.storage import (owlman_home, FileLock, atomic_write,
+                            read_frame, write_frame, frame_path)
+from owlman.trading_calendar import TradingCalendar
+
+KST = timezone(timedelta(hours=9))
+
+class HistoryStore:
+    '''
+    ### 일자별 시세(OHLCV) 로컬 저장소
+    * root : 저장 디렉터리 (기본 `~/.owlman/history`)
+    * close_time : 일봉이 확정되는 시각 (KST)
+    * calendar : 개장일 달력 (없으면 평일을 개장일로 봄)
+
+    종목별로 한 파일씩 `get_daily_price`의 컬럼과 dtype 그대로 저장하고,
+    마지막으로 확인한 영업일 이후 날짜만 새로 받아서 덧붙임.
+    시세는 수정주가로 받으므로 분할/배당락이 생기면 과거 봉 가격이 바뀌는데,
+    새로 받은 봉과 겹치는 저장된 봉의 가격이 다르면 전체를 다시 받아서 교체함
+    '''
+    price_columns = ['시가', '고가', '저가', '종가']
+
+    def __init__(self, root=None, close_time='15:40',
+                 calendar: TradingCalendar=None):
+        self.root = root or owlman_home('history')
+        os.makedirs(self.root, exist_ok=True)
+        self.close_time = close_time
+        self.calendar = calendar
+        self.meta_path = os.path.join(self.root, 'meta.json')
+
+    def path(self, symbol) -> str:
+        return frame_path(self.root, symbol)
+
+    def load(self, symbol) -> pd.DataFrame:
+        '''#### 저장된 시세 (없으면 None)'''
+        return read_frame(self.path(symbol))
+
+    def read_meta(self) -> dict:
+        if not os.path.exists(self.meta_path):
+            return {}
+        with open(self.meta_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def expected_last_date(self, now=None) -> pd.Timestamp:
+        '''
+        #### 현재 시점에 확정되어 있어야 하는 마지막 일봉 날짜
+        장 마감 전이면 전 영업일, 휴장일이면 직전 개장일
+        (달력이 없으면 주말만 휴장일로 봄)
+        '''
+        now = now or datetime.now(KST)
+        day = pd.Timestamp(now.date())
+        if now.strftime('%H:%M') < self.close_time:
+            day -= pd.Timedelta(days=1)
+        if self.calendar is not None:
+            return self.calendar.rollback(day)
+        while day.weekday() >= 5:
+            day -= pd.Timedelta(days=1)
+        return day
+
+    def get_stale(self, symbols, now=None) -> list:
+        '''
+        #### 새로 받아야 하는 종목
+        마지막 확인일이 확정 일봉 날짜보다 이전인 종목 (공휴일엔 확인일로 판단)
+        '''
+        expected = self.expected_last_date(now)
+        meta = self.read_meta()
+        return [s for s in symbols
+                if pd.Timestamp(meta.get(s, '1900-01-01')) < expected]
+
+    def merge(self, symbol, df: pd.DataFrame, now=None) -> pd.DataFrame:
+        '''
+        #### 새로 받은 시세 중 저장된 마지막 일봉 이후, 확정된 일봉만 덧붙여 저장
+        '''
+        expected = self.expected_last_date(now)
+        stored = self.load(symbol)
+        new = df.loc[df.index <= expected]
+        if stored is not None and len(stored):
+            last = stored.index[-1]
+            new = new.loc[new.index > last]
+            if len(new) and len(new) == len(df.loc[df.index <= expected]):
+                print(f'{symbol} : {last.date()} ~ {new.index[0].date()}'
+                      ' 사이 일봉이 누락되었을 수 있음')
+            merged = pd.concat([stored, new]) if len(new) else stored
+        else:
+            merged = new
+        if stored is None or len(new):
+            write_frame(self.path(symbol), merged)
+        return merged
+
+    def is_adjusted(self, symbol, df: pd.DataFrame, now=None) -> bool:
+        '''
+        #### 새로 받은 시세와 겹치는 저장된 일봉의 가격이 다른지 (수정주가 변경)
+        '''
+        stored = self.load(symbol)
+        if stored is None or df is None:
+            return False
+        df = df.loc[df.index <= self.expected_last_date(now)]
+        dates = stored.index.intersection(df.index)
+        columns = [c for c in self.price_columns
+                   if c in stored.columns and c in df.columns]
+        return bool((stored.loc[dates, columns].to_numpy()
+                     != df.loc[dates, columns].to_numpy()).any())
+
+    def rewrite(self, symbol, df: pd.DataFrame, now=None) -> pd.DataFrame:
+        '''
+        #### 저장된 일봉의 가격/거래량을 다시 받은 수정주가로 교체
+        저장된 컬럼과 dtype은 그대로 두고 겹치는 날짜의 값만 바꿈
+        '''
+        stored = self.load(symbol)
+        df = df.loc[df.index <= self.expected_last_date(now)]
+        dates = stored.index.intersection(df.index)
+        for c in self.price_columns + ['거래량']:
+            if c in stored.columns and c in df.columns:
+                stored.loc[dates, c] = df.loc[dates, c].astype(stored[c].dtype)
+        write_frame(self.path(symbol), stored)
+        return stored
+
+    def readjust(self, kis_client, symbols, now=None) -> list:
+        '''
+        #### 수정주가가 바뀐 종목의 저장된 기간 전체를 기간별시세로 다시 받아서 교체
+        * kis_client : `KISTrading` (`get_daily_history_many`로 구간을 나눠서 조회)
+        * return : 교체한 종목
+        '''
+        stored = self.load_many(symbols)
+        start = min(df.index[0] for df in stored.values())
+        end = datetime.now(KST) if now is None else now
+        history = kis_client.get_daily_history_many(
+            symbols, start.strftime('%Y%m%d'), end.strftime('%Y%m%d'),
+            calendar=self.calendar)
+        failed = [s for s, df in history.items() if df is None]
+        if failed: # 다음 갱신 때 다시 감지됨
+            print(f'수정주가 재조회 실패 ({len(failed)}) : {failed}')
+        for s, df in history.items():
+            if df is not None:
+                self.rewrite(s, df, now)
+        return [s for s in symbols if s not in failed]
+
+    def get_since(self, symbols, start, overlap=30) -> dict:
+        '''
+        #### start부터 저장된 종목의 다시 받을 시작일 (마지막 저장일 overlap일 전)
+        겹치게 받은 봉으로 수정주가 변경을 확인함. start가 휴장일일 수 있어서
+        첫 저장일이 start 이후 일주일 이내면 저장된 것으로 봄
+        * return : `{symbol: 시작일}` (저장되지 않은 종목은 빠짐)
+        '''
+        start = pd.Timestamp(start) + pd.Timedelta(days=7)
+        since = {}
+        for symbol, df in self.load_many(symbols).items():
+            if df is not None and len(df) and df.index[0] <= start:
+                since[symbol] = df.index[-1] - pd.Timedelta(days=overlap)
+        return since
+
+    def update(self, prices: dict, now=None, kis_client=None) -> dict:
+        '''
+        #### 여러 종목 시세를 병합하고 확인일 기록
+        * prices : `{symbol: get_daily_price 결과}` (None은 건너뜀)
+        * kis_client : 지정하면 수정주가가 바뀐 종목을 먼저 다시 받아서 교체
+        '''
+        if kis_client is not None:
+            adjusted = [s for s, df in prices.items()
+                        if self.is_adjusted(s, df, now)]
+            if adjusted:
+                print(f'ADJUSTED : {adjusted}')
+                self.readjust(kis_client, adjusted, now)
+        expected = str(self.expected_last_date(now).date())
+        merged = {s: self.merge(s, df, now)
+                  for s, df in prices.items() if df is not None}
+        with FileLock(self.meta_path + '.lock'):
+            meta = self.read_meta()
+            meta.update({s: expected for s in merged})
+            atomic_write(self.meta_path, json.dumps(meta).encode())
+        return merged
+
+    def load_many(self, symbols) -> dict:
+        return {s: self.load(s) for s in symbols}
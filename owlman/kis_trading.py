@@ -1,15 +1,51 @@
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 
+from owlman.throttle import Throttle
+from owlman.token_store import TokenStore
+from owlman.order_store import OrderStore, date_shards
+from owlman import schema
+
 class KISTrading:
     '''https://apiportal.koreainvestment.com/apiservice/'''
     domain = 'https://openapi.koreainvestment.com:9443'
+    ws_domain = 'ws://ops.koreainvestment.com:21000'
 
     def __init__(self,
                  appkey, appsecret, CANO, ACNT_PRDT_CD,
-                 access_token=None):
+                 access_token=None,
+                 pool_size=10, timeout=(3.05, 10),
+                 throttle: Throttle=None,
+                 token_store: TokenStore=None,
+                 order_store: OrderStore=None,
+                 compact=False,
+                 session: requests.Session=None):
+        '''
+        * access_token : 직접 지정 시 발급/갱신하지 않음
+        * token_store : 토큰 디스크 캐시 (기본 `TokenStore()`, False면 매번 발급)
+        * order_store : 마감일 주문체결 캐시 (기본 없음)
+        * compact : True면 시세/잔고/주문체결 응답에서 쓰지 않는 컬럼은 파싱하지
+          않고, 숫자는 int32/float32, 코드와 이름은 category로 받음
+          (`schema`의 compact 규칙)
+        * session : 다른 클라이언트와 공유할 세션 (기본 pool_size 커넥션 풀 새로 생성)
+        '''
         self.appkey = appkey
         self.appsecret = appsecret
+        self.timeout = timeout
+        self.throttle = throttle or Throttle()
+        self.session = session or self.create_session(pool_size)
+        self.token_store = TokenStore()\
+            if token_store is None else token_store
+        self.order_store = order_store
+        self.pool_size = pool_size
+        self.compact = compact
+        self.token_owner : KISTrading = None # 토큰을 빌려 쓰는 원본 클라이언트
+        self.token_expires_at = None
         if not access_token:
             self.access_token = self.get_access_token()
         else:
@@ -17,25 +53,110 @@ class KISTrading:
         self.CANO = CANO
         self.ACNT_PRDT_CD = ACNT_PRDT_CD
 
-    def get_access_token(self) -> str:
+    @classmethod
+    def create_session(cls, pool_size=10) -> requests.Session:
+        '''
+        #### Keep-Alive 커넥션 풀 세션
+        * pool_size : 호스트당 유지할 커넥션 수 (동시 요청 스레드 수에 맞춤)
+        * 풀이 가득 차면 새 커넥션을 만들지 않고 반환을 기다림 (pool_block)
+        '''
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              pool_block=True)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def request(self, method, URL, idempotent=True,
+                **kwargs) -> requests.Response:
+        '''
+        #### 공용 세션으로 요청
+        모든 엔드포인트는 이 메서드를 거쳐 커넥션을 재사용하고
+        `self.throttle`의 유량 제어와 재시도를 받음 (키 : TR ID 또는 경로)
+        * idempotent : False면 유량 제한 응답만 재시도 (주문)
+        '''
+        kwargs.setdefault('timeout', self.timeout)
+        key = (kwargs.get('headers') or {}).get('tr_id')\
+            or URL.replace(self.domain, '')
+        return self.throttle.call(
+            lambda: self.session.request(method, URL, **kwargs), key,
+            idempotent)
+
+    def issue_access_token(self) -> tuple:
         '''
         #### 접속 토큰 발급
+        * return : `(access_token, expires_at)` (만료 시각은 epoch 초)
         '''
         URL = f'{self.domain}/oauth2/tokenP'
         json = dict(
             grant_type='client_credentials',
             appkey=self.appkey,
             appsecret=self.appsecret)
+        res = self.request('POST', URL, json=json)
+        if res.status_code != 200:
+            err_msg = f'Request Error ({res.status_code}) : {res.text}'
+            raise Exception(err_msg)
+        data = res.json()
+        expires_in = int(data.get('expires_in') or 86400)
+        return data['access_token'], time.time() + expires_in
+
+    def get_approval_key(self) -> str:
+        '''
+        #### 실시간 (웹소켓) 접속키 발급
+        '''
+        URL = f'{self.domain}/oauth2/Approval'
+        json = dict(
+            grant_type='client_credentials',
+            appkey=self.appkey,
+            secretkey=self.appsecret)
+        res = self.request('POST', URL, json=json)
+        if res.status_code != 200:
+            err_msg = f'Request Error ({res.status_code}) : {res.text}'
+            raise Exception(err_msg)
+        return res.json()['approval_key']
+
+    def get_access_token(self) -> str:
+        '''
+        #### 접속 토큰 조회
+        토큰 저장소에 유효한 토큰이 있으면 재사용하고 없으면 발급함
+        '''
         try:
-            res = requests.post(URL, json=json)
-            if res.status_code != 200:
-                err_msg = f'Request Error ({res.status_code}) : {res.text}'
-                raise Exception(err_msg)
-            access_token = res.json()['access_token']
+            if self.token_store:
+                access_token, expires_at = self.token_store.get(
+                    self.appkey, self.issue_access_token, self.domain)
+            else:
+                access_token, expires_at = self.issue_access_token()
+            self.token_expires_at = expires_at
             return access_token
         except Exception as ex:
             print(type(ex), ex)
 
+    @property
+    def access_token(self) -> str:
+        '''#### 만료 임박 시 자동 갱신되는 접속 토큰'''
+        if self.token_owner is not None:
+            return self.token_owner.access_token
+        margin = self.token_store.margin if self.token_store else 3600
+        if self.token_expires_at\
+                and self.token_expires_at - margin < time.time():
+            self._access_token = self.get_access_token()
+        return self._access_token
+
+    @access_token.setter
+    def access_token(self, value):
+        self._access_token = value
+
+    def for_account(self, CANO, ACNT_PRDT_CD) -> 'KISTrading':
+        '''
+        #### 같은 appkey의 다른 계좌 클라이언트
+        토큰(갱신 포함), 세션, 유량 제어, 저장소를 이 클라이언트와 공유함
+        '''
+        client = copy.copy(self)
+        client.token_owner = self.token_owner or self
+        client.CANO = CANO
+        client.ACNT_PRDT_CD = ACNT_PRDT_CD
+        return client
+
     def get_headers(self, tr_id, tr_cont='') -> dict:
         return {
             'content-type': 'application/json; charset=utf-8',
@@ -65,23 +186,19 @@ class KISTrading:
             **self.default_params,
         )
         try:
-            res = requests.get(URL, params=params,
-                                    headers=self.get_headers('CTRP6548R'))
+            res = self.request('GET', URL, params=params,
+                               headers=self.get_headers('CTRP6548R'))
             if res.status_code != 200:
                 print(res.json())
                 err_msg = f'Request Error ({res.status_code}) : {res.text}'
                 raise Exception(err_msg)
             data = res.json()
-            columns = ['매입금액', '평가금액', '평가손익금액',
-                       '신용대출금액', '실제순자산금액', '전체비중율']
-            df = pd.DataFrame(data['output1'],)
-            df.columns = columns
+            df = schema.decode('CTRP6548R', data['output1'])
             df.index = [
                 '주식', '펀드/MMW', '채권', 'ELS/DLS', 'WRAP',
                 '신탁/퇴직연금/외화신탁', 'RP/발행어음', '해외주식', '해외채권',
                 '금현물', 'CD/CP', '단기사채', '타사상품', '외화단기사채',
                 '외화 ELS/DLS', '외화', '예수금+CMA', '청약자예수금', '<합계>']
-            df = df.astype('float')
             return df
         except Exception as ex:
             print(type(ex), ex)
@@ -103,26 +220,19 @@ class KISTrading:
             FUND_STTL_ICLD_YN='N', FNCG_AMT_AUTO_RDPT_YN='N',
             PRCS_DVSN='01', CTX_AREA_FK100='', CTX_AREA_NK100='')
         try:
-            res = requests.get(URL, params=params,
-                                    headers=self.get_headers('TTTC8434R'))
+            res = self.request('GET', URL, params=params,
+                               headers=self.get_headers('TTTC8434R'))
             if res.status_code != 200:
                 print(res.json())
                 err_msg = f'Request Error ({res.status_code}) : {res.content}'
                 raise Exception(err_msg)
             data = res.json()
-            df = pd.DataFrame(data['output1'],)
-            df.columns = [
-                '상품번호', '상품명', '매매구분명', '전일매수수량', '전일매도수량',
-                '금일매수수량', '금일매도수량', '보유수량', '주문가능수량',
-                '매입평균가격', '매입금액', '현재가', '평가금액', '평가손익금액',
-                '평가손익율', '평가수익율', '대출일자', '대출금액', '대주매각대금',
-                '만기일자', '등락율', '전일대비증감', '종목증거금율명',
-                '보증금율명', '대용가격', '주식대출단가']
+            df = schema.decode('TTTC8434R', data['output1'],
+                               compact=self.compact)
             df.set_index('상품번호', inplace=True)
-            df = df.astype({'보유수량': int, '매입평균가격': float,
-                '현재가': int, '평가손익금액': int})
-            return df.iloc[:, [0, 6, 8, 10, 12, 11]]\
-                    .loc[df.보유수량 > 0] if simple else df
+            return df.loc[df.보유수량 > 0,
+                          ['상품명', '보유수량', '매입평균가격', '현재가',
+                           '평가손익금액', '평가금액']] if simple else df
         except Exception as ex:
             print(type(ex), ex)
 
@@ -135,67 +245,214 @@ class KISTrading:
             FID_COND_MRKT_DIV_CODE='J', FID_INPUT_ISCD=symbol,
             FID_PERIOD_DIV_CODE=period, FID_ORG_ADJ_PRC=0)
         try:
-            res = requests.get(URL, params=params,
-                                    headers=self.get_headers('FHKST01010400'))
+            res = self.request('GET', URL, params=params,
+                               headers=self.get_headers('FHKST01010400'))
             if res.status_code != 200:
                 print(res.json())
                 err_msg = f'Request Error ({res.status_code}) : {res.content}'
                 raise Exception(err_msg)
             data = res.json()
-            df = pd.DataFrame(data.get('output'))
-            df.columns = [
-                '영업일자', '시가', '고가', '저가', '종가', '거래량',
-                '전일대비거래량비율', '전일대비', '전일대비부호', '전일대비율',
-                '외국인소진율', '외국인순매수', '락구분코드', '누적분할비율']
-            df['영업일자'] = pd.to_datetime(df['영업일자'], format='%Y%m%d')
-            df.set_index('영업일자', inplace=True)
-            df = df.astype({
-                '시가': int, '고가': int, '저가': int, '종가': int,
-                '전일대비거래량비율': float, '전일대비': int, '전일대비율': float,
-                '외국인소진율': float, '외국인순매수': int, '누적분할비율': float})\
-                .sort_index()
-            return df
+            df = schema.decode('FHKST01010400', data.get('output'),
+                               compact=self.compact)
+            return df.set_index('영업일자').sort_index()
         except Exception as ex:
             print(type(ex), ex)
     
+    def get_daily_chart(self, symbol, start, end, period='D', adjusted=True):
+        '''
+        #### 국내주식기간별시세 (한 번에 최대 100개 봉)
+        * start, end : 'YYYYMMDD'
+        * period : 'D'(일), 'W'(주), 'M'(월), 'Y'(년)
+        * adjusted : 수정주가 여부
+
+        '영업일자'(index), '종가', '시가', '고가', '저가', '거래량', '거래대금',
+        '락구분코드', '분할비율', '분할변경여부', '전일대비부호', '전일대비', '재평가사유코드'
+        '''
+        URL = f'{self.domain}/uapi/domestic-stock/v1/quotations/inquire-daily-itemchartprice'
+        params = dict(
+            FID_COND_MRKT_DIV_CODE='J', FID_INPUT_ISCD=symbol,
+            FID_INPUT_DATE_1=start, FID_INPUT_DATE_2=end,
+            FID_PERIOD_DIV_CODE=period, FID_ORG_ADJ_PRC=0 if adjusted else 1)
+        try:
+            res = self.request('GET', URL, params=params,
+                               headers=self.get_headers('FHKST03010100'))
+            if res.status_code != 200:
+                print(res.json())
+                err_msg = f'Request Error ({res.status_code}) : {res.content}'
+                raise Exception(err_msg)
+            data = res.json()
+            rows = [row for row in data.get('output2') or []
+                    if row.get('stck_bsop_date')] # 봉이 없으면 빈 dict가 옴
+            df = schema.decode('FHKST03010100', rows, compact=self.compact)
+            return df.set_index('영업일자').sort_index()
+        except Exception as ex:
+            print(type(ex), ex)
+
+    @classmethod
+    def get_chart_chunks(cls, start, end, bars=100, calendar=None) -> list:
+        '''
+        #### 기간을 요청당 최대 봉 수(bars) 이하 구간으로 나눔
+        * calendar : `TradingCalendar` (없으면 평일 수로 나눠서 구간이 조금 더 많아짐)
+        * return : `[(start, end), ...]` ('YYYYMMDD', 날짜 순)
+        '''
+        days = calendar.get_open_days(start, end) if calendar is not None\
+            else pd.bdate_range(start, end)
+        return [(days[i].strftime('%Y%m%d'),
+                 days[min(i + bars, len(days)) - 1].strftime('%Y%m%d'))
+                for i in range(0, len(days), bars)]
+
+    def get_daily_history_many(self, symbols, start, end, adjusted=True,
+                               calendar=None, workers=None) -> dict:
+        '''
+        #### 여러 종목 장기 일봉 (기간별시세를 구간으로 나눠서 동시 조회)
+        * start, end : 'YYYYMMDD' (30일 제한 없음)
+        * calendar : 구간 나누기에 쓸 `TradingCalendar`
+        * workers : 동시 요청 수 (기본 커넥션 풀 크기, 유량 제어는 `self.throttle` 공용)
+        * return : `{symbol: df}` (`get_daily_chart` 컬럼, 날짜 오름차순, 실패한 종목은 None)
+
+        전 종목 × 구간 요청을 한 스레드 풀에서 처리하고, 구간 경계에서
+        겹치는 봉은 뒤에 받은 구간 것을 남김
+        '''
+        chunks = self.get_chart_chunks(start, end, calendar=calendar)
+        tasks = [(symbol, chunk) for symbol in symbols for chunk in chunks]
+        fetch = lambda task: self.get_daily_chart(
+            task[0], *task[1], adjusted=adjusted)
+        with ThreadPoolExecutor(workers or self.pool_size) as executor:
+            frames = list(executor.map(fetch, tasks))
+        history = {symbol: [] for symbol in symbols}
+        for (symbol, _), df in zip(tasks, frames):
+            if history[symbol] is not None:
+                history[symbol] = None if df is None\
+                    else history[symbol] + [df]
+        for symbol, dfs in history.items():
+            if dfs is None:
+                continue
+            df = pd.concat(dfs) if dfs else schema.decode(
+                'FHKST03010100', [], compact=self.compact).set_index('영업일자')
+            df = df.loc[~df.index.duplicated(keep='last')]
+            if self.compact: # 구간마다 범주가 달라서 합치면 object로 풀림
+                df = schema.to_compact('FHKST03010100', df)
+            history[symbol] = df if df.index.is_monotonic_increasing\
+                else df.sort_index(kind='stable')
+        return history
+
+    def get_daily_history(self, symbol, start, end, adjusted=True,
+                          calendar=None, workers=None) -> pd.DataFrame:
+        '''
+        #### 종목 장기 일봉 (`get_daily_history_many` 한 종목)
+        '''
+        return self.get_daily_history_many(
+            [symbol], start, end, adjusted, calendar, workers)[symbol]
+
     def is_holiday(self, base_date):
         '''
         #### 국내휴장일조회
         '''
+        df = self.get_holiday_list(base_date)
+        if df is not None:
+            return df.영업일여부.eq('N').iloc[0]
+
+    def get_holiday_list(self, base_date) -> pd.DataFrame:
+        '''
+        #### 국내휴장일조회 (기준일자부터 응답에 담긴 날짜 전체)
+        '기준일자'(index), '요일구분코드', '영업일여부', '거래일여부', '개장일여부', '결제일여부'
+        '''
         URL = f'{self.domain}/uapi/domestic-stock/v1/quotations/chk-holiday'
         params = dict(
             BASS_DT=base_date,
             CTX_AREA_NK='', CTX_AREA_FK='')
         try:
-            res = requests.get(URL, params=params,
-                                    headers=self.get_headers('CTCA0903R'))
+            res = self.request('GET', URL, params=params,
+                               headers=self.get_headers('CTCA0903R'))
             if res.status_code != 200:
                 print(res.json())
                 err_msg = f'Request Error ({res.status_code}) : {res.content}'
                 raise Exception(err_msg)
             data = res.json()
-            df = pd.DataFrame(data.get('output'))
-            return df.bzdy_yn.eq('N').iloc[0]
+            return schema.decode('CTCA0903R', data.get('output'))\
+                .set_index('기준일자')
         except Exception as ex:
             print(type(ex), ex)
     
-    def get_daily_all_orders(self,
+    def iter_daily_orders(self,
             INQR_STRT_DT, INQR_END_DT,
             SLL_BUY_DVSN_CD='00', INQR_DVSN='01',
             PDNO='', CCLD_DVSN='01', simple=True):
-        orders = []
+        '''
+        #### 주식일별주문체결조회 페이지를 받는 대로 하나씩 반환 (generator)
+        연속조회키(ctx_area_fk100/nk100)를 따라가다가 마지막 페이지에서 멈추며,
+        페이지 조회에 실패하면 같은 페이지를 무한히 다시 요청하지 않고 예외를 냄
+        '''
         key1 = ''
         key2 = ''
         while True:
-            order, cont, key1, key2 = self\
-            .get_daily_order(
+            page = self.get_daily_order(
                 INQR_STRT_DT, INQR_END_DT,
                 SLL_BUY_DVSN_CD, INQR_DVSN,
                 PDNO, CCLD_DVSN, key1, key2, simple)
-            orders.append(order)
-            if cont == 'D' or cont == 'E':
-                return pd.concat(orders)
-            
+            if page is None:
+                raise Exception(
+                    f'주문체결 조회 실패 : {INQR_STRT_DT} ~ {INQR_END_DT}')
+            order, cont, next1, next2 = page
+            yield order
+            if cont not in ('F', 'M') or not (next1 or '').strip()\
+                    or (next1, next2) == (key1, key2):
+                return
+            key1, key2 = next1, next2
+
+    def get_order_store_key(self, SLL_BUY_DVSN_CD, INQR_DVSN,
+                            PDNO, CCLD_DVSN, simple) -> str:
+        return '-'.join([self.CANO, self.ACNT_PRDT_CD, SLL_BUY_DVSN_CD,
+                         INQR_DVSN, PDNO or 'all', CCLD_DVSN,
+                         'simple' if simple else 'full']
+                        + (['compact'] if self.compact else []))
+
+    def get_daily_all_orders(self,
+            INQR_STRT_DT, INQR_END_DT,
+            SLL_BUY_DVSN_CD='00', INQR_DVSN='01',
+            PDNO='', CCLD_DVSN='01', simple=True,
+            shard_days=None, workers=None):
+        '''
+        #### 기간 전체 주식일별주문체결조회
+        * shard_days : 지정 시 기간을 shard_days일 구간으로 나눠 동시에 조회
+          (유량 제어는 `self.throttle` 공용), 결과는 날짜 순서대로 합침
+        * workers : 동시 조회 구간 수 (기본 커넥션 풀 크기)
+
+        `order_store`가 있으면 저장된 마감일 주문은 저장소에서 읽고
+        나머지 구간만 조회해서 저장함
+        '''
+        args = (SLL_BUY_DVSN_CD, INQR_DVSN, PDNO, CCLD_DVSN, simple)
+        key = self.get_order_store_key(*args)
+        cached = None
+        if self.order_store:
+            cached = self.order_store.load(key, INQR_STRT_DT, INQR_END_DT)
+            ranges = self.order_store.get_missing(
+                key, INQR_STRT_DT, INQR_END_DT)
+        else:
+            ranges = [(INQR_STRT_DT, INQR_END_DT)]
+        shards = [shard for start, end in ranges
+                  for shard in (date_shards(start, end, shard_days)
+                                if shard_days else [(start, end)])]
+        fetch = lambda shard: pd.concat(
+            list(self.iter_daily_orders(*shard, *args)))
+        if len(shards) > 1:
+            with ThreadPoolExecutor(workers or self.pool_size) as executor:
+                orders = list(executor.map(fetch, shards))
+        else:
+            orders = [fetch(shard) for shard in shards]
+        if self.order_store:
+            for (start, end), order in zip(shards, orders):
+                self.order_store.save(key, order, start, end)
+        frames = [order for order in orders + [cached] if order is not None]
+        # 주문이 없던 구간은 저장소에 구간만 기록되고 파일이 없어서 합칠 게 없을 수 있음
+        df = pd.concat(frames) if frames\
+            else self.format_daily_order([], simple)
+        if self.compact: # 페이지마다 범주가 달라서 합치면 object로 풀림
+            df = schema.to_compact('TTTC8001R', df)
+        # 구간별 결과는 날짜가 겹치지 않아서 날짜로만 정렬해도 구간 내 순서가 유지됨
+        return df.sort_values('주문일자', ascending=INQR_DVSN == '01',
+                              kind='stable')
+
     def get_daily_order(self,
             INQR_STRT_DT, INQR_END_DT,
             SLL_BUY_DVSN_CD='00', INQR_DVSN='01',
@@ -210,7 +467,7 @@ class KISTrading:
         * PDNO : 종목번호(6자리)
         * CCLD_DVSN : 체결구분 (00: 전체, 01: 체결, 02: 미체결)
         '''
-        URL = f'{self.domain}/uapi/domestic-stock/v1/trading/inquire-balance'
+        URL = f'{self.domain}/uapi/domestic-stock/v1/trading/inquire-daily-ccld'
         params = dict(
             **self.default_params,
             INQR_STRT_DT=INQR_STRT_DT, INQR_END_DT=INQR_END_DT,
@@ -221,7 +478,7 @@ class KISTrading:
             CTX_AREA_FK100=CTX_AREA_FK100,
             CTX_AREA_NK100=CTX_AREA_NK100)
         try:
-            res = requests.get(URL, params=params,
+            res = self.request('GET', URL, params=params,
                 headers=self.get_headers('TTTC8001R',
                 'N' if CTX_AREA_FK100 else ''))
             if res.status_code != 200:
@@ -231,27 +488,56 @@ class KISTrading:
             data = res.json()
             ctx_area_fk100 = data.get('ctx_area_fk100')
             ctx_area_nk100 = data.get('ctx_area_nk100')
-            df = pd.DataFrame(data.get('output1'),)
-            df.columns = [
-                '주문일자', '주문채번지점번호', '주문번호', '원주문번호', '주문구분명',
-                '매도매수구분코드', '매도매수구분코드명', '상품번호', '상품명',
-                '주문수량', '주문단가', '주문시각', '총체결수량', '평균가',
-                '취소여부', '총체결금액', '대출일자', '주문담당자', '주문구분코드',
-                '취소확인수량', '잔여수량', '거부수량', '체결조건명', '요청IP주소',
-                'x1', 'x2', '통보시각', '연락전화번호', '상품유형코드', '거래소구분코드',
-                'x3', 'x4', 'x5']
-            df['유일주문코드'] = df.apply(
-                lambda x: "-".join([x.주문일자, x.주문번호]), axis=1)
-            df = df.astype({
-                '총체결수량': int, '총체결금액': int, '주문수량': int, '주문단가': int,
-                '취소확인수량': int, '잔여수량': int, '거부수량': int, '평균가': int})
-            df['평균단가'] = df.총체결금액 / df.총체결수량
-            df.set_index('유일주문코드', inplace=True)
-            df.주문일자 = pd.to_datetime(df.주문일자, format='%Y%m%d')
-            return df if not simple else\
-                df.loc[:,
-                 ['주문일자', '매도매수구분코드', '상품유형코드', '상품번호', '상품명',
-                  '총체결수량', '총체결금액', '평균단가']
-                ], res.headers.get('tr_cont'), ctx_area_fk100, ctx_area_nk100
+            df = self.format_daily_order(data.get('output1'), simple)
+            return df, res.headers.get('tr_cont'), ctx_area_fk100, ctx_area_nk100
+        except Exception as ex:
+            print(type(ex), ex)
+
+    def format_daily_order(self, rows, simple=True) -> pd.DataFrame:
+        '''
+        #### 주식일별주문체결 응답 행 → '유일주문코드' 인덱스 DataFrame
+        rows가 비어 있으면 같은 컬럼/dtype의 빈 DataFrame
+        '''
+        df = schema.decode('TTTC8001R', rows, compact=self.compact)
+        df['유일주문코드'] = df.주문일자 + '-' + df.주문번호
+        df['평균단가'] = df.총체결금액 / df.총체결수량
+        df.set_index('유일주문코드', inplace=True)
+        df.주문일자 = pd.to_datetime(df.주문일자, format='%Y%m%d')
+        if simple:
+            df = df.loc[:,
+             ['주문일자', '매도매수구분코드', '상품유형코드', '상품번호', '상품명',
+              '총체결수량', '총체결금액', '평균단가']]
+        return df
+
+    def order_cash(self, symbol, qty, side, price=0, ORD_DVSN=None) -> dict:
+        '''
+        #### 주식주문(현금)
+        * side : 'sell'(TTTC0801U) 또는 'buy'(TTTC0802U)
+        * price : 주문단가 (0이면 시장가)
+        * ORD_DVSN : 주문구분 (기본 00: 지정가, 시장가면 01)
+        * return : '결과코드', '메시지코드', '메시지', '주문채번지점번호', '주문번호', '주문시각'
+          (거부돼도 결과코드와 메시지를 담아 반환, 요청 자체가 실패하면 None)
+
+        주문은 멱등하지 않아서 유량 제한 응답만 재시도함
+        '''
+        URL = f'{self.domain}/uapi/domestic-stock/v1/trading/order-cash'
+        tr_id = dict(sell='TTTC0801U', buy='TTTC0802U')[side]
+        json = dict(
+            **self.default_params,
+            PDNO=symbol,
+            ORD_DVSN=ORD_DVSN or ('00' if price else '01'),
+            ORD_QTY=str(int(qty)),
+            ORD_UNPR=str(int(price)))
+        try:
+            res = self.request('POST', URL, idempotent=False, json=json,
+                               headers=self.get_headers(tr_id))
+            if res.status_code != 200:
+                err_msg = f'Request Error ({res.status_code}) : {res.text}'
+                raise Exception(err_msg)
+            data = res.json()
+            order = schema.decode(tr_id, [data.get('output') or dict(
+                KRX_FWDG_ORD_ORGNO='', ODNO='', ORD_TMD='')]).iloc[0]
+            return dict(결과코드=data.get('rt_cd'), 메시지코드=data.get('msg_cd'),
+                        메시지=data.get('msg1'), **order.to_dict())
         except Exception as ex:
-            print(type(ex), ex)
\ No newline at end of file
+            print(type(ex), ex)
@@ -0,0 +1,150 @@
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+from owlman.kis_trading import KISTrading
+from owlman.throttle import Throttle
+from owlman import schema
+
+class MultiAccount:
+    '''
+    ### 여러 계좌 일괄 조회
+    * accounts : `{이름: (appkey, appsecret, CANO, ACNT_PRDT_CD)}` 또는 튜플 목록
+      (목록이면 이름은 'CANO-ACNT_PRDT_CD')
+    * throttle : 전체 계좌 공용 유량 제어 (기본 `Throttle()`)
+    * pool_size : 공용 커넥션 풀 크기
+    * workers : 동시 조회 수 (기본 pool_size)
+    * quote_ttl : 시세 캐시 유지 시간 (초)
+    * kwargs : `KISTrading` 옵션 (token_store, order_store, compact, timeout 등)
+
+    세션(커넥션 풀)과 유량 제어는 전 계좌가, 토큰은 같은 appkey 계좌끼리 공유함.
+    계좌 조회는 계좌별로 동시에 보내고 결과는 '계좌' 인덱스 레벨로 합치며,
+    계좌와 무관한 시세는 종목마다 한 번만 조회함
+
+        accounts = MultiAccount({'연금': (key, secret, '12345678', '22'),
+                                 '일반': (key, secret, '87654321', '01')})
+        accounts.get_stock_account()
+    '''
+    def __init__(self, accounts, throttle: Throttle=None,
+                 pool_size=10, workers=None, quote_ttl=60, **kwargs):
+        if not isinstance(accounts, dict):
+            accounts = {f'{a[2]}-{a[3]}': a for a in accounts}
+        self.throttle = throttle or Throttle()
+        self.session = KISTrading.create_session(pool_size)
+        self.workers = workers or pool_size
+        self.quote_ttl = quote_ttl
+        self.compact = kwargs.get('compact', False)
+        self.clients = {}
+        owners = {} # appkey -> 토큰을 발급받은 클라이언트
+        for name, (appkey, appsecret, CANO, ACNT_PRDT_CD) in accounts.items():
+            if appkey in owners:
+                client = owners[appkey].for_account(CANO, ACNT_PRDT_CD)
+            else:
+                client = owners[appkey] = KISTrading(
+                    appkey, appsecret, CANO, ACNT_PRDT_CD,
+                    pool_size=pool_size, throttle=self.throttle,
+                    session=self.session, **kwargs)
+            self.clients[name] = client
+        self.quote_client : KISTrading = next(iter(self.clients.values()))
+        self.quotes = {} # (종목, 기간) -> (조회 시각, Future)
+        self.lock = threading.Lock()
+
+    def map(self, func, names=None) -> dict:
+        '''
+        #### 계좌별 `func(client)`를 동시에 실행
+        * names : 대상 계좌 (기본 전체)
+        * return : `{이름: 결과}` (예외가 난 계좌는 출력 후 None)
+        '''
+        names = list(self.clients) if names is None else list(names)
+        def run(name):
+            try:
+                return func(self.clients[name])
+            except Exception as ex:
+                print(name, type(ex), ex)
+        with ThreadPoolExecutor(min(self.workers, len(names)) or 1) as executor:
+            return dict(zip(names, executor.map(run, names)))
+
+    def concat(self, results: dict, tr_id=None) -> pd.DataFrame:
+        '''
+        #### 계좌별 결과를 '계좌' 인덱스 레벨을 붙여 합침
+        조회에 실패한(None) 계좌는 빠지고, compact 모드면 tr_id 스키마로 다시 줄임
+        '''
+        failed = [name for name, df in results.items() if df is None]
+        if failed:
+            print(f'계좌 조회 실패 ({len(failed)}) : {failed}')
+        frames = {name: df for name, df in results.items() if df is not None}
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, names=['계좌'])
+        return schema.to_compact(tr_id, df) if self.compact and tr_id else df
+
+    def get_account_balance(self, names=None) -> pd.DataFrame:
+        '''### 계좌별 자산현황 (`KISTrading.get_account_balance`)'''
+        return self.concat(self.map(
+            lambda client: client.get_account_balance(), names))
+
+    def get_stock_account(self, simple=True, names=None) -> pd.DataFrame:
+        '''### 계좌별 주식잔고 (`KISTrading.get_stock_account`)'''
+        return self.concat(self.map(
+            lambda client: client.get_stock_account(simple), names),
+            'TTTC8434R')
+
+    def get_daily_all_orders(self, INQR_STRT_DT, INQR_END_DT,
+                             names=None, **kwargs) -> pd.DataFrame:
+        '''
+        ### 계좌별 기간 전체 주문체결 (`KISTrading.get_daily_all_orders`)
+        * kwargs : 조회 옵션 (SLL_BUY_DVSN_CD, CCLD_DVSN, simple, shard_days 등)
+        '''
+        return self.concat(self.map(
+            lambda client: client.get_daily_all_orders(
+                INQR_STRT_DT, INQR_END_DT, **kwargs), names),
+            'TTTC8001R')
+
+    def get_daily_price(self, symbol, period='D') -> pd.DataFrame:
+        '''
+        ### 주식현재가 일자별 (계좌 무관, 종목마다 한 번만 조회)
+        quote_ttl 동안은 캐시를 반환하고, 같은 종목을 동시에 요청하면
+        먼저 보낸 요청 결과를 같이 기다림. 반환한 DataFrame은 공유되므로
+        수정하려면 복사해서 사용
+        '''
+        key = (symbol, period)
+        with self.lock:
+            entry = self.quotes.get(key)
+            owner = entry is None or (entry[1].done()
+                and time.time() - entry[0] > self.quote_ttl)
+            if owner:
+                entry = self.quotes[key] = (time.time(), Future())
+        future = entry[1]
+        if owner:
+            try:
+                df = self.quote_client.get_daily_price(symbol, period)
+            except Exception as ex:
+                df = None
+                print(type(ex), ex)
+            if df is None: # 실패는 캐시하지 않음
+                with self.lock:
+                    self.quotes.pop(key, None)
+            future.set_result(df)
+        return future.result()
+
+    def get_daily_price_many(self, symbols, period='D') -> dict:
+        '''### 여러 종목 일자별 시세 `{symbol: df}` (중복 종목은 한 번만 조회)'''
+        symbols = list(dict.fromkeys(symbols))
+        with ThreadPoolExecutor(min(self.workers, len(symbols)) or 1)\
+                as executor:
+            frames = executor.map(
+                lambda symbol: self.get_daily_price(symbol, period), symbols)
+            return dict(zip(symbols, frames))
+
+    def get_holding_prices(self, period='D', names=None) -> dict:
+        '''### 전 계좌 보유 종목의 일자별 시세 (여러 계좌가 가진 종목도 한 번만 조회)'''
+        stock = self.get_stock_account(names=names)
+        symbols = stock.index.get_level_values(-1) if len(stock) else []
+        return self.get_daily_price_many(symbols, period)
+
+    def clear_quotes(self):
+        '''### 시세 캐시 비우기'''
+        with self.lock:
+            self.quotes.clear()
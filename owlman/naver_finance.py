@@ -1,14 +1,33 @@
+import re
+from functools import lru_cache
+
 import requests
 import pandas as pd
 
+from owlman.universe_store import UniverseStore
+
 class NaverFinance:
-    @classmethod    
-    def get_etf_item_list(cls, market_cap=0, exclude_category=[], exclude_kwds=[]) -> pd.DataFrame:
-        '''네이버 증권에 ETF 리스트 데이터 요청'''
-        # 데이터 요청
-        URL = 'https://finance.naver.com/api/sise/etfItemList.nhn'
-        response = requests.get(URL)
-        data = response.json().get('result').get('etfItemList')
+    URL = 'https://finance.naver.com/api/sise/etfItemList.nhn'
+    timeout = (3.05, 10)
+    store : UniverseStore = None
+    # compact 모드 dtype (전일비는 등락률/현재가로 알 수 있어서 뺌)
+    compact_dtypes = {
+        '카테고리코드': 'int8', '등락여부': 'category', '현재가': 'int32',
+        '등락률': 'float32', 'NAV': 'int32', '3개월수익률': 'float32',
+        '거래량': 'int64', '거래대금': 'int64', '시가총액': 'int32',
+        '카테고리': 'category'}
+    compact_drop = ['전일비']
+
+    @classmethod
+    def get_store(cls) -> UniverseStore:
+        '''#### 기본 스냅샷 저장소 (처음 사용할 때 만듦)'''
+        if cls.store is None:
+            cls.store = UniverseStore()
+        return cls.store
+
+    @classmethod
+    def parse_etf_item_list(cls, data) -> pd.DataFrame:
+        '''### 응답 ETF 목록 테이블화'''
         # 테이블화 & 컬럼 정리
         df = pd.DataFrame(data)
         df.columns = [
@@ -22,17 +41,86 @@ class NaverFinance:
             1: '국내 시장지수', 2: '국내 업종/테마', 3: '국내 파생',
             4: '해외 주식', 5: '원자재', 6: '채권', 7: '기타'})
         # 타입 처리
-        df = df.astype({
+        return df.astype({
             '현재가': int, '등락률': float, 'NAV': int, '3개월수익률': float,
             '거래량': int, '거래대금': int, '시가총액': int,
         }).set_index('종목코드')
+
+    @classmethod
+    def to_compact(cls, df: pd.DataFrame) -> pd.DataFrame:
+        '''### 작은 숫자 dtype과 범주형으로 변환 (없는 컬럼은 건너뜀)'''
+        return df.drop(columns=[c for c in cls.compact_drop if c in df])\
+            .astype({k: v for k, v in cls.compact_dtypes.items() if k in df})
+
+    @classmethod
+    def fetch_etf_item_list(cls, store: UniverseStore=None) -> pd.DataFrame:
+        '''
+        ### 네이버 증권에 ETF 리스트 데이터 요청
+        저장소가 있으면 ETag/Last-Modified로 조건부 요청을 보내고,
+        변경이 없으면(304) 저장된 스냅샷을, 있으면 새 스냅샷을 저장해서 반환함
+        '''
+        meta = store.read_meta() if store else {}
+        headers = {}
+        if meta.get('latest') and meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('latest') and meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        response = requests.get(cls.URL, headers=headers, timeout=cls.timeout)
+        if response.status_code == 304 and store:
+            store.touch()
+            df = store.load()
+            if df is not None:
+                return df
+            response = requests.get(cls.URL, timeout=cls.timeout)
+        data = response.json().get('result').get('etfItemList')
+        df = cls.parse_etf_item_list(data)
+        if store:
+            store.save(df, response.headers.get('ETag'),
+                       response.headers.get('Last-Modified'))
+        return df
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def get_keyword_pattern(cls, kwds: tuple) -> re.Pattern:
+        '''#### 제외 키워드들을 한 번에 검사하는 정규식 (키워드는 정규식으로 해석)'''
+        return re.compile('|'.join(f'(?:{kwd})' for kwd in kwds))
+
+    @classmethod
+    def filter_etf_item_list(cls, df: pd.DataFrame, market_cap=0,
+                             exclude_category=[],
+                             exclude_kwds=[]) -> pd.DataFrame:
+        '''### 카테고리, 종목명 키워드, 시가총액 조건을 하나의 마스크로 필터링'''
+        mask = df.시가총액.to_numpy() >= market_cap
         if exclude_category:
-            df = df.query(f'카테고리코드 not in [{", ".join(map(str, exclude_category))}]')
+            mask &= ~df.카테고리코드.isin(exclude_category).to_numpy()
         if exclude_kwds:
-            df = df.query(' and '.join(f'not 종목명.str.contains("{kwd}")'
-                                       for kwd in exclude_kwds))
-        return df.query(f'시가총액 >= {market_cap}')
+            pattern = cls.get_keyword_pattern(tuple(exclude_kwds))
+            mask &= ~df.종목명.str.contains(pattern).to_numpy(bool)
+        return df.loc[mask]
+
+    @classmethod
+    def get_etf_item_list(cls, market_cap=0, exclude_category=[], exclude_kwds=[],
+                          date=None, cache=True, compact=False) -> pd.DataFrame:
+        '''
+        네이버 증권 ETF 리스트
+        * date : 지정 시 해당 날짜('YYYYMMDD') 이전 마지막 스냅샷을 오프라인으로 읽음
+        * cache : 스냅샷 저장소 사용 여부 (TTL 안이면 요청하지 않음)
+        * compact : True면 `to_compact`로 줄인 뒤 필터링 (스냅샷은 원본 그대로 저장)
+        '''
+        store = cls.get_store() if cache or date else None
+        if date:
+            df = store.load(date)
+            if df is None:
+                raise Exception(f'ETF 리스트 스냅샷 없음 : {date}')
+        else:
+            df = store.load() if store and store.is_fresh() else None
+            if df is None:
+                df = cls.fetch_etf_item_list(store)
+        if compact:
+            df = cls.to_compact(df)
+        return cls.filter_etf_item_list(
+            df, market_cap, exclude_category, exclude_kwds)
 
 if __name__ == '__main__':
     print(NaverFinance.get_etf_item_list())
-    print(NaverFinance.get_etf_item_list(500, [1], ['합성']))
\ No newline at end of file
+    print(NaverFinance.get_etf_item_list(500, [1], ['합성']))
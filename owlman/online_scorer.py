@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+
+from owlman.price_panel import PricePanel, compact
+
+class OnlineScorer:
+    '''
+    ### 실시간 체결가로 갱신하는 종목별 점수/위험 상태
+    * symbols : 종목코드 목록
+    * periods : 모멘텀 기간 (`TradingHelper.periods`)
+
+    `PricePanel`의 일괄 계산(`momentum_score`, `risk`)과 같은 값을 틱마다
+    해당 종목만 고쳐서 유지함
+
+    * 종가 : 종목별 최근 max(periods)개 유효 종가 링 버퍼
+    * 위험 : 최근 max(periods)개 날짜의 True Range 링 버퍼와
+      지수 가중합(분자/분모), 당일 값이 바뀌면 차이만 더함
+    * 순위 : 그룹별 최고 점수 종목 (그룹 선두 점수가 내려갈 때만 그룹 안을 다시 찾음)
+
+    새 날짜의 첫 틱에서만 전 종목 버퍼를 한 칸 밀고 가중합을 다시 계산함
+
+        scorer = OnlineScorer.from_panel(panel, periods, labels)
+        scorer.update('069500', '20261019', 35120, 35200, 34900)
+        scorer.ranking()
+    '''
+    def __init__(self, symbols, periods):
+        self.symbols = pd.Index(symbols)
+        self.periods = np.asarray(periods, dtype=int)
+        self.window = int(self.periods.max())
+        n, w = len(self.symbols), self.window
+        self.com = w
+        self.decay = 1 - 1 / (1 + self.com)
+        self.weights = self.decay ** np.arange(w) # 나이(0 = 당일)별 가중치
+        self.position = {s: j for j, s in enumerate(self.symbols)}
+        self.day = None
+        self.closes = np.full((w, n), np.nan) # 종목별 유효 종가 링
+        self.head = np.full(n, w - 1)         # 종목별 최신 종가 위치
+        self.count = np.zeros(n, dtype=int)   # 종목별 유효 종가 수
+        self.tr = np.full((w, n), np.nan)     # 날짜별 True Range 링
+        self.row = w - 1                      # 당일 True Range 위치
+        self.numerator = np.zeros(n)
+        self.denominator = np.zeros(n)
+        self.has_bar = np.zeros(n, dtype=bool) # 당일 일봉 유무
+        self.prev_close = np.full(n, np.nan)
+        self.high = np.full(n, np.nan)
+        self.low = np.full(n, np.nan)
+        self.score = np.zeros(n)
+        self.risk = np.full(n, np.nan)
+        self.set_groups(np.zeros(n, dtype=int))
+
+    @classmethod
+    def from_panel(cls, panel: PricePanel, periods, labels=None):
+        '''
+        #### 패널의 마지막 상태로 시작
+        * labels : 종목별 그룹 번호 (`TradingHelper.labels`, 없으면 한 그룹)
+        '''
+        scorer = cls(panel.symbols, periods)
+        w, n = scorer.window, len(panel.symbols)
+        packed, count = compact(panel.close)
+        rows = min(w, len(packed))
+        if rows:
+            scorer.closes[w - rows:] = packed[-rows:]
+            scorer.day = panel.dates[-1]
+        scorer.count = np.minimum(count, w)
+        tr = panel.true_range()[-w:]
+        scorer.tr[w - len(tr):] = tr
+        if len(panel.close):
+            last = panel.close[-1]
+            scorer.has_bar = ~np.isnan(last)
+            scorer.high = panel.high[-1].copy()
+            scorer.low = panel.low[-1].copy()
+            newest = packed[-1]
+            before = packed[-2] if len(packed) > 1 else np.full(n, np.nan)
+            scorer.prev_close = np.where(scorer.has_bar, before, newest)
+        scorer.reweight()
+        scorer.score[:] = panel.momentum_score(scorer.periods)
+        scorer.refresh_risk()
+        scorer.set_groups(scorer.labels if labels is None else labels)
+        return scorer
+
+    def age_order(self) -> np.ndarray:
+        '''#### 링 위치를 나이(0 = 당일) 순서로'''
+        return (self.row - np.arange(self.window)) % self.window
+
+    def reweight(self):
+        '''#### True Range 링 전체로 지수 가중합 다시 계산'''
+        tr = self.tr[self.age_order()]
+        valid = ~np.isnan(tr)
+        self.numerator = (np.where(valid, tr, 0)
+                          * self.weights[:, None]).sum(axis=0)
+        self.denominator = (valid * self.weights[:, None]).sum(axis=0)
+
+    def last_close(self) -> np.ndarray:
+        idx = np.arange(len(self.symbols))
+        return np.where(self.count > 0, self.closes[self.head, idx], np.nan)
+
+    def refresh_risk(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.risk[:] = np.where(self.denominator > 0,
+                                    self.numerator / self.denominator,
+                                    np.nan) / self.last_close()
+
+    def set_groups(self, labels):
+        '''#### 종목별 그룹 번호 지정, 그룹별 선두 종목 계산'''
+        self.labels = np.asarray(labels, dtype=int)
+        groups, inverse = np.unique(self.labels, return_inverse=True)
+        self.groups = groups
+        self.group_of = inverse
+        self.members = [np.flatnonzero(inverse == g)
+                        for g in range(len(groups))]
+        self.best = np.array([m[np.argmax(self.score[m])]
+                              for m in self.members], dtype=int)
+
+    def roll(self, day):
+        '''#### 새 날짜 시작 : 전 종목 당일 슬롯을 비우고 전일 종가를 넘김'''
+        self.day = day
+        self.row = (self.row + 1) % self.window
+        self.tr[self.row] = np.nan
+        self.prev_close = self.last_close()
+        self.has_bar[:] = False
+        self.high[:] = np.nan
+        self.low[:] = np.nan
+        self.reweight()
+        self.refresh_risk()
+
+    def update(self, symbol, day, price, high=None, low=None) -> bool:
+        '''
+        #### 체결 틱 반영
+        * day : 영업일자 ('YYYYMMDD' 또는 Timestamp)
+        * high, low : 당일 고가/저가 (없으면 체결가로 갱신)
+        * return : 반영 여부 (모르는 종목이나 지난 날짜는 무시)
+        '''
+        j = self.position.get(symbol)
+        if j is None:
+            return False
+        day = pd.Timestamp(day)
+        if self.day is not None and day < self.day:
+            return False
+        if self.day is None or day > self.day:
+            self.roll(day)
+        price = float(price)
+        high = price if high is None else float(high)
+        low = price if low is None else float(low)
+        w = self.window
+        if self.has_bar[j]:
+            high, low = max(high, self.high[j]), min(low, self.low[j])
+        else: # 당일 첫 체결 : 종가 링에 새 칸
+            self.has_bar[j] = True
+            self.head[j] = (self.head[j] + 1) % w
+            self.count[j] = min(self.count[j] + 1, w)
+            self.denominator[j] += 1
+            self.tr[self.row, j] = 0.0
+        self.closes[self.head[j], j] = price
+        self.high[j], self.low[j] = high, low
+        prev = self.prev_close[j]
+        tr = high - low if prev != prev else\
+            max(high, prev) - min(low, prev) # prev가 NaN이면 고가 - 저가
+        self.numerator[j] += tr - self.tr[self.row, j]
+        self.tr[self.row, j] = tr
+        self.risk[j] = self.numerator[j] / self.denominator[j] / price
+        self.rescore(j)
+        return True
+
+    def rescore(self, j):
+        '''#### 한 종목 모멘텀 점수와 그룹 선두 갱신'''
+        total, valid = 0.0, 0
+        head, count = self.head[j], self.count[j]
+        last = self.closes[head, j]
+        for p in self.periods:
+            if p <= count:
+                total += last / self.closes[(head - p + 1) % self.window, j]
+                valid += 1
+        old, new = self.score[j], total / valid if valid else 0
+        self.score[j] = new
+        g = self.group_of[j]
+        b = self.best[g]
+        if b == j:
+            if new < old:
+                m = self.members[g]
+                self.best[g] = m[np.argmax(self.score[m])]
+        elif new > self.score[b] or (new == self.score[b] and j < b):
+            self.best[g] = j
+
+    def ranking(self) -> np.ndarray:
+        '''
+        #### 그룹별 선두 종목 위치, 점수 내림차순 (동점이면 앞 종목)
+        `TradingHelper.get_screen_table`의 그룹별 최고 점수 종목 순서와 같음
+        '''
+        best = self.best
+        return best[np.lexsort((best, -self.score[best]))]
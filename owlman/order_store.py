@@ -0,0 +1,123 @@
+import os
+import json
+from datetime import datetime
+
+import pandas as pd
+
+from owlman.storage import (owlman_home, FileLock, atomic_write,
+                            read_frame, write_frame, frame_path)
+from owlman.history_store import KST
+
+def date_shards(start, end, days) -> list:
+    '''
+    ### 조회 기간을 days일 단위 구간으로 나누기
+    * start, end : 'YYYYMMDD'
+    * return : `[(시작일, 종료일), ...]` (날짜 순)
+    '''
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    shards = []
+    while start <= end:
+        stop = min(start + pd.Timedelta(days=days - 1), end)
+        shards.append((start.strftime('%Y%m%d'), stop.strftime('%Y%m%d')))
+        start = stop + pd.Timedelta(days=1)
+    return shards
+
+class OrderStore:
+    '''
+    ### 일별 주문체결 로컬 저장소
+    * root : 저장 디렉터리 (기본 `~/.owlman/orders`)
+
+    조회 조건(계좌, 매수/매도, 종목, 체결구분)별로 월 단위 파일에 저장하고,
+    받아 둔 마감일(오늘 이전) 구간을 meta.json에 기록해서 다시 조회하지 않음.
+    오늘 주문은 바뀔 수 있어서 저장하지 않음
+    '''
+    def __init__(self, root=None):
+        self.root = root or owlman_home('orders')
+        os.makedirs(self.root, exist_ok=True)
+
+    def directory(self, key) -> str:
+        return os.path.join(self.root, key)
+
+    def meta_path(self, key) -> str:
+        return os.path.join(self.directory(key), 'meta.json')
+
+    def read_meta(self, key) -> dict:
+        path = self.meta_path(key)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    @classmethod
+    def last_closed_date(cls, now=None) -> pd.Timestamp:
+        '''#### 주문이 더 바뀌지 않는 마지막 날짜 (어제)'''
+        now = now or datetime.now(KST)
+        return pd.Timestamp(now.date()) - pd.Timedelta(days=1)
+
+    def get_missing(self, key, start, end, now=None) -> list:
+        '''
+        #### 저장소에 없어서 조회해야 하는 구간
+        * return : `[(시작일, 종료일), ...]` ('YYYYMMDD', 날짜 순)
+        '''
+        covered = [(pd.Timestamp(s), pd.Timestamp(e))
+                   for s, e in self.read_meta(key).get('covered', [])]
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        missing = []
+        for s, e in sorted(covered):
+            if e < start or s > end:
+                continue
+            if s > start:
+                missing.append((start, s - pd.Timedelta(days=1)))
+            start = max(start, e + pd.Timedelta(days=1))
+        if start <= end:
+            missing.append((start, end))
+        return [(s.strftime('%Y%m%d'), e.strftime('%Y%m%d'))
+                for s, e in missing]
+
+    def load(self, key, start, end) -> pd.DataFrame:
+        '''#### 기간 내 저장된 주문 (없으면 None)'''
+        months = pd.period_range(pd.Timestamp(start), pd.Timestamp(end),
+                                 freq='M')
+        frames = [read_frame(frame_path(self.directory(key),
+                                        month.strftime('%Y%m')))
+                  for month in months]
+        frames = [df for df in frames if df is not None]
+        if not frames:
+            return None
+        df = pd.concat(frames)
+        return df.loc[(df.주문일자 >= pd.Timestamp(start))
+                      & (df.주문일자 <= pd.Timestamp(end))]
+
+    def save(self, key, df: pd.DataFrame, start, end, now=None):
+        '''
+        #### 조회한 구간의 주문 중 마감일 주문만 저장하고 구간을 기록
+        * df : `get_daily_order` 결과 (주문일자 컬럼 필요)
+        '''
+        end = min(pd.Timestamp(end), self.last_closed_date(now))
+        start = pd.Timestamp(start)
+        if start > end:
+            return
+        df = df.loc[(df.주문일자 >= start) & (df.주문일자 <= end)]
+        with FileLock(os.path.join(self.directory(key), '.lock')):
+            for month, group in df.groupby(df.주문일자.dt.strftime('%Y%m')):
+                path = frame_path(self.directory(key), month)
+                stored = read_frame(path)
+                if stored is not None:
+                    group = pd.concat([stored.loc[
+                        ~stored.index.isin(group.index)], group])
+                    group = group.sort_values('주문일자', kind='stable')
+                write_frame(path, group)
+            meta = self.read_meta(key)
+            covered = sorted(
+                [(pd.Timestamp(s), pd.Timestamp(e))
+                 for s, e in meta.get('covered', [])] + [(start, end)])
+            merged = [list(covered[0])]
+            for s, e in covered[1:]: # 겹치거나 이어진 구간 합치기
+                if s <= merged[-1][1] + pd.Timedelta(days=1):
+                    merged[-1][1] = max(merged[-1][1], e)
+                else:
+                    merged.append([s, e])
+            meta['covered'] = [[s.strftime('%Y%m%d'), e.strftime('%Y%m%d')]
+                               for s, e in merged]
+            atomic_write(self.meta_path(key),
+                         json.dumps(meta, ensure_ascii=False).encode())
@@ -0,0 +1,50 @@
+class Pipeline:
+    '''
+    ### 단계별 캐시 파이프라인
+    이름 있는 단계마다 의존 단계와 파라미터를 선언하고,
+    의존 단계의 결과나 파라미터가 바뀐 단계만 다시 계산함
+
+        pipe = Pipeline()
+        pipe.add('a', load)
+        pipe.add('b', lambda a, n: ..., deps=['a'], params=['n'])
+        pipe.set(n=3)
+        pipe.run('b')
+    '''
+    def __init__(self):
+        self.stages = {}
+        self.params = {}
+        self.cache = {} # name -> (key, version, value)
+
+    def add(self, name, func, deps=(), params=()):
+        '''
+        #### 단계 추가
+        `func(*의존 단계 결과, **파라미터)`로 호출됨
+        '''
+        self.stages[name] = (func, tuple(deps), tuple(params))
+
+    def set(self, **params):
+        '''#### 파라미터 변경 (None은 무시)'''
+        self.params.update(
+            {k: v for k, v in params.items() if v is not None})
+
+    def run(self, name):
+        '''#### 단계 결과 조회, 입력이 바뀐 경우에만 다시 계산'''
+        func, deps, params = self.stages[name]
+        values = [self.run(d) for d in deps]
+        key = (tuple(self.cache[d][1] for d in deps),
+               tuple(self.params.get(p) for p in params))
+        cached = self.cache.get(name)
+        if cached and cached[0] == key:
+            return cached[2]
+        value = func(*values, **{p: self.params.get(p) for p in params})
+        version = cached[1] + 1 if cached else 1
+        self.cache[name] = (key, version, value)
+        return value
+
+    def invalidate(self, *names):
+        '''#### 단계 결과를 버려서 다음 실행 시 다시 계산 (하위 단계도 따라서 갱신)'''
+        for name in names or list(self.cache):
+            cached = self.cache.get(name)
+            if cached:
+                self.cache[name] = (None, cached[1], None)
+
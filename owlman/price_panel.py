@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+def ffill(values: np.ndarray) -> np.ndarray:
+    '''### 열(종목)별 앞 값 채우기'''
+    valid = ~np.isnan(values)
+    idx = np.where(valid, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return values[idx, np.arange(values.shape[1])]
+
+def ewm_last(values: np.ndarray, com) -> np.ndarray:
+    '''
+    ### 열별 지수이동평균의 마지막 값
+    `pd.DataFrame(values).ewm(com).mean().iloc[-1]`과 같은 값
+    (adjust=True, ignore_na=False : 결측도 위치에 따라 가중치가 감소함)
+    '''
+    alpha = 1 / (1 + com)
+    weights = (1 - alpha) ** np.arange(len(values) - 1, -1, -1)
+    valid = ~np.isnan(values)
+    numerator = (np.where(valid, values, 0) * weights[:, None]).sum(axis=0)
+    denominator = (valid * weights[:, None]).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+def compact(values: np.ndarray) -> tuple:
+    '''
+    ### 열별로 결측을 위로 몰고 유효값은 순서대로 아래에 정렬
+    * return : `(정렬된 배열, 열별 유효값 개수)`
+    '''
+    valid = ~np.isnan(values)
+    order = np.argsort(valid, axis=0, kind='stable')
+    return np.take_along_axis(values, order, axis=0), valid.sum(axis=0)
+
+def last_valid(values: np.ndarray, n, compacted=None) -> np.ndarray:
+    '''
+    ### 열별로 결측을 뺀 뒤 끝에서 n번째 값
+    유효한 값이 n개보다 적으면 NaN
+    '''
+    packed, count = compacted or compact(values)
+    if not 0 < n <= len(values):
+        return np.full(values.shape[1], np.nan)
+    return np.where(count >= n, packed[-n], np.nan)
+
+class PricePanel:
+    '''
+    ### 날짜 × 종목 가격 패널
+    종목별 DataFrame dict 대신 정렬된 (날짜, 종목) float 배열로 보관함
+    (해당 날짜에 거래가 없는 종목은 NaN)
+    '''
+    fields = dict(open='시가', high='고가', low='저가',
+                  close='종가', volume='거래량')
+
+    def __init__(self, dates, symbols,
+                 open, high, low, close, volume):
+        self.dates = pd.DatetimeIndex(dates)
+        self.symbols = pd.Index(symbols)
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_history(cls, history: dict, dtype=np.float64):
+        '''
+        #### `{symbol: get_daily_price 결과}`로 패널 생성
+        날짜는 전체 종목의 합집합으로 정렬됨
+        '''
+        symbols = list(history.keys())
+        dates = pd.DatetimeIndex(sorted(set().union(
+            *(df.index for df in history.values())))) \
+            if history else pd.DatetimeIndex([])
+        arrays = {k: np.full((len(dates), len(symbols)), np.nan, dtype)
+                  for k in cls.fields}
+        for j, df in enumerate(history.values()):
+            rows = dates.get_indexer(df.index)
+            for k, col in cls.fields.items():
+                arrays[k][rows, j] = df[col].to_numpy(dtype=dtype)
+        return cls(dates, symbols, **arrays)
+
+    def to_history(self) -> dict:
+        '''
+        #### 패널을 `{symbol: OHLCV DataFrame}`으로 (`from_history`의 반대)
+        종목별로 거래가 없는 날짜(NaN)는 뺌
+        '''
+        history = {}
+        for j, symbol in enumerate(self.symbols):
+            df = pd.DataFrame({col: getattr(self, k)[:, j]
+                               for k, col in self.fields.items()},
+                              index=self.dates)
+            history[symbol] = df.loc[~np.isnan(self.close[:, j])]
+        return history
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, k).nbytes for k in self.fields)
+
+    def frame(self, values: np.ndarray) -> pd.DataFrame:
+        '''#### 패널 모양 배열을 (날짜 × 종목) DataFrame으로'''
+        return pd.DataFrame(values, index=self.dates, columns=self.symbols)
+
+    def prev_close(self) -> np.ndarray:
+        '''#### 종목별 직전 거래일 종가 (결측 날짜는 건너뜀)'''
+        prev = np.full_like(self.close, np.nan)
+        prev[1:] = ffill(self.close)[:-1]
+        return prev
+
+    def true_range(self) -> np.ndarray:
+        '''
+        #### 전 종목 True Range
+        `TradingHelper.get_tr`을 종목별로 구한 뒤 날짜로 맞춘 것과 같음
+        '''
+        prev = self.prev_close()
+        tr = np.fmax(self.high, prev) - np.fmin(self.low, prev)
+        tr[np.isnan(self.high)] = np.nan
+        return tr
+
+    def last_close(self) -> np.ndarray:
+        '''#### 종목별 마지막 종가'''
+        return last_valid(self.close, 1)
+
+    def momentum_score(self, periods) -> np.ndarray:
+        '''
+        #### 전 종목 모멘텀 점수
+        기간별 (마지막 종가 / p거래일 구간 첫 종가)의 평균,
+        `TradingHelper.get_score`와 같고 계산 가능한 기간이 없으면 0
+        '''
+        compacted = compact(self.close)
+        last = last_valid(self.close, 1, compacted)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = np.vstack([last / last_valid(self.close, p, compacted)
+                                for p in periods])
+        valid = ~np.isnan(scores)
+        count = valid.sum(axis=0)
+        total = np.where(valid, scores, 0).sum(axis=0)
+        return np.where(count > 0, total / np.maximum(count, 1), 0)
+
+    def risk(self, com, window=None) -> np.ndarray:
+        '''
+        #### 전 종목 위험 (True Range 지수이동평균 / 마지막 종가)
+        * window : 최근 몇 개 날짜의 True Range만 쓸지 (None이면 전체)
+        '''
+        tr = self.true_range()
+        if window:
+            tr = tr[-window:]
+        return ewm_last(tr, com) / self.last_close()
@@ -0,0 +1,156 @@
+import json
+import asyncio
+from collections import namedtuple
+
+try:
+    import websockets
+except ImportError: # pip install owlman[stream]
+    websockets = None
+
+from owlman.kis_trading import KISTrading
+
+# 국내주식 실시간체결가 (H0STCNT0) 응답 필드 순서
+FIELDS = (
+    'MKSC_SHRN_ISCD', 'STCK_CNTG_HOUR', 'STCK_PRPR', 'PRDY_VRSS_SIGN',
+    'PRDY_VRSS', 'PRDY_CTRT', 'WGHN_AVRG_STCK_PRC', 'STCK_OPRC', 'STCK_HGPR',
+    'STCK_LWPR', 'ASKP1', 'BIDP1', 'CNTG_VOL', 'ACML_VOL', 'ACML_TR_PBMN',
+    'SELN_CNTG_CSNU', 'SHNU_CNTG_CSNU', 'NTBY_CNTG_CSNU', 'CTTR',
+    'SELN_CNTG_SMTN', 'SHNU_CNTG_SMTN', 'CCLD_DVSN', 'SHNU_RATE',
+    'PRDY_VOL_VRSS_ACML_VOL_RATE', 'OPRC_HOUR', 'OPRC_VRSS_PRPR_SIGN',
+    'OPRC_VRSS_PRPR', 'HGPR_HOUR', 'HGPR_VRSS_PRPR_SIGN', 'HGPR_VRSS_PRPR',
+    'LWPR_HOUR', 'LWPR_VRSS_PRPR_SIGN', 'LWPR_VRSS_PRPR', 'BSOP_DATE',
+    'NEW_MKOP_CLS_CODE', 'TRHT_YN', 'ASKP_RSQN1', 'BIDP_RSQN1',
+    'TOTAL_ASKP_RSQN', 'TOTAL_BIDP_RSQN', 'VOL_TNRT',
+    'PRDY_SMNS_HOUR_ACML_VOL', 'PRDY_SMNS_HOUR_ACML_VOL_RATE',
+    'HOUR_CLS_CODE', 'MRKT_TRTM_CLS_CODE', 'VI_STND_PRC')
+
+Tick = namedtuple('Tick', ['종목코드', '영업일자', '체결시간', '현재가',
+                           '시가', '고가', '저가', '체결거래량', '누적거래량'])
+
+COLUMNS = [FIELDS.index(k) for k in (
+    'MKSC_SHRN_ISCD', 'BSOP_DATE', 'STCK_CNTG_HOUR', 'STCK_PRPR',
+    'STCK_OPRC', 'STCK_HGPR', 'STCK_LWPR', 'CNTG_VOL', 'ACML_VOL')]
+
+def parse_ticks(message: str) -> list:
+    '''
+    ### 실시간 체결가 메시지 파싱
+    `암호화여부|TR ID|건수|필드^필드^...` 형식, 한 메시지에 여러 건이 이어서 올 수 있음
+    * return : `Tick` 목록 (체결가 메시지가 아니면 빈 목록)
+    '''
+    flag, tr_id, count, payload = message.split('|', 3)
+    if flag != '0' or tr_id != QuoteStream.tr_id:
+        return []
+    values = payload.split('^')
+    n = len(FIELDS)
+    ticks = []
+    for i in range(int(count)):
+        row = values[i * n:(i + 1) * n]
+        code, day, hour, *numbers = (row[k] for k in COLUMNS)
+        ticks.append(Tick(code, day, hour, *map(int, numbers)))
+    return ticks
+
+class QuoteStream:
+    '''
+    ### KIS 실시간 체결가 웹소켓 구독
+    * kis_client : 접속키 발급용 `KISTrading`
+    * symbols : 구독할 종목코드 목록
+    * on_tick : 체결마다 `on_tick(Tick)`으로 호출됨
+    * max_subscriptions : 실시간 등록 한도. KIS는 appkey당 실시간 세션 하나에
+      최대 41건까지만 등록되므로 종목이 더 많으면 예외 (구독 종목을 골라서 넘김)
+    * ws_domain : 웹소켓 주소 (기본 `kis_client.ws_domain`)
+
+    REST 조회 없이 체결가만 받아서 `OnlineScorer` 등을 갱신할 때 사용함.
+    `websockets` 패키지가 필요함 (`pip install owlman[stream]`)
+
+        stream = QuoteStream(kis_client, codes, on_tick)
+        run_sync(stream.run(duration=60))
+    '''
+    tr_id = 'H0STCNT0'
+
+    def __init__(self, kis_client: KISTrading, symbols, on_tick,
+                 max_subscriptions=41, ws_domain=None, reconnect=True):
+        if max_subscriptions and len(symbols) > max_subscriptions:
+            raise Exception(f'실시간 등록 한도 초과 : {len(symbols)}종목 '
+                            f'(세션당 {max_subscriptions}건)')
+        self.kis_client = kis_client
+        self.symbols = list(symbols)
+        self.on_tick = on_tick
+        self.max_subscriptions = max_subscriptions
+        self.ws_domain = ws_domain or kis_client.ws_domain
+        self.reconnect = reconnect
+        self.approval_key = None
+        self.loop = self.stopped = None
+        self.stats = dict(messages=0, ticks=0, connects=0)
+
+    def get_message(self, symbol, tr_type='1') -> str:
+        '''#### 구독 등록('1')/해제('2') 요청'''
+        return json.dumps(dict(
+            header=dict(approval_key=self.approval_key, custtype='P',
+                        tr_type=tr_type, **{'content-type': 'utf-8'}),
+            body=dict(input=dict(tr_id=self.tr_id, tr_key=symbol))))
+
+    def handle(self, message) -> str:
+        '''
+        #### 수신 메시지 처리
+        * return : 서버로 되돌려 보낼 메시지 (PINGPONG), 없으면 None
+        '''
+        self.stats['messages'] += 1
+        if message[0] in '01':
+            for tick in parse_ticks(message):
+                self.stats['ticks'] += 1
+                self.on_tick(tick)
+            return None
+        data = json.loads(message)
+        if data['header'].get('tr_id') == 'PINGPONG':
+            return message
+        body = data.get('body') or {}
+        if body.get('rt_cd', '0') != '0':
+            print(f'구독 실패 ({data["header"].get("tr_key")}) : '
+                  f'{body.get("msg1")}')
+        return None
+
+    async def listen(self):
+        '''#### 연결 하나로 종목들을 구독하고 끊기면 다시 연결'''
+        while not self.stopped.is_set():
+            try:
+                async with websockets.connect(self.ws_domain) as ws:
+                    self.stats['connects'] += 1
+                    for symbol in self.symbols:
+                        await ws.send(self.get_message(symbol))
+                    async for message in ws:
+                        reply = self.handle(message)
+                        if reply:
+                            await ws.send(reply)
+            except (OSError, websockets.WebSocketException) as ex:
+                print(type(ex), ex)
+            if not self.reconnect:
+                return
+            await asyncio.sleep(1)
+
+    async def run(self, duration=None):
+        '''
+        #### 구독 시작
+        * duration : 받을 시간 (초, None이면 `stop()` 할 때까지)
+        '''
+        if websockets is None:
+            raise ImportError('실시간 시세에는 websockets가 필요함 : '
+                              'pip install owlman[stream]')
+        self.loop = asyncio.get_running_loop()
+        self.stopped = asyncio.Event()
+        self.approval_key = await self.loop.run_in_executor(
+            None, self.kis_client.get_approval_key)
+        task = asyncio.ensure_future(self.listen())
+        try:
+            await asyncio.wait_for(self.stopped.wait(), duration)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.stopped.set()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        return self.stats
+
+    def stop(self):
+        '''#### 구독 종료 (다른 스레드에서 호출 가능)'''
+        if self.stopped is not None:
+            self.loop.call_soon_threadsafe(self.stopped.set)
@@ -0,0 +1,159 @@
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from owlman.kis_trading import KISTrading
+from owlman.history_store import KST
+
+class Rebalancer:
+    '''
+    ### 목표 금액대로 리밸런싱 주문 실행
+    * kis_client : 주문/체결 조회용 `KISTrading`
+    * dry_run : True(기본)면 주문 계획만 만들고 주문하지 않음,
+      실제 주문은 `dry_run=False`로 명시해야 함 (`TradingHelper.rebalance`와 같음)
+    * workers : 동시 주문 수 (유량 제어는 `kis_client.throttle` 공용)
+    * tolerance : 이 금액 미만의 차이는 주문하지 않음
+    * wait_sells : 매수 전에 매도 체결을 기다릴지 (매도 대금으로 매수할 때)
+    * poll_interval, poll_timeout : 체결 조회 간격/최대 대기 시간 (초)
+
+    목표 금액과 보유 수량의 차이를 주 단위 시장가 주문으로 바꿔서 매도를 먼저
+    동시에 넣고 매수를 동시에 넣은 뒤, 당일 주문체결을 한 번에 조회해서
+    주문번호별 체결 수량을 채움
+
+        plan = Rebalancer(kis_client).run(targets, holdings, prices)
+    '''
+    columns = ['종목명', '구분', '가격', '현재수량', '목표수량', '주문수량', '주문금액',
+               '상태', '주문번호', '메시지', '체결수량', '체결금액']
+
+    def __init__(self, kis_client: KISTrading, dry_run=True, workers=None,
+                 tolerance=0, wait_sells=True,
+                 poll_interval=1, poll_timeout=60):
+        self.kis_client = kis_client
+        self.dry_run = dry_run
+        self.workers = workers or kis_client.pool_size
+        self.tolerance = tolerance
+        self.wait_sells = wait_sells
+        self.poll_interval = poll_interval
+        self.poll_timeout = poll_timeout
+
+    def get_plan(self, targets: pd.Series, holdings: pd.DataFrame,
+                 prices: pd.Series=None, managed=None,
+                 names: pd.Series=None) -> pd.DataFrame:
+        '''
+        #### 주문 계획
+        * targets : 종목코드별 목표 금액 (`screen_table.진입`)
+        * holdings : `get_stock_account()` 결과 (상품번호 index, 보유수량, 현재가)
+        * prices : 종목코드별 주문 수량 계산 가격 (없으면 보유 종목 현재가)
+        * managed : 목표에 없으면 전량 매도할 종목 범위 (기본 보유 종목 전체)
+        * names : 종목코드별 종목명
+
+        목표에 없는 보유 종목은 같은 그룹의 다른 종목이 목표여도 전량 매도함
+        '''
+        targets = targets.loc[targets > 0]
+        held = holdings.index if managed is None\
+            else holdings.index.intersection(pd.Index(managed))
+        symbols = targets.index.union(held, sort=False)
+        price = holdings.현재가.reindex(symbols).astype(float)
+        if prices is not None:
+            price = prices.reindex(symbols).astype(float).fillna(price)
+        missing = list(symbols[price.isna() | (price <= 0)])
+        if missing:
+            raise Exception(f'가격 없음 : {missing}')
+        current = holdings.보유수량.reindex(symbols).fillna(0).astype(int)
+        target = (targets.reindex(symbols).fillna(0) // price).astype(int)
+        diff = target - current
+        name = names.reindex(symbols) if names is not None\
+            else pd.Series(index=symbols, dtype=object)
+        if '상품명' in holdings:
+            name = name.fillna(holdings.상품명.reindex(symbols))
+        plan = pd.DataFrame({
+            '종목명': name,
+            '구분': np.where(diff < 0, '매도', '매수'),
+            '가격': price,
+            '현재수량': current,
+            '목표수량': target,
+            '주문수량': diff.abs(),
+            '주문금액': diff.abs() * price,
+        }, index=pd.Index(symbols, name='종목코드'))
+        plan = plan.loc[(diff != 0) & (plan.주문금액 >= self.tolerance)]
+        plan = plan.sort_values(['구분', '주문금액'], ascending=[True, False],
+                                kind='stable') # 매도(도) → 매수(수)
+        return plan.assign(상태='계획', 주문번호='', 메시지='',
+                           체결수량=0, 체결금액=0)[self.columns]
+
+    def submit(self, plan: pd.DataFrame, side) -> pd.DataFrame:
+        '''#### 계획 중 한 방향(매도/매수) 주문을 동시에 넣고 결과 기록'''
+        rows = plan.loc[plan.구분 == ('매도' if side == 'sell' else '매수')]
+        if not len(rows):
+            return plan
+        order = lambda item: self.kis_client.order_cash(item[0], item[1], side)
+        with ThreadPoolExecutor(self.workers) as executor:
+            results = list(executor.map(
+                order, zip(rows.index, rows.주문수량.tolist())))
+        for symbol, result in zip(rows.index, results):
+            if result is None:
+                plan.loc[symbol, ['상태', '메시지']] = ['실패', '요청 실패']
+            elif result['결과코드'] != '0':
+                plan.loc[symbol, ['상태', '메시지']] = ['거부', result['메시지']]
+            else:
+                plan.loc[symbol, ['상태', '주문번호', '메시지']]\
+                    = ['접수', result['주문번호'], result['메시지']]
+        return plan
+
+    def poll(self, plan: pd.DataFrame, symbols=None) -> pd.DataFrame:
+        '''
+        #### 접수된 주문의 체결을 당일 주문체결 일괄 조회로 확인
+        모두 체결(또는 잔여 없음)되거나 poll_timeout이 지날 때까지 반복함
+        * symbols : 확인할 종목 (기본 접수된 주문 전체)
+        '''
+        today = datetime.now(KST).strftime('%Y%m%d')
+        deadline = time.time() + self.poll_timeout
+        while True:
+            mask = plan.상태.isin(['접수', '부분체결'])
+            if symbols is not None:
+                mask &= plan.index.isin(symbols)
+            if not mask.any():
+                return plan
+            try:
+                orders = self.kis_client.get_daily_all_orders(
+                    today, today, CCLD_DVSN='00', simple=False)
+            except Exception as ex:
+                print(type(ex), ex)
+                orders = None
+            if orders is not None and len(orders):
+                orders = orders.drop_duplicates('주문번호', keep='last')\
+                    .set_index('주문번호')
+                rows = plan.loc[mask]
+                found = orders.reindex(rows.주문번호)
+                ok = found.총체결수량.notna().to_numpy()
+                filled = found.총체결수량.fillna(0).astype(int).to_numpy()
+                done = ok & ((filled >= rows.주문수량.to_numpy())
+                             | (found.잔여수량.fillna(1).to_numpy() == 0))
+                plan.loc[rows.index, '체결수량'] = filled
+                plan.loc[rows.index, '체결금액']\
+                    = found.총체결금액.fillna(0).astype(int).to_numpy()
+                plan.loc[rows.index, '상태'] = np.where(
+                    done, np.where(filled >= rows.주문수량, '체결', '미체결종료'),
+                    np.where(filled > 0, '부분체결', '접수'))
+            if time.time() > deadline:
+                return plan
+            time.sleep(self.poll_interval)
+
+    def run(self, targets: pd.Series, holdings: pd.DataFrame,
+            prices: pd.Series=None, managed=None,
+            names: pd.Series=None) -> pd.DataFrame:
+        '''
+        #### 계획 → 매도 주문 → (매도 체결 대기) → 매수 주문 → 체결 확인
+        dry_run이면 계획만 반환함
+        '''
+        plan = self.get_plan(targets, holdings, prices, managed, names)
+        if self.dry_run or not len(plan):
+            return plan
+        plan = self.submit(plan, 'sell')
+        if self.wait_sells:
+            plan = self.poll(plan, plan.index[plan.구분 == '매도'])
+        plan = self.submit(plan, 'buy')
+        return self.poll(plan)
@@ -0,0 +1,269 @@
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+class SchemaError(Exception):
+    '''### KIS 응답 필드가 등록된 스키마와 다름'''
+
+def to_str(values, n):
+    return np.fromiter(values, object, n)
+
+def to_int(values, n):
+    return np.fromiter(map(int, values), np.int64, n)
+
+def to_float(values, n):
+    return np.fromiter(map(float, values), np.float64, n)
+
+def to_date(values, n):
+    return pd.to_datetime(np.fromiter(values, object, n), format='%Y%m%d')
+
+def to_int32(values, n):
+    return np.fromiter(map(int, values), np.int32, n)
+
+def to_float32(values, n):
+    return np.fromiter(map(float, values), np.float32, n)
+
+def to_category(values, n):
+    return pd.Categorical(np.fromiter(values, object, n))
+
+parsers = dict(str=to_str, int=to_int, float=to_float, date=to_date,
+               int32=to_int32, float32=to_float32, category=to_category)
+
+# 합친 프레임을 다시 줄일 때 바꿀 dtype (str, date는 그대로 둠)
+compact_dtypes = dict(int=np.int64, float=np.float64, int32=np.int32,
+                      float32=np.float32, category='category')
+
+class Schema:
+    '''
+    ### TR 응답(딕셔너리 목록) → DataFrame 변환 규칙
+    * fields : `[(응답 필드, 컬럼명, 타입), ...]` (타입 : str, int, float, date)
+    * compact : compact 모드에서 남길 `{컬럼명: 타입}`
+      (타입에 int32, float32, category 추가, 없는 컬럼은 파싱하지 않음)
+
+    필드 이름으로 값을 꺼내서 컬럼마다 한 번에 타입 배열로 만들기 때문에
+    순서가 바뀌어도 컬럼이 어긋나지 않고, 필드가 추가/누락되면 예외를 냄
+    '''
+    def __init__(self, fields, compact=None):
+        self.fields = [tuple(f) for f in fields]
+        self.keys = tuple(f[0] for f in self.fields)
+        self.columns = [f[1] for f in self.fields]
+        self.compact_fields = self.fields if compact is None else [
+            (key, column, compact[column])
+            for key, column, _ in self.fields if column in compact]
+
+    def check(self, row: dict, strict=True):
+        '''
+        #### 응답 필드 검사
+        * strict : False면 추가된 필드는 무시함 (누락은 항상 예외)
+        '''
+        if len(row) == len(self.keys) and tuple(row) == self.keys:
+            return
+        missing = [k for k in self.keys if k not in row]
+        added = [k for k in row if k not in self.keys]
+        if missing or (added and strict):
+            raise SchemaError(f'응답 필드 변경 (누락 : {missing}, 추가 : {added})')
+
+    def decode(self, rows, strict=True, compact=False) -> pd.DataFrame:
+        '''
+        #### 응답 행 목록을 타입이 지정된 DataFrame으로
+        * compact : True면 compact 컬럼만 작은 dtype으로 파싱
+        '''
+        rows = rows or []
+        if rows:
+            self.check(rows[0], strict)
+        fields = self.compact_fields if compact else self.fields
+        try: # 필드마다 행 목록에서 바로 타입 배열을 채움 (중간 리스트/object 프레임 없음)
+            return pd.DataFrame(
+                {column: parsers[dtype](map(itemgetter(key), rows), len(rows))
+                 for key, column, dtype in fields},
+                copy=False)
+        except KeyError as ex:
+            raise SchemaError(f'응답 필드 누락 : {ex}')
+
+    def to_compact(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        #### 프레임을 compact 컬럼/dtype으로
+        compact 프레임끼리 합치면서 범주가 object로 풀린 경우나 일반 모드
+        프레임에 사용함. 스키마에 없는 (파생) 컬럼은 그대로 둠
+        '''
+        keep = {column for _, column, _ in self.compact_fields}
+        dropped = [c for c in self.columns if c in df and c not in keep]
+        dtypes = {column: compact_dtypes[dtype]
+                  for _, column, dtype in self.compact_fields
+                  if column in df and dtype in compact_dtypes}
+        return df.drop(columns=dropped).astype(dtypes)
+
+registry = {}
+
+def register(tr_id, fields, compact=None) -> Schema:
+    '''### TR ID별 스키마 등록'''
+    registry[tr_id] = Schema(fields, compact)
+    return registry[tr_id]
+
+def decode(tr_id, rows, strict=True, compact=False) -> pd.DataFrame:
+    '''### 등록된 스키마로 TR 응답 변환'''
+    return registry[tr_id].decode(rows, strict, compact)
+
+def to_compact(tr_id, df: pd.DataFrame) -> pd.DataFrame:
+    '''### 등록된 스키마의 compact 컬럼/dtype으로'''
+    return registry[tr_id].to_compact(df)
+
+# 주식현재가 일자별
+register('FHKST01010400', [
+    ('stck_bsop_date', '영업일자', 'date'),
+    ('stck_oprc', '시가', 'int'),
+    ('stck_hgpr', '고가', 'int'),
+    ('stck_lwpr', '저가', 'int'),
+    ('stck_clpr', '종가', 'int'),
+    ('acml_vol', '거래량', 'int'),
+    ('prdy_vrss_vol_rate', '전일대비거래량비율', 'float'),
+    ('prdy_vrss', '전일대비', 'int'),
+    ('prdy_vrss_sign', '전일대비부호', 'str'),
+    ('prdy_ctrt', '전일대비율', 'float'),
+    ('hts_frgn_ehrt', '외국인소진율', 'float'),
+    ('frgn_ntby_qty', '외국인순매수', 'int'),
+    ('flng_cls_code', '락구분코드', 'str'),
+    ('acml_prtt_rate', '누적분할비율', 'float'),
+], compact={
+    '영업일자': 'date', '시가': 'int32', '고가': 'int32', '저가': 'int32',
+    '종가': 'int32', '거래량': 'int', '전일대비': 'int32',
+    '전일대비부호': 'category', '전일대비율': 'float32',
+    '락구분코드': 'category',
+})
+
+# 투자계좌 자산현황 조회
+register('CTRP6548R', [
+    ('pchs_amt', '매입금액', 'float'),
+    ('evlu_amt', '평가금액', 'float'),
+    ('evlu_pfls_amt', '평가손익금액', 'float'),
+    ('crdt_lnd_amt', '신용대출금액', 'float'),
+    ('real_nass_amt', '실제순자산금액', 'float'),
+    ('whol_weit_rt', '전체비중율', 'float'),
+])
+
+# 주식잔고 조회
+register('TTTC8434R', [
+    ('pdno', '상품번호', 'str'),
+    ('prdt_name', '상품명', 'str'),
+    ('trad_dvsn_name', '매매구분명', 'str'),
+    ('bfdy_buy_qty', '전일매수수량', 'str'),
+    ('bfdy_sll_qty', '전일매도수량', 'str'),
+    ('thdt_buyqty', '금일매수수량', 'str'),
+    ('thdt_sll_qty', '금일매도수량', 'str'),
+    ('hldg_qty', '보유수량', 'int'),
+    ('ord_psbl_qty', '주문가능수량', 'str'),
+    ('pchs_avg_pric', '매입평균가격', 'float'),
+    ('pchs_amt', '매입금액', 'str'),
+    ('prpr', '현재가', 'int'),
+    ('evlu_amt', '평가금액', 'str'),
+    ('evlu_pfls_amt', '평가손익금액', 'int'),
+    ('evlu_pfls_rt', '평가손익율', 'str'),
+    ('evlu_erng_rt', '평가수익율', 'str'),
+    ('loan_dt', '대출일자', 'str'),
+    ('loan_amt', '대출금액', 'str'),
+    ('stln_slng_chgs', '대주매각대금', 'str'),
+    ('expd_dt', '만기일자', 'str'),
+    ('fltt_rt', '등락율', 'str'),
+    ('bfdy_cprs_icdc', '전일대비증감', 'str'),
+    ('item_mgna_rt_name', '종목증거금율명', 'str'),
+    ('grta_rt_name', '보증금율명', 'str'),
+    ('sbst_pric', '대용가격', 'str'),
+    ('stck_loan_unpr', '주식대출단가', 'str'),
+], compact={
+    '상품번호': 'str', '상품명': 'category', '매매구분명': 'category',
+    '전일매수수량': 'int32', '전일매도수량': 'int32',
+    '금일매수수량': 'int32', '금일매도수량': 'int32',
+    '보유수량': 'int32', '주문가능수량': 'int32',
+    '매입평균가격': 'float', '매입금액': 'int', '현재가': 'int32',
+    '평가금액': 'int', '평가손익금액': 'int',
+    '평가손익율': 'float32', '평가수익율': 'float32', '등락율': 'float32',
+})
+
+# 주식일별주문체결조회
+register('TTTC8001R', [
+    ('ord_dt', '주문일자', 'str'),
+    ('ord_gno_brno', '주문채번지점번호', 'str'),
+    ('odno', '주문번호', 'str'),
+    ('orgn_odno', '원주문번호', 'str'),
+    ('ord_dvsn_name', '주문구분명', 'str'),
+    ('sll_buy_dvsn_cd', '매도매수구분코드', 'str'),
+    ('sll_buy_dvsn_cd_name', '매도매수구분코드명', 'str'),
+    ('pdno', '상품번호', 'str'),
+    ('prdt_name', '상품명', 'str'),
+    ('ord_qty', '주문수량', 'int'),
+    ('ord_unpr', '주문단가', 'int'),
+    ('ord_tmd', '주문시각', 'str'),
+    ('tot_ccld_qty', '총체결수량', 'int'),
+    ('avg_prvs', '평균가', 'int'),
+    ('cncl_yn', '취소여부', 'str'),
+    ('tot_ccld_amt', '총체결금액', 'int'),
+    ('loan_dt', '대출일자', 'str'),
+    ('ordr_empno', '주문담당자', 'str'),
+    ('ord_dvsn_cd', '주문구분코드', 'str'),
+    ('cncl_cfrm_qty', '취소확인수량', 'int'),
+    ('rmn_qty', '잔여수량', 'int'),
+    ('rjct_qty', '거부수량', 'int'),
+    ('ccld_cndt_name', '체결조건명', 'str'),
+    ('inqr_ip_addr', '요청IP주소', 'str'),
+    ('cpbc_ordp_ord_rcit_dvsn_cd', 'x1', 'str'),
+    ('cpbc_ordp_infm_mthd_dvsn_cd', 'x2', 'str'),
+    ('infm_tmd', '통보시각', 'str'),
+    ('ctac_tlno', '연락전화번호', 'str'),
+    ('prdt_type_cd', '상품유형코드', 'str'),
+    ('excg_dvsn_cd', '거래소구분코드', 'str'),
+    ('cpbc_ordp_mtrl_dvsn_cd', 'x3', 'str'),
+    ('ord_orgno', 'x4', 'str'),
+    ('rsvn_ord_end_dt', 'x5', 'str'),
+], compact={
+    '주문일자': 'str', '주문번호': 'str', '원주문번호': 'str',
+    '주문구분명': 'category', '매도매수구분코드': 'category',
+    '매도매수구분코드명': 'category', '상품번호': 'category',
+    '상품명': 'category', '주문수량': 'int32', '주문단가': 'int32',
+    '주문시각': 'str', '총체결수량': 'int32', '평균가': 'int32',
+    '취소여부': 'category', '총체결금액': 'int', '주문구분코드': 'category',
+    '취소확인수량': 'int32', '잔여수량': 'int32', '거부수량': 'int32',
+    '체결조건명': 'category', '상품유형코드': 'category',
+    '거래소구분코드': 'category',
+})
+
+# 국내휴장일조회
+register('CTCA0903R', [
+    ('bass_dt', '기준일자', 'date'),
+    ('wday_dvsn_cd', '요일구분코드', 'str'),
+    ('bzdy_yn', '영업일여부', 'str'),
+    ('tr_day_yn', '거래일여부', 'str'),
+    ('opnd_yn', '개장일여부', 'str'),
+    ('sttl_day_yn', '결제일여부', 'str'),
+])
+
+# 국내주식기간별시세(일/주/월/년) (output2)
+register('FHKST03010100', [
+    ('stck_bsop_date', '영업일자', 'date'),
+    ('stck_clpr', '종가', 'int'),
+    ('stck_oprc', '시가', 'int'),
+    ('stck_hgpr', '고가', 'int'),
+    ('stck_lwpr', '저가', 'int'),
+    ('acml_vol', '거래량', 'int'),
+    ('acml_tr_pbmn', '거래대금', 'int'),
+    ('flng_cls_code', '락구분코드', 'str'),
+    ('prtt_rate', '분할비율', 'float'),
+    ('mod_yn', '분할변경여부', 'str'),
+    ('prdy_vrss_sign', '전일대비부호', 'str'),
+    ('prdy_vrss', '전일대비', 'int'),
+    ('revl_issu_reas', '재평가사유코드', 'str'),
+], compact={
+    '영업일자': 'date', '종가': 'int32', '시가': 'int32', '고가': 'int32',
+    '저가': 'int32', '거래량': 'int', '거래대금': 'int',
+    '락구분코드': 'category', '분할비율': 'float32',
+    '전일대비부호': 'category', '전일대비': 'int32',
+})
+
+# 주식주문(현금) 매도/매수 (output)
+order_cash_fields = [
+    ('KRX_FWDG_ORD_ORGNO', '주문채번지점번호', 'str'),
+    ('ODNO', '주문번호', 'str'),
+    ('ORD_TMD', '주문시각', 'str'),
+]
+register('TTTC0801U', order_cash_fields)
+register('TTTC0802U', order_cash_fields)
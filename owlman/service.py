@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import threading
+import traceback
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+from owlman.kis_trading import KISTrading
+from owlman.naver_finance import NaverFinance
+from owlman.trading_helper import TradingHelper
+from owlman.history_store import HistoryStore, KST
+from owlman.bond_helper import BondHelper
+
+class NotReady(Exception):
+    '''### 첫 갱신 전이라 응답할 상태가 없음'''
+
+def to_json(df: pd.DataFrame) -> bytes:
+    '''### DataFrame 응답 본문 (`orient='split'`, 날짜는 ISO 문자열)'''
+    return df.to_json(orient='split', force_ascii=False,
+                      date_format='iso').encode()
+
+class OwlmanService:
+    '''
+    ### 상주 서비스
+    * kis_client : `KISTrading` (토큰, 커넥션 풀, 유량 제어를 계속 재사용)
+    * universe_options : `NaverFinance.get_etf_item_list` 인자
+    * helper_options : `TradingHelper` 인자 (n_clusters, screen, limit, buffer 등)
+    * interval : 자동 갱신 주기 (초, None이면 `refresh()` 할 때만)
+    * bond_days : 지정 시 최근 bond_days일 채권 매매 손익도 계산
+    * history_store : 시세 저장소 (기본 `HistoryStore()`)
+
+    클라이언트, 시세, 상관/군집 상태, 채권 캐시를 메모리에 둔 채로 주기적으로
+    갱신하고, 갱신할 때마다 기본 응답을 JSON으로 미리 만들어 둠.
+    파라미터가 있는 요청은 `TradingHelper.copy`한 사본에서 계산해서 기본 상태를
+    바꾸지 않음 (파이프라인 캐시를 공유하므로 바뀐 단계만 다시 계산)
+
+        service = OwlmanService(kis_client, dict(market_cap=500))
+        service.start()
+        service.serve(socket_path='/tmp/owlman.sock')
+    '''
+    def __init__(self, kis_client: KISTrading,
+                 universe_options: dict=None, helper_options: dict=None,
+                 interval=600, bond_days=None,
+                 history_store: HistoryStore=None):
+        self.kis_client = kis_client
+        self.universe_options = universe_options or {}
+        self.helper_options = helper_options or {}
+        self.interval = interval
+        self.bond_days = bond_days
+        self.history_store = history_store or HistoryStore()
+        self.helper : TradingHelper = None
+        self.bond_result : pd.DataFrame = None
+        self.lock = threading.RLock()
+        self.responses = {} # 경로 -> 미리 만든 응답 본문
+        self.version = 0
+        self.refreshed_at = None
+        self.refresh_seconds = None
+        self.error = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def refresh(self):
+        '''#### 유니버스, 시세, 계좌, 채권 손익 갱신 후 기본 응답 다시 만들기'''
+        start = time.time()
+        try:
+            universe = NaverFinance.get_etf_item_list(**self.universe_options)
+            # 네트워크 조회와 계산은 잠금 밖에서 helper 사본에 하고 교체만 잠금 안에서 함
+            # (갱신 중에도 파라미터 요청은 이전 helper로 응답)
+            with self.lock:
+                helper = self.helper.copy() if self.helper else None
+            if helper is None:
+                helper = TradingHelper(self.kis_client, universe,
+                                       history_store=self.history_store,
+                                       **self.helper_options)
+            else:
+                helper.refresh(universe=universe)
+            with self.lock:
+                self.helper = helper
+            bond_result = self.get_bond_result() if self.bond_days else None
+            with self.lock:
+                self.bond_result = bond_result
+                self.version += 1
+                self.refreshed_at = datetime.now(KST)
+                self.refresh_seconds = time.time() - start
+                self.error = None
+                self.responses = self.render()
+        except Exception as ex:
+            traceback.print_exc()
+            self.error = f'{type(ex).__name__}: {ex}'
+        return self.status()
+
+    def get_bond_result(self) -> pd.DataFrame:
+        '''#### 채권 매매 손익, 보유 종목 시세는 캐시에 미리 받아 둠'''
+        end = datetime.now(KST)
+        start = end - timedelta(days=self.bond_days)
+        buy, sell = BondHelper.get_bond_trading_result(
+            self.kis_client, start.strftime('%Y%m%d'), end.strftime('%Y%m%d'))
+        result = BondHelper.get_merged_result(buy, sell)
+        own = result.loc[result.매도일자.isnull()]
+        if len(own):
+            BondHelper.prefetch(own.상품번호.unique())
+        return result
+
+    def render(self) -> dict:
+        '''#### 파라미터 없는 요청의 응답 본문'''
+        responses = {
+            '/screen_table': to_json(self.helper.screen_table),
+            '/data_group_table': to_json(self.helper.get_data_group_table()),
+        }
+        if self.bond_result is not None:
+            responses['/bond'] = to_json(self.bond_result)
+        return responses
+
+    def status(self) -> dict:
+        return dict(
+            version=self.version,
+            refreshed_at=self.refreshed_at.isoformat()
+                if self.refreshed_at else None,
+            refresh_seconds=self.refresh_seconds,
+            universe=len(self.helper.universe) if self.helper else 0,
+            throttle=self.kis_client.throttle.stats,
+            error=self.error)
+
+    def get(self, path, params: dict) -> bytes:
+        '''
+        #### 요청 처리
+        * return : JSON 본문 (없는 경로는 None, 첫 갱신 전이면 `NotReady`)
+        '''
+        if path == '/status':
+            return json.dumps(self.status(), ensure_ascii=False).encode()
+        if not params and path in self.responses:
+            return self.responses[path]
+        if self.helper is None:
+            raise NotReady('아직 준비되지 않음')
+        with self.lock: # 사본에서 계산해서 기본 상태와 잠금은 건드리지 않음
+            helper = self.helper.copy()
+            bond_result = self.bond_result
+        if path == '/screen_table':
+            return to_json(helper.update(**{
+                k: (float if k == 'limit' else int)(params[k])
+                for k in ('n_clusters', 'screen', 'limit', 'buffer')
+                if k in params}))
+        if path == '/data_group_table' and 'n_clusters' in params:
+            helper.regroup(int(params['n_clusters']))
+            return to_json(helper.get_data_group_table())
+        if path == '/bond/predict' and bond_result is not None:
+            own = bond_result.loc[bond_result.매도일자.isnull()]
+            return to_json(BondHelper.cal_earn_predict(
+                own, screen=float(params.get('screen', 0)),
+                tax=params.get('tax') == '1'))
+        return None
+
+    def run(self):
+        '''#### 주기적으로 갱신 (백그라운드 스레드)'''
+        while not self.stopped.wait(self.interval):
+            self.refresh()
+
+    def start(self):
+        '''#### 처음 갱신 후 주기 갱신 스레드 시작'''
+        self.refresh()
+        if self.interval:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def create_server(self, host='127.0.0.1', port=8765, socket_path=None):
+        '''
+        #### HTTP 서버 생성
+        * socket_path : 지정 시 TCP 대신 Unix 소켓으로 받음
+        '''
+        handler = type('Handler', (ServiceHandler,), dict(service=self))
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            return UnixHTTPServer(socket_path, handler)
+        return ThreadingHTTPServer((host, port), handler)
+
+    def serve(self, host='127.0.0.1', port=8765, socket_path=None):
+        '''#### 요청 받기 (종료할 때까지 반환하지 않음)'''
+        server = self.create_server(host, port, socket_path)
+        print(f'SERVING : {socket_path or f"http://{host}:{port}"}')
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            self.stop()
+
+class UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    '''### `OwlmanService` 요청 처리 (GET 조회, POST /refresh 즉시 갱신)'''
+    protocol_version = 'HTTP/1.1'
+    service : OwlmanService = None
+
+    def log_message(self, *args):
+        pass
+
+    def address_string(self):
+        return str(self.client_address or 'unix')
+
+    def send_body(self, body: bytes, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        self.send_body(json.dumps(dict(error=message),
+                                  ensure_ascii=False).encode(), status)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        try:
+            body = self.service.get(url.path.rstrip('/'), params)
+        except NotReady as ex:
+            return self.send_error_json(503, str(ex))
+        except Exception as ex:
+            return self.send_error_json(500, f'{type(ex).__name__}: {ex}')
+        if body is None:
+            return self.send_error_json(404, f'없는 경로 : {url.path}')
+        self.send_body(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        if urlparse(self.path).path.rstrip('/') != '/refresh':
+            return self.send_error_json(404, f'없는 경로 : {self.path}')
+        status = self.service.refresh()
+        self.send_body(json.dumps(status, ensure_ascii=False).encode())
@@ -0,0 +1,57 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+worker_arrays = {} # 워커 프로세스에서 연결한 배열 (이름 -> ndarray)
+worker_blocks = [] # 연결한 공유 메모리 블록 (참조 유지용)
+
+class SharedPanel:
+    '''
+    ### 프로세스 간 공유 메모리 배열 묶음
+    부모 프로세스에서 한 번 복사해 두고 워커는 `attach`로 복사 없이 연결함
+
+        with SharedPanel(dict(close=panel.close)) as shared:
+            with Pool(initializer=SharedPanel.attach,
+                      initargs=(shared.spec,)) as p:
+                ...  # 워커에서는 worker_arrays['close'] 사용
+    '''
+    def __init__(self, arrays: dict):
+        self.blocks = {}
+        self.arrays = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(
+                create=True, size=max(array.nbytes, 1))
+            shared = np.ndarray(array.shape, array.dtype, buffer=block.buf)
+            shared[...] = array
+            self.blocks[name] = block
+            self.arrays[name] = shared
+
+    @property
+    def spec(self) -> dict:
+        '''#### 워커에 넘길 연결 정보 `{이름: (블록 이름, shape, dtype)}`'''
+        return {k: (self.blocks[k].name, v.shape, v.dtype.str)
+                for k, v in self.arrays.items()}
+
+    @classmethod
+    def attach(cls, spec: dict) -> dict:
+        '''#### 워커 프로세스에서 공유 배열 연결 (Pool initializer)'''
+        worker_arrays.clear()
+        for name, (block_name, shape, dtype) in spec.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            worker_blocks.append(block)
+            worker_arrays[name] = np.ndarray(shape, dtype, buffer=block.buf)
+        return worker_arrays
+
+    def close(self):
+        self.arrays.clear()
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
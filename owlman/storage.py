@@ -0,0 +1,98 @@
+import os
+import tempfile
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+def owlman_home(*paths) -> str:
+    '''
+    ### 로컬 저장소 경로
+    `OWLMAN_HOME` 환경변수가 없으면 `~/.owlman`을 사용함
+    '''
+    home = os.environ.get('OWLMAN_HOME') or os.path.join(
+        os.path.expanduser('~'), '.owlman')
+    path = os.path.join(home, *paths)
+    os.makedirs(os.path.dirname(path) if paths else path, exist_ok=True)
+    return path
+
+class FileLock:
+    '''
+    ### 프로세스 간 파일 잠금
+    `with FileLock(path):` 블록 동안 같은 경로를 잠그는 다른 프로세스/스레드는 대기함
+    '''
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.file = open(self.path, 'a+')
+        if fcntl:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+
+def atomic_write(path, data: bytes):
+    '''### 임시 파일에 쓴 뒤 교체해서 읽는 쪽이 쓰다 만 파일을 보지 않게 함'''
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+try:
+    import pyarrow # noqa: F401
+    FRAME_FORMAT = 'parquet'
+except ImportError:
+    FRAME_FORMAT = 'pickle'
+
+def write_frame(path, df):
+    '''
+    ### DataFrame 저장
+    pyarrow가 있으면 Parquet, 없으면 pickle (둘 다 dtype을 보존함)
+    '''
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    os.close(fd)
+    try:
+        if FRAME_FORMAT == 'parquet':
+            df.to_parquet(tmp)
+        else:
+            df.to_pickle(tmp, compression=None)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def read_frame(path):
+    '''### `write_frame`으로 저장한 DataFrame 읽기 (없으면 None)'''
+    if not os.path.exists(path):
+        return None
+    if FRAME_FORMAT == 'parquet':
+        return pd.read_parquet(path)
+    return pd.read_pickle(path, compression=None)
+
+def frame_path(directory, name) -> str:
+    '''### 저장 형식에 맞는 확장자를 붙인 경로'''
+    ext = 'parquet' if FRAME_FORMAT == 'parquet' else 'pkl'
+    return os.path.join(directory, f'{name}.{ext}')
@@ -0,0 +1,93 @@
+import time
+import itertools
+from multiprocessing import Pool
+
+import pandas as pd
+
+from owlman.backtest import Backtester, simulate
+from owlman.shared_panel import SharedPanel, worker_arrays
+
+worker_state = {} # 워커 프로세스의 날짜별 재료와 패널 축
+
+def init_worker(spec, features, dates, symbols):
+    '''### 워커 초기화 : 공유 메모리 연결, 재료는 워커당 한 번만 전달'''
+    SharedPanel.attach(spec)
+    worker_state.update(features=features, dates=dates, symbols=symbols)
+
+def run_combination(params) -> dict:
+    '''### 파라미터 조합 하나를 시뮬레이션하고 요약 지표 반환'''
+    result = simulate(
+        worker_state['features'], worker_arrays['close'],
+        worker_state['dates'], worker_state['symbols'],
+        keep_holdings=False, **params)
+    return dict(params, **result.summary())
+
+class ParameterSweep:
+    '''
+    ### 스크린/그룹화 파라미터 병렬 탐색
+    파라미터 격자의 모든 조합을 백테스트해서 조합별 지표 테이블을 만듦
+
+        sweep = ParameterSweep(Backtester.from_store(store, universe.index))
+        table = sweep.run(dict(n_clusters=[8, 10, 12], screen=[3, 4, 5],
+                               limit=[0.01, 0.015], buffer=[0, 1, 2],
+                               periods=[(2, 3, 5, 8, 13, 21), (5, 10, 20)]))
+
+    가격 패널(True Range, 종가)은 공유 메모리에 한 번만 올리고, 상관계수/연결
+    트리는 창 길이(`max(periods)`)가 같은 조합끼리, 그룹 자르기는 `n_clusters`가
+    같은 조합끼리 재사용해서 `periods`마다 점수/위험만 다시 계산함
+    '''
+    defaults = dict(n_clusters=[10], screen=[4], limit=[0.015], buffer=[1])
+
+    def __init__(self, backtester: Backtester):
+        self.backtester = backtester
+
+    def get_combinations(self, grid: dict) -> list:
+        '''#### 격자를 `(periods, 파라미터 dict 목록)` 묶음으로 펼치기'''
+        grid = dict(self.defaults, **grid)
+        periods_list = [tuple(p) for p in
+                        grid.pop('periods', [self.backtester.periods])]
+        keys = list(grid)
+        combos = [dict(zip(keys, values))
+                  for values in itertools.product(*grid.values())]
+        return [(p, combos) for p in periods_list]
+
+    def run(self, grid: dict, start=None, end=None, step=5,
+            capital=1e8) -> pd.DataFrame:
+        '''
+        #### 격자 탐색 실행
+        * grid : `n_clusters`, `screen`, `limit`, `buffer`, `periods`별 후보 목록
+        * return : 조합별 파라미터와 `BacktestResult.summary()` 지표 테이블
+        '''
+        bt = self.backtester
+        panel = bt.panel
+        combinations = self.get_combinations(grid)
+        window = max(max(p) for p, _ in combinations)
+        dates = bt.get_dates(start, end, step, window) # 모든 조합이 같은 날짜 사용
+        rows = []
+        trees = {} # 창 길이(max(periods)) -> 날짜별 연결 트리
+        start_time = time.time()
+        with bt.share() as shared:
+            for periods, combos in combinations:
+                n_clusters = sorted({c['n_clusters'] for c in combos})
+                if max(periods) not in trees:
+                    trees[max(periods)] = bt.get_trees(
+                        dates, max(periods), n_clusters, shared.spec)
+                features = bt.get_features(dates, periods, n_clusters,
+                                           trees=trees[max(periods)])
+                tasks = [dict(c, capital=capital) for c in combos]
+                initargs = (shared.spec, features, panel.dates, panel.symbols)
+                if bt.processes > 1 and len(tasks) > 1:
+                    with Pool(bt.processes, initializer=init_worker,
+                              initargs=initargs) as p:
+                        results = p.map(run_combination, tasks)
+                else:
+                    init_worker(*initargs)
+                    results = [run_combination(t) for t in tasks]
+                    worker_arrays.clear()
+                    worker_state.clear()
+                rows += [dict(r, periods=periods) for r in results]
+        print(f'Sweep({len(rows)}) : {time.time() - start_time : .2f} seconds')
+        table = pd.DataFrame(rows)
+        params = ['periods', 'n_clusters', 'screen', 'limit', 'buffer']
+        return table[params + [c for c in table if c not in params]]\
+            .drop(columns='capital')
@@ -0,0 +1,149 @@
+import time
+import random
+import threading
+
+import requests
+
+class TokenBucket:
+    '''
+    ### 토큰 버킷
+    * rate : 초당 채워지는 토큰 수
+    * capacity : 버킷 크기 (순간적으로 허용하는 최대 요청 수)
+    '''
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        '''
+        #### 토큰 1개 예약
+        바로 쓸 수 있으면 0, 아니면 기다려야 하는 시간(초)을 반환
+        '''
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        '''#### 토큰을 얻을 때까지 대기 후 대기 시간(초) 반환'''
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+class Throttle:
+    '''
+    ### KIS 공용 요청 제어
+    * rate : 전체 엔드포인트 공용 초당 요청 수 (KIS 실전계좌 기준 초당 20건 미만)
+    * rates : TR ID 또는 엔드포인트별 초당 요청 수 `{'FHKST01010400': 10}`
+    * max_retries : 재시도 횟수
+    * backoff, max_backoff : 지수 백오프 기준/최대 대기 시간(초)
+
+    HTTP 429/5xx, KIS 유량 제한 코드 응답, 접속 오류는
+    지터를 준 지수 백오프로 재시도함
+    '''
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+    RATE_LIMIT_CODES = {
+        'EGW00201', # 초당 거래건수를 초과하였습니다.
+        'EGW00133', # 접근토큰 발급 잠시 후 다시 시도하세요(1분당 1회)
+    }
+
+    def __init__(self, rate=15, rates=None,
+                 max_retries=5, backoff=0.25, max_backoff=8):
+        self.bucket = TokenBucket(rate)
+        self.buckets = {k: TokenBucket(v) for k, v in (rates or {}).items()}
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.lock = threading.Lock()
+        self.stats = dict(requests=0, retries=0, failures=0,
+                          throttled_seconds=0.0, backoff_seconds=0.0)
+
+    def count(self, **kwargs):
+        with self.lock:
+            for k, v in kwargs.items():
+                self.stats[k] += v
+
+    def set_rate(self, rate, key=None):
+        '''#### 초당 요청 수 변경 (key 없으면 공용 버킷)'''
+        if key is None:
+            self.bucket = TokenBucket(rate)
+        else:
+            self.buckets[key] = TokenBucket(rate)
+
+    def acquire(self, key=None):
+        '''#### 공용 버킷과 키별 버킷에서 토큰 획득'''
+        waited = self.bucket.acquire()
+        if key in self.buckets:
+            waited += self.buckets[key].acquire()
+        self.count(requests=1, throttled_seconds=waited)
+
+    def is_rate_limited(self, res: requests.Response) -> bool:
+        '''#### 유량 제한으로 처리되지 않은 요청 (429, KIS 유량 제한 코드)'''
+        return res.status_code == 429 or any(
+            code.encode() in res.content for code in self.RATE_LIMIT_CODES)
+
+    def is_retryable(self, res: requests.Response) -> bool:
+        return res.status_code in self.RETRY_STATUS\
+            or self.is_rate_limited(res)
+
+    def get_backoff(self, attempt) -> float:
+        '''#### 풀 지터 지수 백오프'''
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def call(self, func, key=None, idempotent=True) -> requests.Response:
+        '''
+        #### 요청 제어 하에 `func()` 실행
+        재시도를 모두 소진하면 마지막 응답을 반환하거나 마지막 예외를 던짐
+        * idempotent : False(주문 등)면 서버가 처리하지 않은 것이 확실한
+          유량 제한 응답만 재시도함 (5xx, 타임아웃은 중복 주문 위험이 있어 바로 반환)
+        '''
+        retryable = self.is_retryable if idempotent else self.is_rate_limited
+        for attempt in range(self.max_retries + 1):
+            self.acquire(key)
+            try:
+                res = func()
+                if not retryable(res):
+                    return res
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries or not idempotent:
+                    self.count(failures=1)
+                    raise
+            if attempt == self.max_retries:
+                self.count(failures=1)
+                return res
+            wait = self.get_backoff(attempt)
+            self.count(retries=1, backoff_seconds=wait)
+            time.sleep(wait)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def reset_stats(self):
+        with self.lock:
+            for k in self.stats:
+                self.stats[k] = type(self.stats[k])()
@@ -0,0 +1,72 @@
+import os
+import json
+import time
+import hashlib
+
+from owlman.storage import owlman_home, FileLock, atomic_write
+
+class TokenStore:
+    '''
+    ### 접근 토큰 디스크 캐시
+    * path : 저장 파일 (기본 `~/.owlman/token.json`)
+    * margin : 만료 몇 초 전부터 새로 발급할지 (기본 1시간)
+
+    appkey별로 토큰과 만료 시각을 저장하고, 파일 잠금으로
+    여러 프로세스가 동시에 발급을 요청하지 않도록 함
+    '''
+    def __init__(self, path=None, margin=3600):
+        self.path = path or owlman_home('token.json')
+        self.margin = margin
+
+    @classmethod
+    def get_key(cls, appkey, domain='') -> str:
+        '''#### appkey 원문을 저장하지 않도록 해시 사용'''
+        return hashlib.sha256(f'{domain}|{appkey}'.encode()).hexdigest()[:16]
+
+    def read(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except ValueError:
+            return {}
+
+    def is_fresh(self, entry) -> bool:
+        return bool(entry)\
+            and entry.get('expires_at', 0) - self.margin > time.time()
+
+    def get(self, appkey, issue, domain='') -> tuple:
+        '''
+        #### 유효한 토큰 조회, 없거나 만료 임박 시 `issue()`로 발급 후 저장
+        * domain : 모의투자/실전 등 서버별로 토큰을 구분
+        * issue : `(access_token, expires_at)`을 반환하는 함수
+        * return : `(access_token, expires_at)`
+        '''
+        key = self.get_key(appkey, domain)
+        entry = self.read().get(key)
+        if self.is_fresh(entry):
+            return entry['access_token'], entry['expires_at']
+        with FileLock(self.path + '.lock'):
+            tokens = self.read() # 대기 중 다른 프로세스가 발급했을 수 있음
+            entry = tokens.get(key)
+            if self.is_fresh(entry):
+                return entry['access_token'], entry['expires_at']
+            access_token, expires_at = issue()
+            tokens = {k: v for k, v in tokens.items()
+                      if v.get('expires_at', 0) > time.time()}
+            tokens[key] = dict(access_token=access_token,
+                               expires_at=expires_at)
+            atomic_write(self.path, json.dumps(tokens).encode())
+            os.chmod(self.path, 0o600)
+            return access_token, expires_at
+
+    def clear(self, appkey=None, domain=''):
+        '''#### 저장된 토큰 삭제 (appkey 없으면 전체)'''
+        with FileLock(self.path + '.lock'):
+            tokens = self.read()
+            if appkey is None:
+                tokens = {}
+            else:
+                tokens.pop(self.get_key(appkey, domain), None)
+            atomic_write(self.path, json.dumps(tokens).encode())
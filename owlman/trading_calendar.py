@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from owlman.storage import (owlman_home, FileLock,
+                            read_frame, write_frame, frame_path)
+
+def to_days(dates) -> np.ndarray:
+    '''### 날짜 값/배열을 epoch 일수(int64) 배열로'''
+    if isinstance(dates, (pd.Series, pd.Index)):
+        dates = dates.to_numpy()
+    return np.asarray(pd.to_datetime(dates), dtype='datetime64[D]')\
+        .astype(np.int64)
+
+def to_dates(days) -> pd.DatetimeIndex:
+    '''### epoch 일수 배열을 날짜로'''
+    days = np.asarray(days, dtype='datetime64[D]').astype('datetime64[ns]')
+    return pd.DatetimeIndex(days.reshape(-1)) if days.ndim\
+        else pd.Timestamp(days[()])
+
+class TradingCalendar:
+    '''
+    ### 국내 주식 개장일 달력
+    * path : 저장 파일 (기본 `~/.owlman/calendar.pkl` 또는 `.parquet`)
+    * column : 개장 여부로 쓸 `get_holiday_list` 컬럼 (기본 '개장일여부')
+
+    `KISTrading.get_holiday_list`(chk-holiday)로 받은 날짜들을 저장해 두고,
+    개장일을 정렬된 epoch 일수 배열 하나로 만들어 모든 조회를 `searchsorted`로
+    처리함 (네트워크 없음). 받아 둔 기간 밖의 날짜는 평일을 개장일로 봄
+
+        calendar = TradingCalendar()
+        calendar.update(kis_client, '20240101', '20241231')
+        calendar.offset('20240927', 1)   # 다음 개장일
+    '''
+    lower = np.datetime64('1990-01-01', 'D').astype(np.int64)
+    upper = np.datetime64('2100-01-01', 'D').astype(np.int64)
+
+    def __init__(self, path=None, column='개장일여부'):
+        self.path = path
+        self.column = column
+        self.table = self.load()
+        self.build()
+
+    def get_path(self) -> str:
+        return self.path or frame_path(owlman_home(), 'calendar')
+
+    def load(self) -> pd.DataFrame:
+        '''#### 저장된 휴장일 테이블 (없으면 빈 테이블)'''
+        table = read_frame(self.get_path())
+        return table if table is not None else pd.DataFrame(
+            {self.column: []}, index=pd.DatetimeIndex([], name='기준일자'))
+
+    def build(self):
+        '''#### 개장일 인덱스 생성 (저장 기간 밖은 평일)'''
+        days = np.arange(self.lower, self.upper)
+        weekday = (days + 3) % 7 < 5 # 1970-01-01은 목요일
+        if len(self.table):
+            known = to_days(self.table.index)
+            self.first, self.last = known.min(), known.max()
+            inside = (days >= self.first) & (days <= self.last)
+            opened = np.zeros(len(days), dtype=bool)
+            opened[known - self.lower] = self.table[self.column].eq('Y')
+            self.open_days = days[np.where(inside, opened, weekday)]
+        else:
+            self.first = self.last = None
+            self.open_days = days[weekday]
+
+    def covers(self, dates) -> np.ndarray:
+        '''#### 조회해서 저장된 기간 안의 날짜인지'''
+        days = to_days(dates)
+        if self.first is None:
+            return np.zeros(np.shape(days), dtype=bool)
+        return (days >= self.first) & (days <= self.last)
+
+    def update(self, kis_client, start, end) -> pd.DataFrame:
+        '''
+        #### 저장되지 않은 기간만 chk-holiday로 받아서 저장
+        * kis_client : `KISTrading`
+        * start, end : 'YYYYMMDD'
+        '''
+        start, end = to_days(start), to_days(end)
+        ranges = [(start, end)] if self.first is None else\
+            [(start, min(end, self.first - 1)),
+             (max(start, self.last + 1), end)]
+        frames = [self.table]
+        for lo, hi in ranges:
+            base = lo
+            while base <= hi:
+                df = kis_client.get_holiday_list(
+                    to_dates(base).strftime('%Y%m%d'))
+                if df is None or not len(df):
+                    raise Exception(
+                        f'휴장일 조회 실패 : {to_dates(base).date()}')
+                frames.append(df[[self.column]])
+                base = to_days(df.index).max() + 1
+        if len(frames) > 1:
+            with FileLock(self.get_path() + '.lock'):
+                table = pd.concat(frames)
+                self.table = table.loc[
+                    ~table.index.duplicated(keep='last')].sort_index()
+                write_frame(self.get_path(), self.table)
+            self.build()
+        return self.table
+
+    def is_open(self, dates) -> np.ndarray:
+        '''#### 개장일 여부 (배열 가능)'''
+        days = to_days(dates)
+        pos = np.searchsorted(self.open_days, days)
+        pos = np.minimum(pos, len(self.open_days) - 1)
+        return self.open_days[pos] == days
+
+    def offset(self, dates, n=1):
+        '''
+        #### n번째 개장일
+        n > 0 이면 이후, n < 0 이면 이전 n번째 개장일,
+        n == 0 이면 개장일은 그대로, 휴장일은 다음 개장일
+        '''
+        days = to_days(dates)
+        if n > 0:
+            pos = np.searchsorted(self.open_days, days, 'right') + n - 1
+        else:
+            pos = np.searchsorted(self.open_days, days, 'left') + n
+        return to_dates(self.open_days[pos])
+
+    def rollback(self, dates):
+        '''#### 해당 날짜 이하 마지막 개장일'''
+        days = to_days(dates)
+        pos = np.searchsorted(self.open_days, days, 'right') - 1
+        return to_dates(self.open_days[pos])
+
+    def count_between(self, start, end) -> np.ndarray:
+        '''#### start 초과 end 이하 개장일 수 (start, end는 서로 브로드캐스트됨)'''
+        return np.searchsorted(self.open_days, to_days(end), 'right')\
+            - np.searchsorted(self.open_days, to_days(start), 'right')
+
+    def get_open_days(self, start, end) -> pd.DatetimeIndex:
+        '''#### start 이상 end 이하 개장일 목록'''
+        lo = np.searchsorted(self.open_days, to_days(start), 'left')
+        hi = np.searchsorted(self.open_days, to_days(end), 'right')
+        return to_dates(self.open_days[lo:hi])
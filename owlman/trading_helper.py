@@ -1,13 +1,21 @@
+import copy
 import time
+from datetime import datetime, timedelta
 from multiprocessing import Pool, cpu_count
 
 import pandas as pd
 import numpy as np
-from sklearn.decomposition import PCA
-from sklearn.cluster import AgglomerativeClustering
-import plotly.express as px
 
 from owlman.kis_trading import KISTrading
+from owlman.naver_finance import NaverFinance
+from owlman.async_kis_trading import AsyncKISTrading, run_sync
+from owlman.history_store import HistoryStore, KST
+from owlman.price_panel import PricePanel
+from owlman.pipeline import Pipeline
+from owlman.correlation import correlation, ClusterTree
+from owlman.online_scorer import OnlineScorer
+from owlman.quote_stream import QuoteStream
+from owlman.rebalancer import Rebalancer
 
 class TradingHelper:
     periods = [2, 3, 5, 8, 13, 21]
@@ -15,26 +23,115 @@ class TradingHelper:
     def __init__(self,
                  kis_client: KISTrading,
                  universe: pd.DataFrame=None,
-                 n_clusters=10, screen=4, limit=0.015, buffer=1):
-        
+                 n_clusters=10, screen=4, limit=0.015, buffer=1,
+                 async_client: AsyncKISTrading=None,
+                 history_store: HistoryStore=None,
+                 history_days=None, compact=False):
+        '''
+        * compact : True면 종목별 시세는 패널 컬럼(OHLCV)만 int32/int64로 읽고,
+          패널은 float32로, 유니버스는 `NaverFinance.to_compact`로 줄여서 보관
+        '''
         self.kis_client : KISTrading = kis_client
-        self.universe = universe
+        self.async_client : AsyncKISTrading\
+            = async_client or AsyncKISTrading(kis_client)
+        self.history_store : HistoryStore = history_store
+        self.history_days = history_days
+        self.compact = compact
+        self.universe = NaverFinance.to_compact(universe)\
+            if compact else universe
         print(f'UNIVERSE : {len(universe)}')
+        self.pipeline = self.get_pipeline()
+        self.update(n_clusters=n_clusters, screen=screen,
+                    limit=limit, buffer=buffer)
+
+    def get_pipeline(self) -> Pipeline:
+        '''
+        ### 단계 정의
+        시세 → 변동성 → 점수/그룹 → 진입 테이블 순으로,
+        파라미터나 상위 단계가 바뀐 단계만 다시 계산함
+        '''
+        pipe = Pipeline()
+        pipe.add('stock', self.get_current_stock)
+        pipe.add('history', lambda: self.get_history())
+        pipe.add('balance', self.get_current_account_balance)
+        pipe.add('budget', lambda _: self.get_current_budget(),
+                 deps=['balance'])
+        pipe.add('volitality', lambda _, periods: self.get_volitality(),
+                 deps=['history'], params=['periods'])
+        pipe.add('score', lambda _, periods: self.get_score_table(),
+                 deps=['volitality'], params=['periods'])
+        pipe.add('cluster_tree', lambda _: self.get_cluster_tree(),
+                 deps=['volitality'])
+        pipe.add('data_group',
+                 lambda _, n_clusters: self.get_data_group(n_clusters),
+                 deps=['cluster_tree'], params=['n_clusters'])
+        pipe.add('screen_table',
+                 lambda *_, screen, limit, buffer:
+                    self.get_screen_table(screen, limit, buffer),
+                 deps=['stock', 'budget', 'score', 'data_group'],
+                 params=['screen', 'limit', 'buffer'])
+        return pipe
+
+    def update(self, n_clusters=None, screen=None, limit=None,
+               buffer=None, periods=None) -> pd.DataFrame:
+        '''
+        ### 파라미터 변경 후 진입 테이블 갱신
+        바뀐 파라미터의 하위 단계만 다시 계산함
+        '''
+        if periods is not None:
+            self.periods = list(periods)
+        self.pipeline.set(n_clusters=n_clusters, screen=screen,
+                          limit=limit, buffer=buffer,
+                          periods=tuple(self.periods))
+        return self.pipeline.run('screen_table')
+
+    def screen(self, screen=None, limit=None, buffer=None) -> pd.DataFrame:
+        '''### 진입 조건만 바꿔서 진입 테이블 다시 계산'''
+        return self.update(screen=screen, limit=limit, buffer=buffer)
+
+    def regroup(self, n_clusters) -> pd.DataFrame:
+        '''### 그룹 수만 바꿔서 그룹화부터 다시 계산'''
+        return self.update(n_clusters=n_clusters)
+
+    def refresh(self, *stages, universe: pd.DataFrame=None) -> pd.DataFrame:
+        '''
+        ### 네트워크 데이터 다시 조회
+        * stages : 'stock', 'history', 'balance' 중 선택 (없으면 전부)
+        * universe : 지정 시 유니버스를 바꾸고 시세부터 다시 조회
+        '''
+        stages = stages or ('stock', 'history', 'balance')
+        if universe is not None:
+            self.universe = NaverFinance.to_compact(universe)\
+                if self.compact else universe
+            stages = tuple(dict.fromkeys(stages + ('history',)))
+        self.pipeline.invalidate(*stages)
+        return self.pipeline.run('screen_table')
+
+    def copy(self) -> 'TradingHelper':
+        '''
+        ### 단계 결과를 공유하는 사본
+        사본에서 파라미터를 바꾸거나 갱신해도 원본 상태는 그대로임
+        (단계는 결과를 새 객체로 교체하므로 얕은 복사로 충분함).
+        파이프라인은 사본의 메서드로 다시 만들고 캐시와 파라미터만 복사함
+        '''
+        helper = copy.copy(self)
+        helper.pipeline = helper.get_pipeline()
+        helper.pipeline.params = dict(self.pipeline.params)
+        helper.pipeline.cache = dict(self.pipeline.cache)
+        return helper
+
+    def get_current_stock(self):
+        '''### 보유 종목 조회'''
         self.current_stock : pd.DataFrame\
             = self.kis_client.get_stock_account()
-
-        self.get_history()
-        self.get_current_account_balance()
-        self.get_current_budget()
-        self.get_volitality()
-        self.get_data_group(n_clusters)
-        self.get_screen_table(screen, limit, buffer)
+        return self.current_stock
     
     def get_current_account_balance(self):
         '''### 계좌 현황 조회'''
         account_balance = self.kis_client.get_account_balance()
         self.current_balance : pd.DataFrame\
             = account_balance.query('전체비중율 > 0')
+        return self.current_balance
     
     def get_current_budget(self):
         '''### 투자 예산 조회'''
@@ -42,19 +139,104 @@ class TradingHelper:
         self.current_budget : float = balance.loc[
             (balance.index != '채권') & (balance.index != '<합계>')]\
             ['평가금액'].sum()
+        return self.current_budget
 
     def get_price(self, symbol):
         return symbol, self.kis_client.get_daily_price(symbol)
     
-    def get_history(self):
-        '''### 멀티프로세싱으로 가격 데이터 조회'''
+    def get_history(self, use_async=True):
+        '''
+        ### 가격 데이터 조회
+        * use_async : 비동기 클라이언트로 동시 조회 (프로세스 풀 미사용)
+
+        `history_store`가 있으면 최신이 아닌 종목만 조회해서 저장소에 병합하고
+        전체 시세는 저장소에서 읽음 (분할/배당락으로 수정주가가 바뀐 종목은
+        저장된 기간 전체를 다시 받음). `history_days`를 지정하면 최근 30개 봉 대신
+        그 기간(일) 전체를 기간별시세로 나눠서 받음 (저장소에 그 기간이 있는 종목은
+        최근 구간만 받고, 패널에는 그 기간만 씀).
+        종목별 DataFrame은 패널을 만든 뒤 버림 (`self.history`는 패널에서 만든 뷰)
+        '''
+        symbols = list(self.universe.index)
+        if self.history_store:
+            symbols = self.history_store.get_stale(symbols)
+            print(f'STALE : {len(symbols)}')
+        prices = self.fetch_prices(symbols, use_async) if symbols else []
+        failed = [k for k, v in prices if v is None]
+        if failed:
+            raise Exception(f'가격 데이터 조회 실패 ({len(failed)}) : {failed}')
+        if self.history_store:
+            self.history_store.update(dict(prices),
+                                      kis_client=self.kis_client)
+            prices = self.history_store.load_many(self.universe.index).items()
+            if self.history_days:
+                start = pd.Timestamp(self.get_history_start().date())
+                prices = [(k, v.loc[v.index >= start]) for k, v in prices]
+        self.panel : PricePanel = PricePanel.from_history(
+            {k : self.compact_history(v) if self.compact else v
+             for k, v in prices},
+            np.float32 if self.compact else np.float64)
+        return self.panel
+
+    @property
+    def history(self) -> dict:
+        '''
+        ### 종목별 OHLCV DataFrame
+        시세는 패널로만 보관하므로 필요할 때 패널에서 만듦
+        '''
+        return self.panel.to_history()
+
+    @classmethod
+    def compact_history(cls, df: pd.DataFrame) -> pd.DataFrame:
+        '''### 패널에 쓰는 OHLCV 컬럼만 작은 정수 dtype으로'''
+        return df.loc[:, list(PricePanel.fields.values())].astype(
+            {'시가': np.int32, '고가': np.int32, '저가': np.int32,
+             '종가': np.int32, '거래량': np.int64})
+
+    def fetch_prices(self, symbols, use_async=True) -> list:
+        '''### 네트워크로 가격 데이터 조회 `[(symbol, df), ...]`'''
         start_time = time.time()
-        with Pool(cpu_count() * 2) as p:
-            prices = p.map(self.get_price, self.universe.index)
-        p.join();
-        print(f'Pool({cpu_count() * 2}) : {time.time() - start_time : .2f} seconds')
-        self.history : pd.DataFrame = {k : v for k, v in prices}
-    
+        if self.history_days:
+            prices = self.fetch_history(symbols)
+            prices = [(k, prices[k]) for k in symbols]
+            print(f'History({self.history_days} days) : '
+                  f'{time.time() - start_time : .2f} seconds')
+        elif use_async:
+            prices = run_sync(self.async_client.get_daily_price_dict(symbols))
+            prices = [(k, prices[k]) for k in symbols]
+            print(f'Async({self.async_client.concurrency}) : '
+                  f'{time.time() - start_time : .2f} seconds')
+        else:
+            with Pool(cpu_count() * 2) as p: # 클라이언트만 워커로 전달
+                prices = list(zip(symbols,
+                    p.map(self.kis_client.get_daily_price, symbols)))
+            p.join();
+            print(f'Pool({cpu_count() * 2}) : {time.time() - start_time : .2f} seconds')
+        print(f'Throttle : {self.kis_client.throttle.stats}')
+        return prices
+
+    def get_history_start(self) -> datetime:
+        '''### `history_days` 조회 시작 시각'''
+        return datetime.now(KST) - timedelta(days=self.history_days)
+
+    def fetch_history(self, symbols) -> dict:
+        '''
+        ### `history_days` 기간 일봉을 기간별시세로 조회 `{symbol: df}`
+        저장소에 그 기간부터 받아 둔 종목은 마지막 저장일 30일 전부터만 받아서
+        매일 갱신할 때 종목당 한 번만 요청함
+        '''
+        start, end = self.get_history_start(), datetime.now(KST)
+        since = self.history_store.get_since(symbols, start.date())\
+            if self.history_store else {}
+        groups = [(start, [s for s in symbols if s not in since])]
+        if since:
+            groups.append((min(since.values()), list(since)))
+        prices = {}
+        for first, group in groups:
+            if group:
+                prices.update(self.kis_client.get_daily_history_many(
+                    group, first.strftime('%Y%m%d'), end.strftime('%Y%m%d')))
+        return prices
+
     @classmethod
     def get_tr(cls, df: pd.DataFrame, close_col, high_col, low_col):
         '''### True Range 계산'''
@@ -66,59 +248,92 @@ class TradingHelper:
         return th - tl
     
     def get_volitality(self):
-        '''### 변동성 계산'''
-        tr_dict = {k: self.get_tr(p, '종가', '고가', '저가')
-                    for k, p in self.history.items()}
-        volitality = pd.concat(tr_dict.values(), axis=1)\
-            .tail(max(self.periods))
-        volitality.columns = tr_dict.keys()
-        self.volitality : pd.DataFrame = volitality.copy()
-        self.correlation : pd.DataFrame = volitality.corr()
+        '''### 변동성 계산 (전 종목 패널에서 한 번에)'''
+        tr = self.panel.true_range()[-max(self.periods):]
+        self.volitality : pd.DataFrame = pd.DataFrame(
+            tr, index=self.panel.dates[-max(self.periods):],
+            columns=self.panel.symbols)
+        self.correlation : pd.DataFrame = pd.DataFrame(
+            correlation(tr), index=self.panel.symbols,
+            columns=self.panel.symbols)
+        return self.volitality
 
     def draw_corr_scatter(self,
                      text='종목명', color='카테고리',
-                     size='시가총액', size_max=100):
-        '''### 상관성 분석 시각화'''
+                     size='시가총액', size_max=100,
+                     render_mode='auto', max_points=None):
+        '''
+        ### 상관성 분석 시각화
+        * render_mode : 'webgl'이면 종목이 수천 개여도 GPU로 그림 ('auto'는 plotly 기본)
+        * max_points : 지정 시 size 상위 종목만 그려서 점 수를 줄임
+
+        scikit-learn, plotly는 처음 그릴 때 불러옴 (서비스/CLI 시작 시간 단축)
+        '''
+        from sklearn.decomposition import PCA
+        import plotly.express as px
         pca = PCA(2)
         components = pca.fit_transform(self.correlation)
         corr_pca = pd.DataFrame(components, index=self.correlation.index)
-        corr_pca[text] = [
-                self.universe.query(f"index == '{v}'").iloc[0][text]
-                    for v in self.correlation.index]
-        corr_pca[color] = [
-                self.universe.query(f"index == '{v}'").iloc[0][color]
-                    for v in self.correlation.index]
-        corr_pca[size] = [
-                self.universe.query(f"index == '{v}'").iloc[0][size]
-                    for v in self.correlation.index]
+        columns = list(dict.fromkeys([text, color, size]))
+        corr_pca = corr_pca.join(self.universe[columns])
+        if max_points and len(corr_pca) > max_points:
+            corr_pca = corr_pca.nlargest(max_points, size)
         fig = px.scatter(corr_pca, x=0, y=1,
                         text=text, color=color, size=size,
-                        size_max=size_max, height=525)
+                        size_max=size_max, height=525,
+                        render_mode=render_mode)
         return fig
 
+    def get_cluster_tree(self):
+        '''
+        ### 상관계수 군집 트리
+        트리는 상관계수가 바뀔 때만 만들고, 그룹 수 변경은 트리 자르기만 함
+        '''
+        self.cluster_tree : ClusterTree = ClusterTree(self.correlation.values)
+        return self.cluster_tree
+
     def get_data_group(self, n_clusters):
         '''
         ### 종목 그룹화
+        `self.labels` : 종목코드 → 그룹 번호 (0 시작)
         '''
-        cluster = AgglomerativeClustering(n_clusters=n_clusters)
-        labels = cluster.fit_predict(self.correlation)
-        self.data_group = [[(i, self.universe.loc[i].종목명)
-                for i in self.correlation.index[labels == label]]
+        labels = self.cluster_tree.cut(n_clusters)
+        self.labels : pd.Series = pd.Series(
+            labels, index=self.correlation.index, name='그룹')
+        names = self.universe['종목명'].reindex(self.correlation.index)
+        self.data_group = [list(zip(names.index[labels == label],
+                                    names.values[labels == label]))
                 for label in np.unique(labels)]
-    
+        return self.data_group
+
     def get_data_group_table(self):
         '''
         ### 종목 그룹 DF화
         '''
-        group_df = [pd.DataFrame(group,
-                                 columns=['종목코드', '종목명']).set_index('종목코드')
-                    for group in self.data_group]
-        for i, v in enumerate(group_df):
-            v['그룹'] = i + 1
-        return pd.concat(group_df).iloc[:, [1, 0]]
+        table = pd.DataFrame({
+            '그룹': self.labels + 1,
+            '종목명': self.universe['종목명'].reindex(self.labels.index)})
+        table.index.name = '종목코드'
+        return table.sort_values('그룹', kind='stable')
+
+    def get_score_table(self):
+        '''
+        ### 전 종목 점수와 위험을 패널에서 한 번에 계산
+        위험의 True Range 지수이동평균은 기본(최근 30개 봉)이면 최근
+        `max(periods)`개 봉으로, `history_days`를 지정하면 받은 기간 전체로 구함
+        (`get_risk`와 같은 정의라 오래된 봉의 가중치가 더해져서 값이 조금 달라짐)
+        '''
+        window = max(self.periods)
+        self.score : pd.Series = pd.Series(
+            self.panel.momentum_score(self.periods), index=self.panel.symbols)
+        self.risk : pd.Series = pd.Series(
+            self.panel.risk(window, None if self.history_days else window),
+            index=self.panel.symbols)
+        return self.score, self.risk
 
     @classmethod
     def get_score(cls, close_price):
+        '''### 모멘텀 점수, 전 종목 값은 `get_score_table`에서 `self.score`로 계산'''
         momentum = lambda x: x[-1] / x[0]
         scores = [close_price.rolling(p).apply(momentum).iloc[-1] for p in cls.periods]
         scores = [s for s in scores if pd.notnull(s)]
@@ -127,44 +342,136 @@ class TradingHelper:
 
     @classmethod
     def get_risk(cls, tr, close_price):
+        '''### 위험 (ATR / 종가), 전 종목 값은 `get_score_table`에서 `self.risk`로 계산'''
         c = close_price.iloc[-1]
         atr = tr.ewm(max(cls.periods)).mean().iloc[-1]
         return atr / c
     
     def get_screen_table(self, screen, limit=0.015, buffer=1):
         '''진입 테이블 작성'''
-        scores = [[[v[0], v[1],
-                    self.get_score(self.history[v[0]].종가),
-                    self.get_risk(self.volitality[v[0]],
-                                  self.history[v[0]].종가)]
-                   for v in d] for d in self.data_group]
-        df_scores = pd.DataFrame(
-            [[i] + sorted(s, key=lambda x: x[2], reverse=True)[0] for i, s in enumerate(scores)])
-        df_scores.columns = ['그룹', '종목코드', '종목명', '점수', '위험']
-        df_scores.set_index('종목코드', inplace=True)
-        df_scores.sort_values('점수', ascending=False, inplace=True)
-        df_scores['버퍼'] = [(s > 1) and (s >= df_scores.점수.iloc[screen - 1 + buffer])
-                            for s in df_scores.점수 ]
-        df_scores['보유'] = [any([s in [d[0] for d in self.data_group[i]]
-                            for s in self.current_stock.index]) for i in df_scores.그룹]
-        df_scores['진입'] = df_scores.위험.apply(lambda x: min(limit / x, 1))\
-            .apply(lambda x: x * self.current_budget / screen)\
-            .apply(lambda x: int(x // 100000) * 100000)
-        new_candidate = screen - len(df_scores[df_scores.버퍼 & df_scores.보유])
-        own = sum(df_scores['보유'])
+        scores = pd.DataFrame({
+            '그룹': self.labels,
+            '종목명': self.universe['종목명'].reindex(self.labels.index),
+            '점수': self.score.reindex(self.labels.index),
+            '위험': self.risk.reindex(self.labels.index)})
+        # 그룹별 최고 점수 종목 (동점이면 앞 종목)
+        df_scores = scores.sort_values('점수', ascending=False, kind='stable')\
+            .groupby('그룹', sort=False).head(1)
+        return self.build_screen_table(df_scores, screen, limit, buffer)
+
+    def build_screen_table(self, df_scores, screen, limit, buffer):
+        '''### 점수 내림차순 그룹별 최고 종목(그룹, 종목명, 점수, 위험)으로 진입 테이블 작성'''
+        df_scores.index.name = '종목코드'
+        s = df_scores.점수
+        # 순위가 그룹 수를 넘으면 기준 없음 (-inf)
+        threshold = lambda i: s.iloc[i] if i < len(s) else -np.inf
+        df_scores['버퍼'] = (s > 1) & (s >= threshold(screen - 1 + buffer))
+        held_groups = self.labels.reindex(self.current_stock.index).dropna()
+        df_scores['보유'] = df_scores.그룹.isin(held_groups)
+        df_scores['진입'] = (np.minimum(limit / df_scores.위험, 1)
+                           * self.current_budget / screen // 100000)\
+            .astype(int) * 100000
+        new_candidate = screen - (df_scores.버퍼 & df_scores.보유).sum()
+        own = df_scores['보유'].sum()
         print(f'own: {own}, new_candidate : {new_candidate}')
-        def enter(x):
-            if x.버퍼 and x.보유:
-                return x.진입
-            if new_candidate and x.점수\
-                > df_scores.iloc[own + new_candidate].점수:
-                return x.진입
-            return 0
-        df_scores['진입'] = df_scores.apply(enter, axis=1)
+        enter = (df_scores.버퍼 & df_scores.보유)\
+            | (bool(new_candidate) & (s > threshold(own + new_candidate)))
+        df_scores['진입'] = df_scores.진입.where(enter, 0)
         df_scores['보유'] = df_scores['보유'].apply(lambda x: '✅' if x else '🔘')
         df_scores['그룹'] += 1 # 0 시작 -> 1 시작
-        df_scores['위험'] = df_scores['위험'].apply(lambda x: int(x * 10000) / 100)
-        df_scores['점수'] = df_scores['점수'].apply(lambda x: int(x * 1000) / 1000)
+        df_scores['위험'] = (df_scores['위험'] * 10000).astype(int) / 100
+        df_scores['점수'] = (df_scores['점수'] * 1000).astype(int) / 1000
         df_scores.drop(columns=['버퍼'], inplace=True)
         print(df_scores.진입.sum())
-        self.screen_table = df_scores.copy()
\ No newline at end of file
+        self.screen_table = df_scores.copy()
+        return self.screen_table
+
+    def get_scorer(self) -> OnlineScorer:
+        '''
+        ### 실시간 갱신용 점수/위험 상태
+        현재 패널과 그룹으로 만들며, 파이프라인의 `self.score`, `self.risk`
+        (종가 기준)와는 따로 둠. 실시간 값은 `self.scorer.score`, `risk`
+        '''
+        self.scorer : OnlineScorer = OnlineScorer.from_panel(
+            self.panel, self.periods, self.labels.reindex(self.panel.symbols))
+        return self.scorer
+
+    def get_stream_symbols(self, limit=41) -> list:
+        '''
+        ### 실시간 구독 종목 (최대 limit개)
+        보유 종목 다음으로 그룹별 점수 1위, 2위, ... 순으로 채움
+        '''
+        held = self.current_stock.index.intersection(self.labels.index)
+        ranked = pd.DataFrame({'그룹': self.labels,
+                               '점수': self.score.reindex(self.labels.index)})\
+            .sort_values('점수', ascending=False, kind='stable')
+        ranked['순위'] = ranked.groupby('그룹').cumcount()
+        ranked = ranked.sort_values('순위', kind='stable')
+        return list(dict.fromkeys([*held, *ranked.index]))[:limit]
+
+    def stream(self, duration=None, on_tick=None, symbols=None,
+               max_subscriptions=41, **kwargs) -> dict:
+        '''
+        ### 실시간 체결가로 점수/위험 갱신 (REST 조회 없음)
+        * duration : 받을 시간 (초, None이면 `self.quote_stream.stop()` 할 때까지)
+        * on_tick : 반영된 틱마다 `on_tick(tick)` 호출
+        * symbols : 구독 종목 (기본 `get_stream_symbols(max_subscriptions)`)
+        * kwargs : `QuoteStream` 옵션 (ws_domain 등)
+
+        틱마다 해당 종목 상태와 그룹 선두만 고치고,
+        진입 테이블은 `get_live_screen_table`로 필요할 때 만듦.
+        구독하지 않은 종목은 종가 기준 값을 그대로 씀
+        '''
+        scorer = self.get_scorer()
+        if symbols is None:
+            symbols = self.get_stream_symbols(max_subscriptions)
+        def handle(tick):
+            if scorer.update(tick.종목코드, tick.영업일자, tick.현재가,
+                             tick.고가, tick.저가) and on_tick:
+                on_tick(tick)
+        self.quote_stream : QuoteStream = QuoteStream(
+            self.kis_client, symbols, handle,
+            max_subscriptions=max_subscriptions, **kwargs)
+        return run_sync(self.quote_stream.run(duration))
+
+    def get_live_screen_table(self, screen=None, limit=None, buffer=None):
+        '''### 실시간 상태의 그룹 선두 순위로 진입 테이블 작성'''
+        params = self.pipeline.params
+        scorer = self.scorer
+        best = scorer.ranking()
+        symbols = scorer.symbols[best]
+        df_scores = pd.DataFrame({
+            '그룹': self.labels.reindex(symbols).to_numpy(),
+            '종목명': self.universe['종목명'].reindex(symbols).to_numpy(),
+            '점수': scorer.score[best],
+            '위험': scorer.risk[best]}, index=symbols)
+        return self.build_screen_table(
+            df_scores,
+            params['screen'] if screen is None else screen,
+            params['limit'] if limit is None else limit,
+            params['buffer'] if buffer is None else buffer)
+
+    def rebalance(self, dry_run=True, screen_table=None, **kwargs):
+        '''
+        ### 진입 테이블대로 리밸런싱 주문
+        * dry_run : True면 주문 계획만 반환
+        * screen_table : 목표 테이블 (기본 `self.screen_table`,
+          실시간이면 `get_live_screen_table()` 결과)
+        * kwargs : `Rebalancer` 옵션 (workers, tolerance, wait_sells, poll_timeout 등)
+
+        보유 수량은 주문 직전에 다시 조회하고, 유니버스 종목 중 목표에 없는
+        보유 종목은 전량 매도함. 수량 계산 가격은 실시간 상태가 있으면
+        그 현재가, 아니면 패널 마지막 종가
+        '''
+        table = self.screen_table if screen_table is None else screen_table
+        holdings = self.kis_client.get_stock_account()
+        if holdings is None:
+            raise Exception('보유 종목 조회 실패')
+        scorer = getattr(self, 'scorer', None)
+        prices = pd.Series(scorer.last_close() if scorer is not None
+                           else self.panel.last_close(),
+                           index=self.panel.symbols)
+        self.rebalancer = Rebalancer(self.kis_client, dry_run=dry_run, **kwargs)
+        return self.rebalancer.run(table.진입, holdings, prices,
+                                   managed=self.universe.index,
+                                   names=self.universe['종목명'])
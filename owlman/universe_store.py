@@ -0,0 +1,74 @@
+import os
+import json
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from owlman.storage import (owlman_home, FileLock, atomic_write,
+                            read_frame, write_frame, frame_path)
+from owlman.history_store import KST
+
+class UniverseStore:
+    '''
+    ### ETF 목록 스냅샷 저장소
+    * root : 저장 디렉터리 (기본 `~/.owlman/universe`)
+    * ttl : 마지막 조회 후 다시 확인하지 않고 쓸 시간 (초)
+
+    날짜(KST)별로 마지막으로 받은 목록을 한 파일씩 저장해서 과거 유니버스를
+    오프라인으로 다시 읽을 수 있고, 응답의 ETag/Last-Modified를 기록해서
+    TTL이 지난 뒤에는 조건부 요청으로 변경 여부만 확인함
+    '''
+    def __init__(self, root=None, ttl=600):
+        self.root = root or owlman_home('universe')
+        os.makedirs(self.root, exist_ok=True)
+        self.ttl = ttl
+        self.meta_path = os.path.join(self.root, 'meta.json')
+
+    def read_meta(self) -> dict:
+        if not os.path.exists(self.meta_path):
+            return {}
+        with open(self.meta_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def write_meta(self, **values):
+        with FileLock(self.meta_path + '.lock'):
+            meta = self.read_meta()
+            meta.update(values)
+            atomic_write(self.meta_path,
+                         json.dumps(meta, ensure_ascii=False).encode())
+
+    def is_fresh(self, meta=None) -> bool:
+        '''#### TTL 안에 확인한 스냅샷이 있는지'''
+        meta = meta or self.read_meta()
+        return bool(meta.get('latest'))\
+            and time.time() - meta.get('checked_at', 0) < self.ttl
+
+    def get_dates(self) -> list:
+        '''#### 저장된 스냅샷 날짜 ('YYYYMMDD', 오름차순)'''
+        return sorted(name.split('.')[0] for name in os.listdir(self.root)
+                      if name[:8].isdigit())
+
+    def load(self, date=None) -> pd.DataFrame:
+        '''
+        #### 스냅샷 읽기 (없으면 None)
+        * date : 'YYYYMMDD' 이하 가장 최근 스냅샷 (None이면 마지막 스냅샷)
+        '''
+        dates = self.get_dates()
+        if date is not None:
+            dates = [d for d in dates
+                     if d <= pd.Timestamp(date).strftime('%Y%m%d')]
+        return read_frame(frame_path(self.root, dates[-1])) if dates else None
+
+    def save(self, df: pd.DataFrame, etag=None, last_modified=None,
+             now=None) -> str:
+        '''#### 오늘(KST) 날짜 스냅샷으로 저장하고 검증값 기록'''
+        date = (now or datetime.now(KST)).strftime('%Y%m%d')
+        write_frame(frame_path(self.root, date), df)
+        self.write_meta(latest=date, checked_at=time.time(),
+                        etag=etag, last_modified=last_modified)
+        return date
+
+    def touch(self):
+        '''#### 변경 없음(304) 확인 시각 기록'''
+        self.write_meta(checked_at=time.time())
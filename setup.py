@@ -8,10 +8,11 @@ setup(
     author='qus0in',
     author_email='qus0in@gmail.com',
     url='https://github.com/qus0in/owlman',
-    install_requires=['requests', 'pandas', 'plotly', 'scikit-learn'],
+    install_requires=['requests', 'pandas', 'plotly', 'scikit-learn', 'scipy'],
+    extras_require={'stream': ['websockets']},
     packages=find_packages(exclude=[]),
     keywords=['owlman'],
-    python_requires='>=3.6',
+    python_requires='>=3.8',
     package_data={},
     zip_safe=False,
 )
\ No newline at end of file
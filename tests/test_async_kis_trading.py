@@ -0,0 +1,23 @@
+import time
+
+from owlman.async_kis_trading import AsyncKISTrading, run_sync
+from owlman.kis_trading import KISTrading
+from owlman.throttle import Throttle
+from benchmarks.kis_stub import KISStubServer
+
+
+def test_rps_does_not_change_shared_throttle():
+    '''rps는 비동기 클라이언트에만 적용되고 공용 Throttle 한도는 그대로'''
+    throttle = Throttle(rate=1000)
+    with KISStubServer() as server:
+        client = KISTrading('appkey', 'appsecret', '00000000', '01',
+                            access_token='stub-token', throttle=throttle)
+        client.domain = server.domain
+        async_client = AsyncKISTrading(client, rps=10)
+        symbols = [f'{i:06d}' for i in range(15)]
+        start = time.perf_counter()
+        prices = run_sync(async_client.get_daily_price_dict(symbols))
+        elapsed = time.perf_counter() - start
+    assert throttle.bucket.rate == 1000
+    assert sorted(prices) == symbols
+    assert elapsed >= 0.4 # 버킷 10개 소진 후 초당 10건
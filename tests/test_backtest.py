@@ -0,0 +1,17 @@
+import numpy as np
+
+from owlman.backtest import Backtester
+from owlman.price_panel import PricePanel
+from benchmarks.synthetic import synthetic_history
+
+
+def test_no_leverage():
+    '''진입 금액 합이 평가금액을 넘지 않고 투자 비중이 요약에 나옴'''
+    panel = PricePanel.from_history(synthetic_history(60, 120))
+    bt = Backtester(panel, processes=1)
+    result = bt.run(n_clusters=6, screen=2, limit=1, buffer=3, step=1)
+    invested = result.holdings.sum(axis=1)
+    assert (invested <= result.equity.loc[invested.index] * (1 + 1e-9)).all()
+    assert result.exposure.max() <= 1 + 1e-9
+    summary = result.summary()
+    assert 0 < summary['평균투자비중'] <= summary['최대투자비중'] <= 1 + 1e-9
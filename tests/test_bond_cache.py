@@ -0,0 +1,49 @@
+from datetime import date
+
+import pandas as pd
+
+from owlman import bond_cache
+from owlman.bond_cache import TTLCache, BondCache
+
+
+def test_ttl_lru(monkeypatch):
+    '''유효 시간이 지난 항목과 가장 오래 안 쓴 항목은 제거'''
+    now = [1000.0]
+    monkeypatch.setattr(bond_cache.time, 'time', lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1 # a를 최근으로
+    cache.set('c', 3)
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    now[0] += 61
+    assert cache.get('a') is None and len(cache) == 1
+
+
+def test_issue_on_disk_price_in_memory(tmp_path, monkeypatch):
+    '''발행정보는 디스크에서 다시 읽고, 시세는 유효 시간이 지나면 다시 조회'''
+    now = [1000.0]
+    monkeypatch.setattr(bond_cache.time, 'time', lambda: now[0])
+    profit = pd.DataFrame(
+        {'세전지급금액': [10.0, 10.0]},
+        index=pd.DatetimeIndex(['2026-03-01', '2026-09-01'], name='지급일자'))
+    calls = []
+    def fetch_issue():
+        calls.append('issue')
+        return profit, date(2027, 3, 1)
+    def fetch_price():
+        calls.append('price')
+        return 9990.0
+
+    cache = BondCache(str(tmp_path), price_ttl=60)
+    issue = cache.get_issue('KR0001', fetch_issue)
+    assert cache.get_issue('KR0001', fetch_issue) is issue
+    stored, expire = BondCache(str(tmp_path)).get_issue('KR0001', fetch_issue)
+    assert stored.equals(profit) and expire == date(2027, 3, 1)
+    assert calls == ['issue']
+
+    cache.get_price('KR0001', fetch_price)
+    cache.get_price('KR0001', fetch_price)
+    now[0] += 61
+    cache.get_price('KR0001', fetch_price)
+    assert calls == ['issue', 'price', 'price']
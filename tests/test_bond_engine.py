@@ -0,0 +1,113 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from owlman.bond_engine import BondEngine, fee_rate, as_datetime, match_fifo
+from owlman.bond_helper import BondHelper
+from owlman.bond_cache import BondCache
+from benchmarks.kis_stub import KISStubServer, bond_schedule
+
+
+def profit(dates, amount=10.0) -> pd.DataFrame:
+    return pd.DataFrame(
+        {'세전지급금액': amount},
+        index=pd.DatetimeIndex(dates, name='지급일자'))
+
+
+def get_engine() -> BondEngine:
+    return BondEngine({
+        'A': (profit(['2026-01-10', '2026-04-10', '2026-07-10']),
+              date(2026, 7, 10)),
+        'B': (profit(['2026-03-01', '2026-09-01'], 25.0), date(2027, 9, 1)),
+    })
+
+
+def test_interest_between():
+    '''기간 이자는 start < 지급일자 <= end 인 지급액 합 (종목별로 따로)'''
+    engine = get_engine()
+    codes = np.array(['A', 'A', 'B', 'B', 'A'])
+    start = as_datetime(['2026-01-10', '2026-01-09', '2026-01-01',
+                         '2026-03-01', '2026-07-10'])
+    end = as_datetime(['2026-04-10', '2026-12-31', '2026-09-01',
+                       '2026-08-31', '2026-12-31'])
+    assert engine.interest_between(codes, start, end).tolist()\
+        == [10, 30, 50, 0, 0]
+    assert np.allclose(engine.interest_between(codes, start, end, tax=True),
+                       np.array([10, 30, 50, 0, 0]) * (1 - 0.154))
+
+
+def test_fee_rate_boundaries():
+    '''잔존일수 90, 365, 730일부터 다음 수수료율'''
+    assert fee_rate(np.array([0, 89, 90, 364, 365, 729, 730])).tolist() == [
+        0.000052, 0.000052, 0.000152, 0.000152, 0.000252, 0.000252, 0.000352]
+    engine = get_engine()
+    fees = engine.fees(np.array(['A', 'B']),
+                       as_datetime(['2026-04-11', '2026-09-01']),
+                       np.array([1000.0, 1000.0]))
+    assert np.allclose(fees, [1000 * 0.000152, 1000 * 0.000252])
+
+
+def test_returns_redemption_has_no_sell_fee():
+    '''만기일 이후 매도(만기상환)는 매도수수료 없이 이표만 더함'''
+    engine = get_engine()
+    r = engine.returns(np.array(['A', 'A']),
+                       as_datetime(['2026-01-01', '2026-01-01']),
+                       [990.0, 990.0],
+                       as_datetime(['2026-05-01', '2026-07-10']),
+                       [995.0, 1000.0])
+    assert r['매도수수료'][0] > 0 and r['매도수수료'][1] == 0
+    assert r['이표수익'].tolist() == [2.0, 3.0]
+    expected = 1000 + 3 - 990 - r['매수수수료'][1]
+    assert np.isclose(r['매매수익'][1], expected)
+    assert np.isclose(r['매매수익률'][1], expected / 990 * 365 / 190 * 100)
+
+
+def test_match_fifo_partial_and_oversell():
+    '''매도 수량을 오래된 매수부터 나눠 배분하고, 넘치는 매도는 버림'''
+    buy_idx, sell_idx, qty = match_fifo(
+        ['A', 'A', 'B'], ['2026-01-02', '2026-01-05', '2026-01-02'],
+        [10, 5, 3],
+        ['A', 'A', 'B', 'B'],
+        ['2026-01-06', '2026-01-07', '2026-01-02', '2026-01-03'],
+        [12, 10, 1, 7])
+    assert list(zip(buy_idx.tolist(), sell_idx.tolist(), qty.tolist())) == [
+        (0, 0, 10),     # 첫 매도가 첫 매수 전부와
+        (1, 0, 2),      # 둘째 매수 일부를 가져감
+        (1, 1, 3),      # 둘째 매도는 남은 3개만 (7개는 기간 이전 매수분)
+        (2, 3, 3),      # 같은 날 매도(1개)는 매칭하지 않음
+    ]
+
+
+def test_match_fifo_open_lots():
+    '''매도되지 않은 잔량은 매도 위치 -1로 남고 매수 수량은 보존됨'''
+    buy_idx, sell_idx, qty = match_fifo(
+        ['A', 'A'], ['2026-01-02', '2026-01-03'], [4, 6],
+        ['A'], ['2026-01-04'], [5])
+    assert sell_idx.tolist() == [0, 0, -1]
+    assert qty.tolist() == [4, 1, 5]
+    assert qty.sum() == 10
+
+
+def test_merged_result_redemption(tmp_path, monkeypatch):
+    '''만기가 지난 미매도 잔량은 만기일에 1000원으로 상환된 것으로 계산'''
+    today = date.today()
+    expired = next(f'KR{i:010d}' for i in range(100)
+                   if bond_schedule(f'KR{i:010d}')[2] < today)
+    active = next(f'KR{i:010d}' for i in range(100)
+                  if bond_schedule(f'KR{i:010d}')[2] > today)
+    buy_date = pd.Timestamp(bond_schedule(expired)[0][0])
+    orders = lambda codes, qty, price: pd.DataFrame(dict(
+        주문일자=buy_date, 상품번호=codes, 상품명=codes,
+        총체결수량=qty, 평균단가=price))
+    buy = orders([expired, active], [10, 10], [990.0, 990.0])
+    sell = orders([expired], [4], [995.0])
+    sell['주문일자'] += pd.Timedelta(days=7)
+    with KISStubServer() as server:
+        monkeypatch.setattr(BondHelper, 'PATH', server.domain)
+        monkeypatch.setattr(BondHelper, 'cache', BondCache(str(tmp_path)))
+        result = BondHelper.get_merged_result(buy, sell)
+    assert result.보유수량.tolist() == [4, 6, 10]
+    assert result.매도단가.tolist()[:2] == [995.0, 1000.0]
+    assert result.매도일자[1] == bond_schedule(expired)[2]
+    assert pd.isnull(result.매도일자[2]) and result.매매수익[2] == 0
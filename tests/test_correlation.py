@@ -0,0 +1,38 @@
+import numpy as np
+
+from owlman import backtest
+from owlman.backtest import Backtester, get_date_trees
+from owlman.correlation import correlation
+from owlman.price_panel import PricePanel
+from owlman.shared_panel import SharedPanel, worker_arrays
+from benchmarks.synthetic import synthetic_history
+
+
+def test_rolling_matches_full(monkeypatch):
+    '''get_date_trees의 이동 상관계수가 날짜마다 새로 계산한 값과 1e-6 안에서 같음'''
+    bt = Backtester(PricePanel.from_history(synthetic_history(80, 120)),
+                    processes=1)
+    dates = bt.get_dates(step=1)
+    corrs = {}
+    get_date_tree = backtest.get_date_tree
+    def recorded(t, window, n_clusters=(), corr=None):
+        corrs[t] = corr
+        return get_date_tree(t, window, n_clusters, corr)
+    monkeypatch.setattr(backtest, 'get_date_tree', recorded)
+    with bt.share() as shared:
+        SharedPanel.attach(shared.spec)
+        try:
+            trees = get_date_trees(dates, 21, (6,))
+        finally:
+            worker_arrays.clear()
+    assert [tree['t'] for tree in trees] == list(dates)
+    for tree in trees:
+        t, idx = tree['t'], tree['idx']
+        full = correlation(bt.tr[t - 20:t + 1, idx])
+        assert np.abs(corrs[t][np.ix_(idx, idx)] - full).max() < 1e-6
+
+    monkeypatch.undo()
+    full = Backtester(bt.panel, processes=1, rolling=False)\
+        .get_trees(dates, 21, (6,))
+    assert all(np.array_equal(a['labels'][6], b['labels'][6])
+               for a, b in zip(trees, full))
@@ -0,0 +1,43 @@
+from datetime import date, timedelta
+
+from owlman.kis_trading import KISTrading
+from owlman.history_store import HistoryStore
+from owlman.throttle import Throttle
+from benchmarks.kis_stub import KISStubServer
+
+COLUMNS = ['시가', '고가', '저가', '종가']
+
+
+def test_split_rewrites_history(tmp_path):
+    '''겹치는 일봉 가격이 바뀌면(액면분할) 저장된 기간 전체를 수정주가로 교체'''
+    store = HistoryStore(str(tmp_path))
+    today = date.today()
+    day = lambda n: (today - timedelta(days=n)).strftime('%Y%m%d')
+    with KISStubServer() as server:
+        client = KISTrading('appkey', 'appsecret', '00000000', '01',
+                            access_token='stub-token',
+                            throttle=Throttle(rate=1e6))
+        client.domain = server.domain
+        history = client.get_daily_history('005930', day(200), day(0))
+        history = history.loc[history.index <= store.expected_last_date()]
+
+        # 분할 전에 저장한 시세 (2:1 분할 전 가격 기준)
+        before = history.iloc[:-5].copy()
+        before[COLUMNS] *= 2
+        store.update({'005930': before})
+        recent = client.get_daily_chart('005930', day(40), day(0))
+        assert store.is_adjusted('005930', recent)
+
+        hits = server.hits['inquire-daily-itemchartprice']
+        store.update({'005930': recent}, kis_client=client)
+        assert server.hits['inquire-daily-itemchartprice'] > hits
+        stored = store.load('005930')
+        assert stored.index.equals(history.index)
+        assert (stored[COLUMNS] == history[COLUMNS]).all().all()
+        assert stored.dtypes.equals(before.dtypes)
+
+        # 가격이 그대로면 다시 받지 않음
+        hits = server.hits['inquire-daily-itemchartprice']
+        store.update({'005930': recent}, kis_client=client)
+        assert server.hits['inquire-daily-itemchartprice'] == hits
+        assert not store.is_adjusted('005930', recent)
@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from owlman.kis_trading import KISTrading
+from owlman.multi_account import MultiAccount
+from owlman.throttle import Throttle
+from benchmarks.kis_stub import KISStubServer, KISStubHandler
+
+ACCOUNTS = {'연금': ('key1', 'secret1', '11111111', '22'),
+            '일반': ('key1', 'secret1', '22222222', '01'),
+            '가족': ('key2', 'secret2', '33333333', '01')}
+
+
+def test_one_token_per_appkey(monkeypatch):
+    '''같은 appkey 계좌는 토큰 하나를 공유하고 세션/유량 제어는 전 계좌 공용'''
+    with KISStubServer() as server:
+        monkeypatch.setattr(KISTrading, 'domain', server.domain)
+        accounts = MultiAccount(ACCOUNTS, throttle=Throttle(rate=1e6),
+                                token_store=False)
+        assert server.hits['tokenP'] == 2
+        clients = accounts.clients
+        assert clients['일반'].token_owner is clients['연금']
+        assert clients['연금'].token_owner is None
+        assert clients['가족'].token_owner is None
+        assert all(c.session is accounts.session
+                   and c.throttle is accounts.throttle
+                   for c in clients.values())
+        stock = accounts.get_stock_account()
+        assert set(stock.index.get_level_values('계좌')) == set(ACCOUNTS)
+        assert server.hits['tokenP'] == 2
+
+
+def test_concurrent_quotes_deduplicated(monkeypatch):
+    '''같은 종목을 동시에 요청해도 한 번만 조회하고 유지 시간이 지나면 다시 조회'''
+    with KISStubServer() as server:
+        monkeypatch.setattr(KISTrading, 'domain', server.domain)
+        monkeypatch.setattr(KISStubHandler, 'latency', 0.05)
+        accounts = MultiAccount(ACCOUNTS, throttle=Throttle(rate=1e6),
+                                token_store=False)
+        with ThreadPoolExecutor(16) as executor:
+            frames = list(executor.map(
+                lambda _: accounts.get_daily_price('005930'), range(32)))
+        assert server.hits['inquire-daily-price'] == 1
+        assert all(df is frames[0] for df in frames)
+
+        prices = accounts.get_daily_price_many(
+            ['005930', '000660', '005930', '000660'])
+        assert list(prices) == ['005930', '000660']
+        assert server.hits['inquire-daily-price'] == 2
+
+        accounts.quote_ttl = 0
+        time.sleep(0.01)
+        accounts.get_daily_price('005930')
+        assert server.hits['inquire-daily-price'] == 3
@@ -0,0 +1,51 @@
+from owlman.kis_trading import KISTrading
+from owlman.order_store import OrderStore
+from owlman.throttle import Throttle
+from benchmarks.kis_stub import KISStubServer
+
+
+def test_cached_empty_range(tmp_path):
+    '''주문이 없던 마감 구간을 저장소에서 다시 조회해도 빈 DataFrame을 반환'''
+    with KISStubServer() as server:
+        client = KISTrading('appkey', 'appsecret', '00000000', '01',
+                            access_token='stub-token',
+                            throttle=Throttle(rate=1e6),
+                            order_store=OrderStore(str(tmp_path)))
+        client.domain = server.domain
+        for simple in (True, False):
+            # 스텁은 평일에만 주문이 있음 (2026-01-03, 04는 주말)
+            first = client.get_daily_all_orders(
+                '20260103', '20260104', simple=simple)
+            again = client.get_daily_all_orders(
+                '20260103', '20260104', simple=simple)
+            assert len(first) == len(again) == 0
+            assert list(again.columns) == list(first.columns)
+            assert again.주문일자.dtype.kind == 'M'
+            assert server.hits['inquire-daily-ccld'] == 1 + (not simple)
+
+
+def test_covered_ranges_skipped(tmp_path):
+    '''받아 둔 구간은 다시 조회하지 않고 새 구간만 조회'''
+    with KISStubServer() as server:
+        make = lambda store: KISTrading(
+            'appkey', 'appsecret', '00000000', '01',
+            access_token='stub-token', throttle=Throttle(rate=1e6),
+            order_store=store)
+        client, plain = make(OrderStore(str(tmp_path))), make(False)
+        client.domain = plain.domain = server.domain
+        store = client.order_store
+
+        first = client.get_daily_all_orders('20260105', '20260109')
+        assert server.hits['inquire-daily-ccld'] == 1
+        again = client.get_daily_all_orders('20260105', '20260109')
+        assert server.hits['inquire-daily-ccld'] == 1
+        assert again.equals(first)
+
+        key = client.get_order_store_key('00', '01', '', '01', True)
+        assert store.get_missing(key, '20260101', '20260116')\
+            == [('20260101', '20260104'), ('20260110', '20260116')]
+        wider = client.get_daily_all_orders('20260101', '20260116')
+        assert server.hits['inquire-daily-ccld'] == 3
+        assert store.get_missing(key, '20260101', '20260116') == []
+        expected = plain.get_daily_all_orders('20260101', '20260116')
+        assert wider.index.equals(expected.index)
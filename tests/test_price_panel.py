@@ -0,0 +1,17 @@
+import numpy as np
+
+from owlman.price_panel import PricePanel
+from benchmarks.synthetic import synthetic_history
+
+
+def test_to_history_roundtrip():
+    '''패널에서 만든 종목별 시세가 원래 OHLCV와 같음 (결측 날짜 제외)'''
+    history = synthetic_history(20, 60, missing=0.1)
+    panel = PricePanel.from_history(history)
+    view = panel.to_history()
+    assert list(view) == list(history)
+    for symbol, df in history.items():
+        columns = list(PricePanel.fields.values())
+        assert view[symbol].index.equals(df.index)
+        assert np.array_equal(view[symbol][columns].to_numpy(),
+                              df[columns].to_numpy(dtype=np.float64))
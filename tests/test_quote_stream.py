@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from owlman.async_kis_trading import run_sync
+from owlman.online_scorer import OnlineScorer
+from owlman.price_panel import PricePanel
+from owlman.quote_stream import QuoteStream
+from owlman.trading_helper import TradingHelper
+from benchmarks.synthetic import synthetic_history
+from benchmarks.kis_stub import KISStubStream
+
+
+class ApprovalClient:
+    ws_domain = None
+
+    def get_approval_key(self):
+        return 'stub-approval-key'
+
+
+def apply_ticks(history, ticks) -> dict:
+    '''### 틱을 일봉에 반영한 시세 (일괄 계산 기준값)'''
+    history = {k: v.copy() for k, v in history.items()}
+    for symbol, day, price, high, low in ticks:
+        df, day = history[symbol], pd.Timestamp(day)
+        if day in df.index:
+            df.loc[day, ['고가', '저가', '종가']] = [
+                max(high, df.at[day, '고가']), min(low, df.at[day, '저가']),
+                price]
+        else:
+            df.loc[day, ['시가', '고가', '저가', '종가']] = [price, high, low,
+                                                          price]
+    return history
+
+
+def test_over_limit():
+    '''세션당 실시간 등록 한도를 넘으면 예외'''
+    with pytest.raises(Exception, match='한도'):
+        QuoteStream(ApprovalClient(), [f'{i:06d}' for i in range(42)], print)
+
+
+def test_one_session():
+    '''종목을 한 연결로 구독하고 받은 틱을 모두 전달'''
+    symbols = [f'{i:06d}' for i in range(41)]
+    ticks = []
+    with KISStubStream(day='20261019') as stub:
+        stream = QuoteStream(ApprovalClient(), symbols, ticks.append,
+                             ws_domain=stub.domain)
+        stats = run_sync(stream.run(duration=0.5))
+    assert stats['connects'] == 1
+    assert ticks and {t.종목코드 for t in ticks} <= set(symbols)
+    assert len(ticks) == stats['ticks']
+
+
+def test_online_matches_batch():
+    '''여러 날짜의 틱을 반영한 점수/위험/그룹 선두가 일괄 계산과 같음'''
+    history = synthetic_history(40, 60)
+    periods = TradingHelper.periods
+    window = max(periods)
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, 5, len(history))
+    scorer = OnlineScorer.from_panel(
+        PricePanel.from_history(history), periods, labels)
+    symbols, ticks = list(history), []
+    for day in ['20261019', '20261020']:
+        for _ in range(300):
+            symbol = symbols[rng.integers(0, 30)]
+            price = int(10000 + rng.integers(-1000, 1000))
+            tick = (symbol, day, price, price + int(rng.integers(0, 50)),
+                    price - int(rng.integers(0, 50)))
+            ticks.append(tick)
+            scorer.update(*tick)
+        panel = PricePanel.from_history(apply_ticks(history, ticks))
+        score = panel.momentum_score(periods)
+        risk = panel.risk(window, window)
+        assert np.allclose(scorer.score, score)
+        assert np.allclose(scorer.risk, risk, equal_nan=True)
+        best = pd.DataFrame({'그룹': labels, '점수': score})\
+            .sort_values('점수', ascending=False, kind='stable')\
+            .groupby('그룹', sort=False).head(1).index.to_numpy()
+        assert np.array_equal(scorer.ranking(), best)
+
+
+def test_scorer_keeps_pipeline_scores():
+    '''실시간 상태를 만들어도 파이프라인의 종가 기준 점수/위험은 그대로'''
+    history = synthetic_history(20, 40)
+    helper = TradingHelper.__new__(TradingHelper)
+    helper.panel = PricePanel.from_history(history)
+    helper.labels = pd.Series(0, index=helper.panel.symbols)
+    helper.score = pd.Series(helper.panel.momentum_score(helper.periods),
+                             index=helper.panel.symbols)
+    score = helper.score.copy()
+    scorer = helper.get_scorer()
+    scorer.update(helper.panel.symbols[0], '20261019', 1, 1, 1)
+    assert helper.score.equals(score)
+    assert scorer.score[0] != score.iloc[0]
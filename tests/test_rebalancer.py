@@ -0,0 +1,29 @@
+import pandas as pd
+
+from owlman.kis_trading import KISTrading
+from owlman.rebalancer import Rebalancer
+from owlman.throttle import Throttle
+from benchmarks.kis_stub import KISStubServer
+
+
+def test_dry_run_by_default():
+    '''기본값은 계획만 만들고, dry_run=False여야 주문함'''
+    symbols = [f'{i:06d}' for i in range(4)]
+    holdings = pd.DataFrame(
+        {'상품명': symbols[:2], '보유수량': 10, '현재가': 10000},
+        index=pd.Index(symbols[:2], name='상품번호'))
+    targets = pd.Series(100000, index=symbols[2:])
+    prices = pd.Series(10000, index=symbols)
+    with KISStubServer() as server:
+        client = KISTrading('appkey', 'appsecret', '00000000', '01',
+                            access_token='stub-token',
+                            throttle=Throttle(rate=1e6))
+        client.domain = server.domain
+        plan = Rebalancer(client).run(targets, holdings, prices)
+        assert len(plan) == 4 and (plan.상태 == '계획').all()
+        assert server.hits['order-cash'] == 0
+
+        result = Rebalancer(client, dry_run=False, poll_interval=0.1)\
+            .run(targets, holdings, prices)
+        assert server.hits['order-cash'] == 4
+        assert (result.상태 == '체결').all()
@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from owlman import schema
+from owlman.schema import SchemaError
+from benchmarks.kis_stub import chart_rows
+
+
+def test_changed_fields_raise():
+    '''필드 누락/추가는 SchemaError, 순서만 바뀐 건 그대로 변환'''
+    rows = chart_rows('005930', '20260105', '20260116')
+    missing = [{k: v for k, v in row.items() if k != 'stck_clpr'}
+               for row in rows]
+    with pytest.raises(SchemaError):
+        schema.decode('FHKST03010100', missing)
+    with pytest.raises(SchemaError): # 첫 행 이후 누락
+        schema.decode('FHKST03010100', rows[:1] + missing[1:])
+
+    added = [dict(row, new_field='1') for row in rows]
+    with pytest.raises(SchemaError):
+        schema.decode('FHKST03010100', added)
+    df = schema.decode('FHKST03010100', rows)
+    assert schema.decode('FHKST03010100', added, strict=False).equals(df)
+
+    reordered = [dict(reversed(row.items())) for row in rows]
+    assert schema.decode('FHKST03010100', reordered).equals(df)
+
+
+def test_compact_roundtrip():
+    '''compact 파싱과 일반 프레임 to_compact가 같고, 합친 뒤에도 dtype 유지'''
+    first = chart_rows('005930', '20260105', '20260109')
+    second = chart_rows('005930', '20260112', '20260116')
+    for row in second:
+        row['flng_cls_code'] = '01' # 구간마다 범주가 다름
+    normal = schema.decode('FHKST03010100', first + second)
+    compact = schema.decode('FHKST03010100', first + second, compact=True)
+    assert compact.equals(schema.to_compact('FHKST03010100', normal))
+    assert compact.종가.dtype == 'int32'
+    assert compact.락구분코드.dtype == 'category'
+    assert (compact.종가 == normal.종가).all()
+
+    merged = pd.concat([
+        schema.decode('FHKST03010100', first, compact=True),
+        schema.decode('FHKST03010100', second, compact=True)],
+        ignore_index=True)
+    assert merged.락구분코드.dtype == object
+    assert schema.to_compact('FHKST03010100', merged).equals(compact)
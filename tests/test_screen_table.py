@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from owlman.trading_helper import TradingHelper
+from owlman.backtest import select_entries
+
+
+def test_all_groups_held():
+    '''모든 그룹을 보유해서 신규 후보가 없어도 진입 테이블을 만들고 배열 버전과 같음'''
+    symbols = [f'{i:06d}' for i in range(4)]
+    score = np.array([1.05, 1.04, 1.03, 1.02])
+    helper = TradingHelper.__new__(TradingHelper)
+    helper.labels = pd.Series(range(4), index=symbols)
+    helper.universe = pd.DataFrame({'종목명': symbols}, index=symbols)
+    helper.score = pd.Series(score, index=symbols)
+    helper.risk = pd.Series(0.01, index=symbols)
+    helper.current_stock = pd.DataFrame(index=symbols)
+    helper.current_budget = 1e8
+    table = helper.get_screen_table(4, 0.015, 1)
+    pick, entry = select_entries(np.arange(4), score, np.full(4, 0.01),
+                                 np.ones(4, dtype=bool), 1e8, 4)
+    assert table.진입.tolist() == [25000000] * 4
+    assert pick.tolist() == [0, 1, 2, 3]
+    assert entry.tolist() == table.진입.tolist()
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from owlman.kis_trading import KISTrading
+from owlman.history_store import HistoryStore
+from owlman.naver_finance import NaverFinance
+from owlman.service import OwlmanService
+from owlman.throttle import Throttle
+from benchmarks.kis_stub import KISStubServer
+from benchmarks.synthetic import synthetic_universe
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    '''### 스텁 서버와 합성 유니버스로 한 번 갱신한 서비스'''
+    universe = synthetic_universe([f'{i:06d}' for i in range(12)])
+    monkeypatch.setattr(NaverFinance, 'get_etf_item_list',
+                        classmethod(lambda cls, **_: universe))
+    with KISStubServer() as server:
+        client = KISTrading('appkey', 'appsecret', '00000000', '01',
+                            access_token='stub-token',
+                            throttle=Throttle(rate=1e6))
+        client.domain = server.domain
+        yield OwlmanService(
+            client, helper_options=dict(n_clusters=4, screen=2),
+            interval=None, history_store=HistoryStore(str(tmp_path))).start()
+
+
+def test_params_do_not_change_defaults(service):
+    '''파라미터 요청은 사본에서 계산하고 기본 상태와 응답은 그대로'''
+    assert service.error is None
+    helper = service.helper
+    params, table = dict(helper.pipeline.params), helper.screen_table
+    default = service.get('/screen_table', {})
+
+    body = json.loads(service.get('/screen_table', {'screen': '3'}))
+    assert sum(1 for row in body['data'] if row[-1] > 0) <= 3
+    groups = json.loads(service.get('/data_group_table', {'n_clusters': '2'}))
+    assert {row[0] for row in groups['data']} == {1, 2}
+    with pytest.raises(ValueError):
+        service.get('/screen_table', {'screen': 'x'})
+
+    assert service.helper is helper and helper.pipeline.params == params
+    assert helper.screen_table is table and len(helper.data_group) == 4
+    assert service.render() == service.responses
+    assert service.get('/screen_table', {}) == default
+
+
+def test_refresh_reuses_helper(service):
+    '''갱신은 기존 helper의 사본에서 다시 조회하고 교체'''
+    helper = service.helper
+    table = helper.screen_table
+    service.refresh()
+    assert service.error is None and service.version == 2
+    assert service.helper is not helper
+    assert service.helper.async_client is helper.async_client
+    assert service.helper.pipeline.params == helper.pipeline.params
+    assert helper.screen_table is table
@@ -0,0 +1,27 @@
+import pytest
+
+from owlman.backtest import Backtester
+from owlman.sweep import ParameterSweep
+from owlman.price_panel import PricePanel
+from benchmarks.synthetic import synthetic_history
+
+
+def test_trees_per_window(monkeypatch):
+    '''창 길이가 같은 periods끼리 연결 트리를 한 번만 계산하고 결과는 단독 백테스트와 같음'''
+    bt = Backtester(PricePanel.from_history(synthetic_history(40, 80)),
+                    processes=1)
+    windows = []
+    get_trees = bt.get_trees
+    def counted(dates, window, *args, **kwargs):
+        windows.append(window)
+        return get_trees(dates, window, *args, **kwargs)
+    monkeypatch.setattr(bt, 'get_trees', counted)
+    table = ParameterSweep(bt).run(
+        dict(n_clusters=[4], screen=[2], periods=[(2, 5, 13), (3, 13), (5, 10)]))
+    assert sorted(windows) == [10, 13]
+
+    monkeypatch.undo()
+    dates = bt.get_dates(step=5, window=13)
+    result = bt.simulate(bt.get_features(dates, (3, 13), [4]), 4, 2)
+    row = table.loc[table.periods == (3, 13)].iloc[0]
+    assert row.총수익률 == pytest.approx(result.summary()['총수익률'])
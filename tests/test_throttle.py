@@ -0,0 +1,50 @@
+import requests
+
+from owlman.throttle import Throttle
+
+
+def response(status=200, body=b'{"rt_cd": "0"}') -> requests.Response:
+    res = requests.Response()
+    res.status_code = status
+    res._content = body
+    return res
+
+
+def sequence(*responses):
+    '''### 호출마다 다음 응답을 반환하는 요청 함수'''
+    calls = []
+    def func():
+        calls.append(1)
+        return responses[min(len(calls), len(responses)) - 1]
+    return func, calls
+
+
+def test_retry_rate_limited():
+    '''429와 EGW00201 응답은 재시도하고 성공 응답을 반환'''
+    throttle = Throttle(rate=1000, backoff=0)
+    func, calls = sequence(
+        response(429), response(200, b'{"msg_cd": "EGW00201"}'), response())
+    assert throttle.call(func).status_code == 200
+    assert len(calls) == 3
+    assert throttle.stats['retries'] == 2
+
+
+def test_non_idempotent_5xx_not_retried():
+    '''주문처럼 멱등이 아닌 요청은 5xx를 바로 반환하고 유량 제한만 재시도'''
+    throttle = Throttle(rate=1000, backoff=0)
+    func, calls = sequence(response(500), response())
+    assert throttle.call(func, idempotent=False).status_code == 500
+    assert len(calls) == 1
+
+    func, calls = sequence(response(429), response())
+    assert throttle.call(func, idempotent=False).status_code == 200
+    assert len(calls) == 2
+
+
+def test_retries_exhausted():
+    '''재시도를 모두 소진하면 마지막 응답을 반환하고 실패로 셈'''
+    throttle = Throttle(rate=1000, max_retries=2, backoff=0)
+    func, calls = sequence(response(503))
+    assert throttle.call(func).status_code == 503
+    assert len(calls) == 3
+    assert throttle.stats['failures'] == 1
@@ -0,0 +1,51 @@
+import os
+import time
+import multiprocessing
+
+from owlman.token_store import TokenStore
+
+
+def issue_slowly(path):
+    '''### 발급 횟수를 파일에 기록하고 잠시 대기하는 발급 함수'''
+    with open(path + '.issued', 'a') as f:
+        f.write(f'{os.getpid()}\n')
+    time.sleep(0.3)
+    return f'token-{os.getpid()}', time.time() + 86400
+
+
+def get_token(path):
+    return TokenStore(path).get('appkey', lambda: issue_slowly(path))[0]
+
+
+def test_reuse_cached(tmp_path):
+    '''유효한 토큰은 다시 발급하지 않고 재사용'''
+    store = TokenStore(str(tmp_path / 'token.json'))
+    issued = []
+    def issue():
+        issued.append(1)
+        return f'token-{len(issued)}', time.time() + 86400
+    assert store.get('appkey', issue)[0] == 'token-1'
+    assert TokenStore(store.path).get('appkey', issue)[0] == 'token-1'
+    assert store.get('other', issue)[0] == 'token-2'
+    assert store.get('appkey', issue, domain='vts')[0] == 'token-3'
+    assert len(issued) == 3
+
+
+def test_refresh_near_expiry(tmp_path):
+    '''만료까지 margin보다 적게 남으면 새로 발급'''
+    store = TokenStore(str(tmp_path / 'token.json'), margin=3600)
+    store.get('appkey', lambda: ('old', time.time() + 1800))
+    assert store.get('appkey', lambda: ('new', time.time() + 86400))[0]\
+        == 'new'
+    assert store.get('appkey', lambda: ('newer', time.time() + 86400))[0]\
+        == 'new'
+
+
+def test_lock_across_processes(tmp_path):
+    '''여러 프로세스가 동시에 요청해도 한 번만 발급'''
+    path = str(tmp_path / 'token.json')
+    with multiprocessing.get_context('spawn').Pool(4) as pool:
+        tokens = pool.map(get_token, [path] * 4)
+    with open(path + '.issued') as f:
+        assert len(f.read().split()) == 1
+    assert len(set(tokens)) == 1
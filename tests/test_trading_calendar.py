@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from owlman.kis_trading import KISTrading
+from owlman.throttle import Throttle
+from owlman.trading_calendar import TradingCalendar
+from benchmarks.kis_stub import KISStubServer
+
+
+def get_client(server) -> KISTrading:
+    client = KISTrading('appkey', 'appsecret', '00000000', '01',
+                        access_token='stub-token',
+                        throttle=Throttle(rate=1e6))
+    client.domain = server.domain
+    return client
+
+
+def get_calendar(tmp_path) -> TradingCalendar:
+    '''### 스텁 휴장일(2026-10-09 한글날 금요일)로 채운 달력'''
+    calendar = TradingCalendar(str(tmp_path / 'calendar.pkl'))
+    with KISStubServer() as server:
+        calendar.update(get_client(server), '20260901', '20261231')
+    return calendar
+
+
+def test_offset_around_holidays(tmp_path):
+    '''휴장일과 주말을 건너뛰어 n번째 개장일을 찾음'''
+    calendar = get_calendar(tmp_path)
+    day = pd.Timestamp
+    assert not calendar.is_open('20261009')
+    assert calendar.offset('20261008', 1) == day('20261012')
+    assert calendar.offset('20261009', 1) == day('20261012')
+    assert calendar.offset('20261009', 0) == day('20261012')
+    assert calendar.offset('20261008', 0) == day('20261008')
+    assert calendar.offset('20261012', -1) == day('20261008')
+    assert calendar.offset('20261010', -1) == day('20261008')
+    assert calendar.rollback('20261011') == day('20261008')
+    assert list(calendar.offset(['20261001', '20261008'], 2))\
+        == [day('20261005'), day('20261013')]
+    # 받아 둔 기간 밖은 평일을 개장일로 봄 (스텁에서는 3.1절도 휴장)
+    assert calendar.is_open('20270301')
+    assert calendar.offset('20270226', 1) == day('20270301')
+
+
+def test_count_between(tmp_path):
+    '''start 초과 end 이하 개장일 수 (휴장일 제외)'''
+    calendar = get_calendar(tmp_path)
+    assert calendar.count_between('20261008', '20261012') == 1
+    assert calendar.count_between('20261009', '20261009') == 0
+    assert calendar.count_between('20261001', '20261031') == 20
+    assert calendar.count_between(
+        ['20261001', '20261008'], '20261013').tolist() == [7, 2]
+    days = calendar.get_open_days('20261001', '20261031')
+    assert len(days) == 21 and pd.Timestamp('20261009') not in days
+    assert np.array_equal(calendar.is_open(days), np.ones(21, dtype=bool))
+
+
+def test_update_fetches_missing_only(tmp_path):
+    '''저장된 기간은 다시 조회하지 않고 디스크에서 읽음'''
+    calendar = get_calendar(tmp_path)
+    with KISStubServer() as server:
+        client = get_client(server)
+        calendar.update(client, '20261001', '20261130')
+        assert server.hits['chk-holiday'] == 0
+        calendar.update(client, '20260801', '20261130')
+        assert server.hits['chk-holiday'] > 0
+    again = TradingCalendar(calendar.path)
+    assert again.covers(['20260801', '20261231', '20270301']).tolist()\
+        == [True, True, False]
+    assert not again.is_open('20261009')
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from owlman.kis_trading import KISTrading
+from owlman.history_store import HistoryStore
+from owlman.throttle import Throttle
+from owlman.trading_helper import TradingHelper
+from benchmarks.kis_stub import KISStubServer
+
+
+def get_helper(server, store, symbols) -> TradingHelper:
+    client = KISTrading('appkey', 'appsecret', '00000000', '01',
+                        access_token='stub-token',
+                        throttle=Throttle(rate=1e6))
+    client.domain = server.domain
+    helper = TradingHelper.__new__(TradingHelper)
+    helper.kis_client = client
+    helper.history_store = store
+    helper.history_days = 365
+    helper.compact = False
+    helper.universe = pd.DataFrame({'종목명': symbols}, index=symbols)
+    return helper
+
+
+def test_history_days_refresh_and_risk(tmp_path):
+    '''
+    저장소에 기간이 있으면 최근 구간만 다시 받고,
+    위험은 받은 기간 전체의 True Range 지수이동평균
+    '''
+    symbols = [f'{i:06d}' for i in range(3)]
+    store = HistoryStore(str(tmp_path))
+    with KISStubServer() as server:
+        helper = get_helper(server, store, symbols)
+        helper.get_history()
+        chunks = len(KISTrading.get_chart_chunks(
+            *[d.strftime('%Y%m%d') for d in (helper.get_history_start(),
+                                             pd.Timestamp.now())]))
+        assert server.hits['inquire-daily-itemchartprice'] == 3 * chunks
+        os.remove(store.meta_path) # 다음 날 갱신
+        helper.get_history()
+        assert server.hits['inquire-daily-itemchartprice'] == 3 * chunks + 3
+
+    panel = helper.panel
+    assert panel.dates[0] >= pd.Timestamp(helper.get_history_start().date())
+    assert len(panel.dates) > 200
+    helper.get_score_table()
+    for symbol, df in helper.history.items():
+        tr = TradingHelper.get_tr(df, '종가', '고가', '저가')
+        assert np.isclose(helper.risk[symbol],
+                          TradingHelper.get_risk(tr, df.종가))